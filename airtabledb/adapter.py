@@ -1,19 +1,11 @@
+import json
+import time
 from collections import defaultdict
-from typing import (
-    Any,
-    Collection,
-    Dict,
-    Iterable,
-    Iterator,
-    List,
-    Optional,
-    Tuple,
-    Type,
-)
+from itertools import islice
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple, Type, cast
 
-from pyairtable import Table
 from shillelagh.adapters.base import Adapter
-from shillelagh.fields import Field, ISODate, ISODateTime, Order, String
+from shillelagh.fields import Boolean, Field, ISODate, ISODateTime, Order, RowID, String
 from shillelagh.filters import (
     Equal,
     Filter,
@@ -23,12 +15,32 @@ from shillelagh.filters import (
     Operator,
     Range,
 )
-from shillelagh.typing import RequestedOrder
+from shillelagh.typing import RequestedOrder, Row
 
-from .fields import MaybeList, MaybeListString
-from .formulas import get_airtable_formula
+from . import aio
+from .aggregate import AGGREGATES
+from .batch import ColumnBatch, build_batch
+from .cache import get_cache_key, get_page_cache
+from .client import DEFAULT_MAX_RETRIES, PAGE_SIZE, AirtableTable, get_session
+from .fields import AirtableFloat, Checkbox, LinkedValues, MaybeList, compile_parser
+from .formulas import (
+    AND_BETTER,
+    get_airtable_formula,
+    get_airtable_formulas,
+    get_shard_formulas,
+)
+from .instrumentation import QueryStats, finish_query, start_query
 from .lib import FieldInfo, guess_field
-from .types import BaseMetadata, TableMetadata, TypedDict
+from .links import Expansion, LinkedRecords, expand_rows, get_derived_column
+from .local import matches, sort_rows
+from .metadata import get_created_time_field, get_field_info
+from .prefetch import merge, prefetch
+from .probes import DEFAULT_MAX_PROBE_BYTES, DEFAULT_PROBE_TTL, ProbeMemo
+from .schema_cache import get_schema_cache
+from .stats import ScanStats, TableStats, get_table_stats, set_table_stats
+from .sync import get_mirror
+from .throttle import get_rate_limiter
+from .types import AirtableRecord, BaseMetadata, Page, TableMetadata, TypedDict
 
 # -----------------------------------------------------------------------------
 
@@ -46,12 +58,108 @@ FIELD_KWARGS: FieldKwargs = {
 }
 
 
-def get_airtable_sort(order: List[Tuple[str, RequestedOrder]]) -> List[str]:
+DATE_FILTERS: List[Type[Filter]] = [IsNull, IsNotNull]
+
+# A checkbox is never NULL (see Checkbox), which SQLite can tell by itself
+CHECKBOX_FILTERS: List[Type[Filter]] = [Equal, NotEqual, Range]
+
+# Fields by how little they (likely) add to a record; checkboxes are left out
+# altogether when unchecked
+MINIMAL_FIELDS: Tuple[Type[Field], ...] = (
+    Checkbox,
+    Boolean,
+    AirtableFloat,
+    ISODate,
+    ISODateTime,
+)
+
+# Fields that Airtable sorts the same way SQLite would (NULLs first).
+# Text is sorted case-insensitively by Airtable and lists by their display value,
+# so those are sorted locally (see sort_rows).
+SORTABLE_FIELDS: Tuple[Type[Field], ...] = (
+    AirtableFloat,
+    Boolean,
+    ISODate,
+    ISODateTime,
+)
+
+
+def get_airtable_sort(
+    order: List[Tuple[str, RequestedOrder]],
+    aliases: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """
+    Build the Airtable ``sort`` for ``order``.
+
+    ``aliases`` maps columns that can't be sorted on directly (i.e. createdTime)
+    to a Field holding the same value.
+    """
+    if aliases:
+        order = [(aliases.get(s, s), o) for s, o in order]
     return [(s if o is Order.ASCENDING else f"-{s}") for s, o in order]
 
 
+def get_airtable_fields(
+    requested_columns: Collection[str],
+    field_names: List[str],
+    minimal_field: Optional[str] = None,
+) -> List[str]:
+    fields = [name for name in field_names if name in requested_columns]
+    # Airtable returns every field when none are listed so we ask for just one
+    # (ideally a small one). This comes up when only id / createdTime are needed,
+    # e.g. for COUNT(*).
+    if not fields:
+        return [minimal_field] if minimal_field is not None else field_names[:1]
+    return fields
+
+
+def get_minimal_field(columns: Dict[str, Field]) -> Optional[str]:
+    """Pick the field likely to add the least to each record fetched."""
+    for field_cls in MINIMAL_FIELDS:
+        for field_name, field in columns.items():
+            if type(field) is field_cls:
+                return field_name
+    return next(iter(columns), None)
+
+
+def _paginate(rows: Iterator[Row]) -> Iterator[Iterator[Row]]:
+    """Group rows into pages, as Airtable would."""
+    while True:
+        page = list(islice(rows, PAGE_SIZE))
+        if not page:
+            return
+        yield iter(page)
+
+
+def _get_options(fields: Optional[List[str]], limit: Optional[int]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if limit is not None:
+        options["max_records"] = limit
+        # So small limits don't fetch (and decode) a full page
+        options["page_size"] = min(limit, PAGE_SIZE)
+    if fields is not None:
+        options["fields"] = fields
+    return options
+
+
 def _create_field(field_cls: Type[Field], extra_kwargs) -> Field:
-    return field_cls(**FIELD_KWARGS, **extra_kwargs)
+    # Every column is sortable: shillelagh pushes LIMIT down even when SQLite sorts,
+    # so the adapter has to, on Airtable when it can (see SORTABLE_FIELDS)
+    field_kwargs = dict(FIELD_KWARGS, **extra_kwargs)
+    if issubclass(field_cls, (ISODate, ISODateTime)):
+        # The literals we'd compare with don't work on Airtable dates
+        field_kwargs["filters"] = DATE_FILTERS
+    if issubclass(field_cls, Checkbox):
+        field_kwargs["filters"] = CHECKBOX_FILTERS
+    return field_cls(**field_kwargs)
+
+
+def _create_derived_field(field_cls: Type[Field], extra_kwargs) -> Field:
+    # Derived columns are lists (of the linked records' values), so text, and are
+    # only filtered by SQLite, and sorted locally
+    return LinkedValues(
+        field_cls(**extra_kwargs), filters=[], order=Order.ANY, exact=False
+    )
 
 
 def _get_table_by_name(
@@ -67,6 +175,9 @@ def _get_table_by_name(
 class AirtableAdapter(Adapter):
     safe = True
     supports_limit = True
+    supports_offset = True
+    # Newer versions of shillelagh pass the columns used by the query
+    supports_requested_columns = True
 
     def __init__(
         self,
@@ -77,15 +188,80 @@ class AirtableAdapter(Adapter):
         peek_rows: Optional[int],
         # Ick:
         date_columns: Optional[Dict[str, Collection[str]]],
+        prefetch_pages: Optional[int] = None,
+        shards: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        cache: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        cache_max_bytes: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        schema_cache: Optional[str] = None,
+        schema_cache_ttl: Optional[float] = None,
+        created_time_field: Optional[str] = None,
+        probe_ttl: Optional[float] = None,
+        probe_prefetch_threshold: Optional[int] = None,
+        probe_max_bytes: Optional[int] = None,
+        collect_stats: bool = False,
+        stats_ttl: Optional[float] = None,
+        api_url: Optional[str] = None,
+        async_fetch: bool = False,
+        # Ick: (by table, the fields of the records linked to, by link field)
+        expand: Optional[Dict[str, Dict[str, List[str]]]] = None,
     ):
         super().__init__()
 
         self.table = table
+        self.base_id = base_id
         self.base_metadata = base_metadata
+        self.prefetch_pages = prefetch_pages
+        self.collect_stats = collect_stats
+        self.stats_ttl = stats_ttl
+        # The query that requests are counted against, see _start_query
+        self._query_stats: Optional[QueryStats] = None
+        self.shard_formulas = get_shard_formulas(shards) if shards else []
+        self._page_cache = (
+            get_page_cache(cache, ttl=cache_ttl, max_bytes=cache_max_bytes)
+            if cache
+            else None
+        )
 
-        self._table_api = Table(api_key, base_id, table)
+        probe_ttl = probe_ttl if probe_ttl is not None else DEFAULT_PROBE_TTL
+        self._probe_memo = (
+            ProbeMemo(
+                probe_ttl,
+                prefetch_threshold=probe_prefetch_threshold,
+                max_bytes=(
+                    probe_max_bytes
+                    if probe_max_bytes is not None
+                    else DEFAULT_MAX_PROBE_BYTES
+                ),
+            )
+            if probe_ttl > 0
+            else None
+        )
+
+        def get_table_api(table_name: str) -> AirtableTable:
+            return AirtableTable(
+                api_key,
+                base_id,
+                table_name,
+                # These are shared by every adapter on the base
+                rate_limiter=get_rate_limiter(base_id, rate_limit),
+                session=get_session(api_key, base_id, pool_size),
+                max_retries=(
+                    max_retries if max_retries is not None else DEFAULT_MAX_RETRIES
+                ),
+                api_url=api_url,
+            )
+
+        self._table_api = get_table_api(table)
+        # Fetches that can run concurrently do so on an event loop, not threads
+        self._async_table = (
+            aio.AsyncAirtableTable(self._table_api) if async_fetch else None
+        )
 
-        fields: Iterable[str]
         columns: Dict[str, Field]
         if self.base_metadata is not None:
             # TODO(cancan101): Better error handling here
@@ -93,67 +269,197 @@ class AirtableAdapter(Adapter):
             # Alternatively we could have the user specify the name as an id
             table_metadata = _get_table_by_name(table, base_metadata=self.base_metadata)
             columns_metadata = table_metadata["columns"]
-            fields = [col["name"] for col in columns_metadata]
             self.strict_col = True
 
-            # For now just set allow_multiple = True here
-            # as we are not introspecting meta
+            # Without a type (e.g. hand written metadata) this falls back to
+            # MaybeListString with allow_multiple = True
             columns = {
-                k: _create_field(MaybeListString, {"allow_multiple": True})
-                for k in fields
+                col["name"]: _create_field(*get_field_info(col))
+                for col in columns_metadata
             }
+            if created_time_field is None:
+                created_time_field = get_created_time_field(columns_metadata)
 
         # Attempts introspection by looking at data.
         # This is super not reliable
         # as Airtable removes the key if the value is empty.
         else:
-            # This introspects the just first row in the table.
-            if peek_rows is None or peek_rows == 1:
-                field_values = {
-                    k: [v] for k, v in self._table_api.first()["fields"].items()
+            schema_cache_obj = (
+                get_schema_cache(schema_cache, ttl=schema_cache_ttl)
+                if schema_cache
+                else None
+            )
+            credentials = {
+                "api_key": self._table_api.api_key,
+                "api_url": self._table_api.API_URL,
+            }
+            guessed_fields = (
+                schema_cache_obj.get(base_id, table, peek_rows, **credentials)
+                if schema_cache_obj is not None
+                else None
+            )
+            if guessed_fields is None:
+                guessed_fields = {
+                    k: guess_field(v)
+                    for k, v in self._peek_field_values(peek_rows).items()
                 }
-            # Or peek at specified number of rows
-            else:
-                # We have an explicit type check here as the Airtable API
-                # just ignores the value if it isn't valid.
-                if not isinstance(peek_rows, int):
-                    raise TypeError(
-                        f"peek_rows should be an int. Got: {type(peek_rows)}"
+                if schema_cache_obj is not None:
+                    schema_cache_obj.set(
+                        base_id, table, peek_rows, guessed_fields, **credentials
                     )
 
-                field_values = defaultdict(list)
-                for row in self._table_api.all(max_records=peek_rows):
-                    for k, v in row["fields"].items():
-                        field_values[k].append(v)
-
             self.strict_col = False
 
             date_columns_table = (
                 date_columns.get(table, set()) if date_columns is not None else set()
             )
 
-            def maybe_guess_field(field_name: str, values: List[Any]) -> FieldInfo:
+            def maybe_guess_field(field_name: str, field_info: FieldInfo) -> FieldInfo:
                 if field_name in date_columns_table:
                     return MaybeList, {"field": ISODate()}
                 else:
-                    return guess_field(values)
+                    return field_info
 
             columns = {
                 k: _create_field(*maybe_guess_field(k, v))
-                for k, v in field_values.items()
+                for k, v in guessed_fields.items()
             }
 
-        # Right now I don't know how to sort on the backend:
+        # createdTime can only be sorted on by way of a Field holding it:
         # https://community.airtable.com/t/sort-on-rest-api-by-createdtime-without-adding-new-column/
+        if created_time_field not in columns:
+            # The same name is given for every table on the base
+            created_time_field = None
+        self._sort_aliases = (
+            {"createdTime": created_time_field} if created_time_field else {}
+        )
         # TODO(cancan101): implement filtering for id + createdTime
         # using special formula.
         # See:
         # https://support.airtable.com/hc/en-us/articles/360051564873-Record-ID
         # https://support.airtable.com/hc/en-us/articles/203255215-Formula-field-reference#record_functions
+        self._field_names = list(columns.keys())
+        self._minimal_field = get_minimal_field(columns)
+
+        # Fields of linked records, fetched in batches, as columns of their own
+        self._expansions: List[Expansion] = []
+        # The link field each derived column comes from
+        self._link_fields: Dict[str, str] = {}
+        derived_columns: Dict[str, Field] = {}
+        table_expand = expand.get(table, {}) if expand is not None else {}
+        if table_expand and self.base_metadata is None:
+            raise ValueError("Expanding linked records requires the base metadata")
+        for link_field, linked_fields in table_expand.items():
+            linked_table_metadata = self._get_linked_table_metadata(link_field)
+            linked_table_api = get_table_api(linked_table_metadata["name"])
+            linked_columns = {
+                col["name"]: col for col in linked_table_metadata["columns"]
+            }
+            derived = []
+            for field_name in linked_fields:
+                if field_name not in linked_columns:
+                    raise ValueError(
+                        f"Unknown field of {linked_table_metadata['name']}: "
+                        f"{field_name}"
+                    )
+                column_name = get_derived_column(link_field, field_name)
+                derived_columns[column_name] = _create_derived_field(
+                    *get_field_info(linked_columns[field_name])
+                )
+                self._link_fields[column_name] = link_field
+                derived.append((column_name, field_name))
+            self._expansions.append(
+                (
+                    link_field,
+                    LinkedRecords(
+                        linked_table_api,
+                        list(linked_fields),
+                        aio.AsyncAirtableTable(linked_table_api)
+                        if async_fetch
+                        else None,
+                    ),
+                    derived,
+                )
+            )
+
         self.columns = dict(
-            columns, id=String(filters=[Equal], exact=True), createdTime=ISODateTime()
+            columns,
+            id=String(filters=[Equal], exact=True),
+            createdTime=ISODateTime(order=Order.ANY),
+            **derived_columns,
+        )
+        self._parsers = {
+            column_name: compile_parser(field)
+            for column_name, field in self.columns.items()
+        }
+        self._parsers["rowid"] = RowID().parse
+        # The values of columns missing from a record, where not NULL (checkboxes)
+        self._missing_values = {
+            column_name: self._parsers[column_name](None)
+            for column_name, field in self.columns.items()
+            if isinstance(field, Checkbox)
+        }
+
+        self._mirror = (
+            get_mirror(
+                base_id,
+                table,
+                self._table_api,
+                # Deletions are found by fetching as little as possible
+                id_fields=get_airtable_fields(
+                    (), self._field_names, self._minimal_field
+                ),
+                sync_interval=sync_interval,
+            )
+            if sync_interval is not None
+            else None
         )
 
+        if collect_stats and self._get_stats() is None:
+            # Counting the rows only needs the ids
+            set_table_stats(
+                base_id,
+                table,
+                TableStats(
+                    sum(
+                        len(page)
+                        for page in self._table_api.iterate(
+                            fields=get_airtable_fields(
+                                (), self._field_names, self._minimal_field
+                            )
+                        )
+                    )
+                ),
+            )
+
+    def _get_linked_table_metadata(self, link_field: str) -> TableMetadata:
+        base_metadata = cast(BaseMetadata, self.base_metadata)
+        table_metadata = _get_table_by_name(self.table, base_metadata=base_metadata)
+        for column in table_metadata["columns"]:
+            if column["name"] == link_field:
+                linked_table_id = column.get("options", {}).get("linkedTableId")
+                if linked_table_id in base_metadata:
+                    return base_metadata[linked_table_id]
+                raise ValueError(f"Not a link to another table: {link_field}")
+        raise ValueError(f"Unknown link field: {link_field}")
+
+    def _peek_field_values(self, peek_rows: Optional[int]) -> Dict[str, List[Any]]:
+        # This introspects the just first row in the table.
+        if peek_rows is None or peek_rows == 1:
+            return {k: [v] for k, v in self._table_api.first()["fields"].items()}
+
+        # Or peek at specified number of rows
+        # We have an explicit type check here as the Airtable API
+        # just ignores the value if it isn't valid.
+        if not isinstance(peek_rows, int):
+            raise TypeError(f"peek_rows should be an int. Got: {type(peek_rows)}")
+
+        field_values = defaultdict(list)
+        for row in self._table_api.all(max_records=peek_rows):
+            for k, v in row["fields"].items():
+                field_values[k].append(v)
+        return field_values
+
     @staticmethod
     def supports(uri: str, fast: bool = True, **kwargs: Any) -> Optional[bool]:
         # TODO the slow path here could connect to the Airtable API
@@ -166,44 +472,626 @@ class AirtableAdapter(Adapter):
     def get_columns(self) -> Dict[str, Field]:
         return self.columns
 
+    def _get_fields(
+        self, requested_columns: Optional[Collection[str]]
+    ) -> Optional[List[str]]:
+        if requested_columns is None:
+            if self.strict_col:
+                # Every field is a column so there is nothing to project away
+                return None
+            # We still drop the fields that were not seen when guessing columns
+            requested_columns = self._field_names
+        elif self._link_fields:
+            # Derived columns come from their link field
+            requested_columns = set(requested_columns) | {
+                link_field
+                for column_name, link_field in self._link_fields.items()
+                if column_name in requested_columns
+            }
+
+        fields = get_airtable_fields(
+            requested_columns, self._field_names, self._minimal_field
+        )
+        if not fields or (self.strict_col and len(fields) == len(self._field_names)):
+            return None
+        return fields
+
+    def _use_shards(self, sort: List[str], limit: Optional[int]) -> bool:
+        # Shards are fetched concurrently which loses any ordering / limit
+        return len(self.shard_formulas) > 1 and not sort and limit is None
+
+    def _fetch_pages(
+        self,
+        sort: List[str],
+        formula: Optional[str],
+        fields: Optional[List[str]],
+        limit: Optional[int],
+    ) -> Iterator[Page]:
+        options = _get_options(fields, limit)
+
+        if self._use_shards(sort, limit):
+            shard_formulas = [
+                AND_BETTER(shard_formula, formula) if formula else shard_formula
+                for shard_formula in self.shard_formulas
+            ]
+            depth = self.prefetch_pages or len(self.shard_formulas)
+            if self._async_table is not None:
+                return aio.merge(
+                    [
+                        self._async_table.iterate(
+                            query_stats=self._query_stats,
+                            formula=shard_formula,
+                            **options,
+                        )
+                        for shard_formula in shard_formulas
+                    ],
+                    depth,
+                )
+            return merge(
+                [
+                    self._table_api.iterate(
+                        query_stats=self._query_stats, formula=shard_formula, **options
+                    )
+                    for shard_formula in shard_formulas
+                ],
+                depth,
+            )
+
+        if self.prefetch_pages and self._async_table is not None:
+            return aio.merge(
+                [
+                    self._async_table.iterate(
+                        query_stats=self._query_stats,
+                        sort=sort,
+                        formula=formula,
+                        **options,
+                    )
+                ],
+                self.prefetch_pages,
+            )
+
+        pages = self._table_api.iterate(
+            query_stats=self._query_stats, sort=sort, formula=formula, **options
+        )
+        if self.prefetch_pages:
+            return prefetch(pages, self.prefetch_pages)
+        return pages
+
+    def _get_pages(
+        self,
+        sort: List[str],
+        formula: Optional[str],
+        fields: Optional[List[str]],
+        limit: Optional[int],
+    ) -> Iterator[Page]:
+        if self._page_cache is None:
+            yield from self._fetch_pages(sort, formula, fields, limit)
+            return
+
+        key = get_cache_key(
+            self.base_id,
+            self.table,
+            formula,
+            sort,
+            fields,
+            limit,
+            api_key=self._table_api.api_key,
+            api_url=self._table_api.API_URL,
+        )
+        cached_pages = self._page_cache.get(key)
+        if cached_pages is not None:
+            yield from cached_pages
+            return
+
+        pages = []
+        for page in self._fetch_pages(sort, formula, fields, limit):
+            pages.append(page)
+            yield page
+        # Only complete results are cached
+        self._page_cache.set(key, pages)
+
+    def _get_row(self, result: AirtableRecord) -> Dict[str, Any]:
+        return dict(
+            {
+                k: v
+                for k, v in result["fields"].items()
+                if self.strict_col or k in self.columns
+            },
+            id=result["id"],
+            createdTime=result["createdTime"],
+        )
+
+    def _fetch_row_pages(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        limit: Optional[int],
+        requested_columns: Optional[Collection[str]],
+        extra_formula: Optional[str],
+    ) -> Iterator[Iterator[Dict[str, Any]]]:
+        """
+        Yield the rows matching the query, grouped by page.
+
+        ``extra_formula`` is a raw Airtable formula that rows must also match. As it
+        can't be evaluated locally, it is always sent to Airtable.
+        """
+        if self._mirror is not None and extra_formula is None:
+            rows: Iterator[Dict[str, Any]] = (
+                row
+                for row in map(self._get_row, self._mirror.get_records())
+                if matches(row, bounds, self.columns)
+            )
+            if order:
+                rows = iter(sort_rows(rows, order, self.columns))
+            yield from _paginate(islice(rows, limit))
+            return
+
+        sort = get_airtable_sort(order, self._sort_aliases)
+
+        # Long IN lists are split across several formulas
+        formulas: List[Optional[str]] = (
+            list(get_airtable_formulas(bounds)) if bounds else [None]
+        )
+        if extra_formula:
+            formulas = [
+                AND_BETTER(formula, extra_formula) if formula else extra_formula
+                for formula in formulas
+            ]
+
+        fields = self._get_fields(requested_columns)
+
+        if len(formulas) == 1:
+            yield from self._fetch_formula_row_pages(sort, formulas[0], fields, limit)
+            return
+
+        if self._async_table is not None and self._page_cache is None and limit is None:
+            # Every formula is fetched in full, so they are fetched concurrently
+            rows = (
+                row
+                for page in aio.merge(
+                    [
+                        self._async_table.iterate(
+                            query_stats=self._query_stats,
+                            sort=sort,
+                            formula=formula,
+                            **_get_options(fields, None),
+                        )
+                        for formula in formulas
+                    ],
+                    len(formulas),
+                )
+                for row in map(self._get_row, page)
+            )
+        else:
+            rows = (
+                row
+                for formula in formulas
+                for page in self._fetch_formula_row_pages(sort, formula, fields, limit)
+                for row in page
+            )
+        if order:
+            # Each formula's results are sorted, but not across formulas
+            rows = iter(sort_rows(rows, order, self.columns))
+        yield from _paginate(islice(rows, limit))
+
+    def _fetch_formula_row_pages(
+        self,
+        sort: List[str],
+        formula: Optional[str],
+        fields: Optional[List[str]],
+        limit: Optional[int],
+    ) -> Iterator[Iterator[Dict[str, Any]]]:
+        if (
+            self._page_cache is None
+            and not self.prefetch_pages
+            and not self._use_shards(sort, limit)
+        ):
+            # Records are decoded straight into rows as they are consumed
+            yield from self._table_api.iterate_rows(
+                query_stats=self._query_stats,
+                sort=sort,
+                formula=formula,
+                **_get_options(fields, limit),
+            )
+            return
+
+        for page in self._get_pages(sort, formula, fields, limit):
+            yield map(self._get_row, page)
+
+    def _get_row_pages(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        limit: Optional[int],
+        offset: Optional[int],
+        requested_columns: Optional[Collection[str]],
+        extra_formula: Optional[str] = None,
+    ) -> Iterator[Iterator[Dict[str, Any]]]:
+        """
+        Like ``_fetch_row_pages``, but skipping the first ``offset`` rows.
+
+        Airtable has no offset of its own, so the skipped rows are still fetched,
+        but no more than ``limit + offset`` rows are.
+        """
+        if limit == 0:
+            return
+
+        if (
+            self._probe_memo is not None
+            and self._mirror is None
+            and extra_formula is None
+            and any(isinstance(filter_, Equal) for filter_ in bounds.values())
+        ):
+            yield from _paginate(
+                iter(self._probe(bounds, order, limit, offset, requested_columns))
+            )
+            return
+
+        pages = self._fetch_row_pages(
+            bounds,
+            order,
+            limit + offset if limit is not None and offset else limit,
+            requested_columns,
+            extra_formula,
+        )
+        if not bounds and limit is None and not offset and extra_formula is None:
+            # Full scans are free statistics
+            yield from self._observe_scan(pages, requested_columns)
+            return
+
+        remaining = offset or 0
+        for rows in pages:
+            if remaining:
+                for _ in islice(rows, remaining):
+                    remaining -= 1
+            yield rows
+
+    def _expand_row_pages(
+        self,
+        pages: Iterator[Iterator[Row]],
+        requested_columns: Optional[Collection[str]],
+    ) -> Iterator[Iterator[Row]]:
+        """Add the derived columns (that are requested) of linked records."""
+        # Captured when the query starts, as with the fetches
+        query_stats = self._query_stats
+        expansions = [
+            (link_field, linked_records, derived)
+            for link_field, linked_records, derived in self._expansions
+            if requested_columns is None
+            or any(column_name in requested_columns for column_name, _ in derived)
+        ]
+        if not expansions:
+            return pages
+
+        # The linked records of a whole page are fetched at once
+        return (
+            iter(expand_rows(list(rows), expansions, query_stats)) for rows in pages
+        )
+
+    def _is_sortable(self, order: List[Tuple[str, RequestedOrder]]) -> bool:
+        """Whether Airtable sorts the columns of ``order`` the way SQLite would."""
+        return all(
+            column_name in self._sort_aliases
+            or isinstance(self.columns[column_name], SORTABLE_FIELDS)
+            for column_name, _ in order
+        )
+
+    def _get_query_pages(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        limit: Optional[int],
+        offset: Optional[int],
+        requested_columns: Optional[Collection[str]],
+        extra_formula: Optional[str] = None,
+    ) -> Iterator[Iterator[Row]]:
+        """
+        The rows of a query (with their derived columns), grouped by page.
+
+        The sort is left to Airtable when it sorts like SQLite. Otherwise every row
+        matching ``bounds`` is fetched and sorted locally, and only then are
+        ``limit`` and ``offset`` applied.
+        """
+        if self._is_sortable(order):
+            yield from self._expand_row_pages(
+                self._get_row_pages(
+                    bounds, order, limit, offset, requested_columns, extra_formula
+                ),
+                requested_columns,
+            )
+            return
+
+        if limit == 0:
+            return
+        if requested_columns is not None:
+            requested_columns = set(requested_columns) | {
+                column_name for column_name, _ in order
+            }
+        pages = self._expand_row_pages(
+            self._get_row_pages(
+                bounds, [], None, None, requested_columns, extra_formula
+            ),
+            requested_columns,
+        )
+        rows = sort_rows((row for rows in pages for row in rows), order, self.columns)
+        start = offset or 0
+        stop = start + limit if limit is not None else None
+        yield from _paginate(islice(iter(rows), start, stop))
+
+    def _get_stats(self) -> Optional[TableStats]:
+        return get_table_stats(self.base_id, self.table, ttl=self.stats_ttl)
+
+    def _observe_scan(
+        self,
+        pages: Iterator[Iterator[Row]],
+        requested_columns: Optional[Collection[str]] = None,
+    ) -> Iterator[Iterator[Row]]:
+        """
+        Pass through the pages of a full scan, collecting the table's statistics.
+
+        The rows are always counted, but the distinct values of the columns fetched
+        are only collected with ``collect_stats``, as that costs more than parsing.
+        """
+        scan_stats = ScanStats(
+            [
+                column_name
+                for column_name in self.columns
+                if column_name not in self._link_fields
+                and (requested_columns is None or column_name in requested_columns)
+            ]
+            if self.collect_stats
+            else []
+        )
+
+        def observe(rows: Iterator[Row]) -> Iterator[Row]:
+            for row in rows:
+                scan_stats.add(row)
+                yield row
+
+        for rows in pages:
+            yield observe(rows)
+        # Only complete scans are counted
+        set_table_stats(self.base_id, self.table, scan_stats.finish(self._get_stats()))
+
+    def _probe(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        limit: Optional[int],
+        offset: Optional[int],
+        requested_columns: Optional[Collection[str]],
+    ) -> List[Row]:
+        """Answer a point lookup from the query's memo, fetching it if needed."""
+        memo = cast(ProbeMemo, self._probe_memo)
+        start = offset or 0
+        fetch_limit = start + limit if limit is not None else None
+
+        if memo.should_prefetch:
+            memo.set_table_rows(
+                [
+                    row
+                    for rows in self._observe_scan(
+                        self._fetch_row_pages({}, [], None, None, None)
+                    )
+                    for row in rows
+                ]
+            )
+        table_rows = memo.get_table_rows()
+        if table_rows is not None:
+            rows = [row for row in table_rows if matches(row, bounds, self.columns)]
+            if order:
+                rows = sort_rows(rows, order, self.columns)
+            return rows[start:fetch_limit]
+
+        key = json.dumps(
+            [
+                get_airtable_formula(bounds),
+                get_airtable_sort(order),
+                fetch_limit,
+                sorted(requested_columns) if requested_columns is not None else None,
+            ]
+        )
+        rows_or_none = memo.get(key)
+        if rows_or_none is None:
+            rows = [
+                row
+                for page in self._fetch_row_pages(
+                    bounds, order, fetch_limit, requested_columns, None
+                )
+                for row in page
+            ]
+            memo.set(key, rows)
+        else:
+            rows = rows_or_none
+        return rows[start:]
+
+    def _start_query(self) -> QueryStats:
+        """
+        Start counting the requests (pages...) of a query.
+
+        Fetches capture the query when they start, so interleaved queries (e.g. the
+        two sides of a self join) are still told apart.
+        """
+        query_stats = self._query_stats = start_query(self.base_id, self.table)
+        return query_stats
+
+    def _finish_query(self, query_stats: QueryStats) -> None:
+        if self._query_stats is query_stats:
+            self._query_stats = None
+        finish_query(query_stats)
+
+    def _get_data(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        requested_columns = kwargs.get("requested_columns")
+        for rows in self._get_query_pages(
+            bounds, order, limit, offset, requested_columns
+        ):
+            yield from rows
+
     def get_data(
         self,
         bounds: Dict[str, Filter],
         order: List[Tuple[str, RequestedOrder]],
         limit: Optional[int] = None,
+        offset: Optional[int] = None,
         **kwargs: Any,
     ) -> Iterator[Dict[str, Any]]:
-        sort = get_airtable_sort(order)
+        query_stats = self._start_query()
+        count = 0
+        try:
+            for row in self._get_data(bounds, order, limit, offset, **kwargs):
+                count += 1
+                yield row
+        finally:
+            query_stats.add(rows=count)
+            self._finish_query(query_stats)
 
-        if bounds:
-            formula = get_airtable_formula(bounds)
-        else:
-            formula = None
-
-        options = {}
-        if limit is not None:
-            options["max_records"] = limit
-
-        # Pass fields here
-        for page in self._table_api.iterate(sort=sort, formula=formula, **options):
-            for result in page:
-                yield dict(
-                    {
-                        k: v
-                        for k, v in result["fields"].items()
-                        if self.strict_col or k in self.columns
-                    },
-                    id=result["id"],
-                    createdTime=result["createdTime"],
+    def get_batches(
+        self,
+        bounds: Optional[Dict[str, Filter]] = None,
+        order: Optional[List[Tuple[str, RequestedOrder]]] = None,
+        limit: Optional[int] = None,
+        requested_columns: Optional[Collection[str]] = None,
+        formula: Optional[str] = None,
+        offset: Optional[int] = None,
+    ) -> Iterator[ColumnBatch]:
+        """
+        Yield the results one ``ColumnBatch`` per page, rather than one row at a time.
+
+        This is meant for consumers that can take columns directly (e.g. a pandas
+        or Arrow export), skipping the per-row dicts of ``get_rows``. ``formula`` is
+        an additional, raw, Airtable formula to filter on.
+        """
+        columns = {
+            column_name: field
+            for column_name, field in self.columns.items()
+            if requested_columns is None or column_name in requested_columns
+        }
+        query_stats = self._start_query()
+        count = 0
+        parse_seconds = 0.0
+        try:
+            for rows in self._get_query_pages(
+                bounds or {}, order or [], limit, offset, requested_columns, formula
+            ):
+                # The records of the page are decoded as the batch is built
+                start, json_seconds = time.perf_counter(), query_stats.json_seconds
+                batch = build_batch(rows, columns, self._parsers)
+                parse_seconds += time.perf_counter() - start
+                parse_seconds -= query_stats.json_seconds - json_seconds
+
+                count += batch.num_rows
+                # Pages can be emptied by the offset
+                if batch.num_rows:
+                    yield batch
+        finally:
+            query_stats.add(rows=count, parse_seconds=parse_seconds)
+            self._finish_query(query_stats)
+
+    def get_count(
+        self,
+        bounds: Optional[Dict[str, Filter]] = None,
+        formula: Optional[str] = None,
+    ) -> int:
+        """
+        Count the rows matching ``bounds`` (and the raw Airtable ``formula``).
+
+        Only the record ids (and the smallest field) are fetched.
+        """
+        query_stats = self._start_query()
+        try:
+            count = sum(
+                1
+                for rows in self._get_row_pages(
+                    bounds or {}, [], None, None, (), formula
                 )
+                for _ in rows
+            )
+            query_stats.add(rows=count)
+            return count
+        finally:
+            self._finish_query(query_stats)
+
+    def get_aggregate(
+        self,
+        function: str,
+        column: str,
+        bounds: Optional[Dict[str, Filter]] = None,
+        formula: Optional[str] = None,
+    ) -> Any:
+        """
+        Aggregate a column (``COUNT``, ``SUM``, ``AVG``, ``MIN`` or ``MAX``) over the
+        rows matching ``bounds`` (and the raw Airtable ``formula``).
+
+        Only ``column`` is fetched. Like SQL, NULLs are ignored.
+        """
+        aggregate = AGGREGATES.get(function.upper())
+        if aggregate is None:
+            raise ValueError(f"Unsupported aggregate: {function}")
+        if column not in self.columns:
+            raise ValueError(f"Unknown column: {column}")
+
+        return aggregate(
+            value
+            for batch in self.get_batches(
+                bounds, requested_columns=[column], formula=formula
+            )
+            for value in batch.columns[column]
+            if value is not None
+        )
+
+    def get_rows(
+        self,
+        bounds: Dict[str, Filter],
+        order: List[Tuple[str, RequestedOrder]],
+        **kwargs: Any,
+    ) -> Iterator[Row]:
+        # Same as the base class but with the parsers compiled once per table
+        parsers = self._parsers
+        missing_values = self._missing_values
+        query_stats = self._start_query()
+        count = 0
+        parse_seconds = 0.0
+        try:
+            for row in self._get_data(bounds, order, **kwargs):
+                start = time.perf_counter()
+                parsed_row = {
+                    column_name: parsers[column_name](value)
+                    for column_name, value in row.items()
+                    if column_name in parsers
+                }
+                if missing_values:
+                    parsed_row = dict(missing_values, **parsed_row)
+                parse_seconds += time.perf_counter() - start
+                count += 1
+                yield parsed_row
+        finally:
+            query_stats.add(rows=count, parse_seconds=parse_seconds)
+            self._finish_query(query_stats)
 
     def get_cost(
         self,
         filtered_columns: List[Tuple[str, Operator]],
         order: List[Tuple[str, RequestedOrder]],
     ) -> float:
+        # This is called when planning a statement, so a new query is starting
+        if self._probe_memo is not None:
+            self._probe_memo.clear()
+        for _, linked_records, _ in self._expansions:
+            linked_records.clear()
+
         # Most of the cost here will come from network fetching / overhead
+        stats = self._get_stats()
+        if stats is not None:
+            return stats.estimate_cost(filtered_columns)
 
+        # Without statistics, we fall back to a rough ranking
         if ("id", Operator.EQ) in filtered_columns:
             # We assume if it's = id, then there will be 0/1 result
             return 100
@@ -0,0 +1,42 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# -----------------------------------------------------------------------------
+# Aggregates over the (non-NULL) values of a column, with SQL's semantics for
+# empty input.
+
+
+def _count(values: Iterable[Any]) -> int:
+    return sum(1 for _ in values)
+
+
+def _sum(values: Iterable[Any]) -> Optional[Any]:
+    total = None
+    for value in values:
+        total = value if total is None else total + value
+    return total
+
+
+def _avg(values: Iterable[Any]) -> Optional[float]:
+    count = 0
+    total = 0.0
+    for value in values:
+        count += 1
+        total += value
+    return total / count if count else None
+
+
+def _min(values: Iterable[Any]) -> Optional[Any]:
+    return min(values, default=None)
+
+
+def _max(values: Iterable[Any]) -> Optional[Any]:
+    return max(values, default=None)
+
+
+AGGREGATES: Dict[str, Callable[[Iterable[Any]], Any]] = {
+    "COUNT": _count,
+    "SUM": _sum,
+    "AVG": _avg,
+    "MIN": _min,
+    "MAX": _max,
+}
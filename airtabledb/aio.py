@@ -0,0 +1,295 @@
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import requests  # type: ignore[import]
+
+from .client import (
+    TOO_MANY_REQUESTS,
+    AirtableTable,
+    _get_retry_after,
+    get_credentials_hash,
+)
+from .decoder import PageDecoder
+from .instrumentation import QueryStats
+from .types import Page
+
+try:
+    import aiohttp  # type: ignore[import]
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+# -----------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# -----------------------------------------------------------------------------
+# A process-wide event loop, running in a background thread, lets synchronous
+# code (e.g. get_data, driven by SQLite) fetch concurrently.
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop async fetches run on, starting it if needed."""
+    global _loop, _thread
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="airtabledb-loop", daemon=True
+            )
+            thread.start()
+            _loop, _thread = loop, thread
+        return _loop
+
+
+def shutdown() -> None:
+    """
+    Close the aiohttp sessions and stop the event loop, joining its thread.
+
+    This is called at exit. A later async fetch starts a new loop.
+    """
+    global _loop, _thread
+
+    with _loop_lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None or thread is None:
+        return
+
+    asyncio.run_coroutine_threadsafe(_close_aiohttp_sessions(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+atexit.register(shutdown)
+
+
+def run(coroutine: Awaitable[T]) -> T:
+    """Run ``coroutine`` on the event loop, blocking until it is done."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+async def _new_queue(depth: int) -> "asyncio.Queue[Tuple[Any, Any]]":
+    # On Python 3.7 a queue is bound to the loop it is created on
+    return asyncio.Queue(maxsize=depth)
+
+
+def merge(
+    iterators: Sequence[AsyncIterator[T]], depth: int
+) -> Generator[T, None, None]:
+    """
+    Iterate over each of ``iterators`` concurrently, on the event loop.
+
+    The async counterpart of ``prefetch.merge``: items are yielded in the order
+    they are produced and at most ``depth`` are buffered. Errors are re-raised
+    to the consumer, and the iterators are cancelled if it stops early.
+    """
+    if depth < 1:
+        raise ValueError(f"depth should be at least 1. Got: {depth}")
+
+    loop = get_event_loop()
+    buffer = run(_new_queue(depth))
+
+    async def produce(items: AsyncIterator[T]) -> None:
+        try:
+            async for item in items:
+                await buffer.put((item, None))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as ex:
+            await buffer.put((None, ex))
+            return
+        await buffer.put((_DONE, None))
+
+    producers: List["Future[None]"] = [
+        asyncio.run_coroutine_threadsafe(produce(items), loop) for items in iterators
+    ]
+
+    remaining = len(iterators)
+    try:
+        while remaining:
+            item, error = asyncio.run_coroutine_threadsafe(buffer.get(), loop).result()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        # Lets the producers exit if the consumer stops early (e.g. LIMIT)
+        for producer in producers:
+            producer.cancel()
+
+
+# -----------------------------------------------------------------------------
+
+# Only used from the event loop, so there is no lock. The sessions are bound to
+# the loop, and closed with it by shutdown.
+_aiohttp_sessions: Dict[Tuple[str, str], Any] = {}
+
+
+def _get_aiohttp_session(api_key: str, base_id: str) -> Any:
+    """The aiohttp counterpart of ``client.get_session``, shared by the base."""
+    key = (get_credentials_hash(api_key), base_id)
+    session = _aiohttp_sessions.get(key)
+    if session is None:
+        session = _aiohttp_sessions[key] = aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {api_key}"}
+        )
+    return session
+
+
+async def _close_aiohttp_sessions() -> None:
+    sessions = list(_aiohttp_sessions.values())
+    _aiohttp_sessions.clear()
+    for session in sessions:
+        await session.close()
+
+
+class AsyncAirtableTable:
+    """
+    Lists the records of a table from the event loop.
+
+    With ``aiohttp`` installed requests are sent from the loop itself, otherwise
+    each is sent (with ``AirtableTable``) from a worker thread. Either way they
+    are paced by, and retried with, the table's (shared, per base) rate limiter.
+    """
+
+    def __init__(self, table: AirtableTable) -> None:
+        self.table = table
+
+    async def _send_aiohttp(
+        self, url: str, params: Dict[str, Any], query_stats: Optional[QueryStats]
+    ) -> str:
+        loop = asyncio.get_event_loop()
+        # Like requests, leaving out the parameters that are None (e.g. no formula)
+        query: List[Tuple[str, str]] = [
+            (key, str(item))
+            for key, value in params.items()
+            if value is not None
+            for item in (value if isinstance(value, list) else [value])
+        ]
+
+        attempt = 0
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.table.rate_limiter.reserve())
+            sent = loop.time()
+            session = _get_aiohttp_session(self.table.api_key, self.table.base_id)
+            async with session.get(
+                url, params=query, timeout=aiohttp.ClientTimeout(self.table.timeout)
+            ) as response:
+                body = await response.read()
+                # The body is only read once
+                text = await response.text()
+            throttled = response.status == TOO_MANY_REQUESTS
+            if query_stats is not None:
+                query_stats.add(
+                    requests=1,
+                    throttled=int(throttled),
+                    bytes_received=len(body),
+                    request_seconds=loop.time() - sent,
+                    throttle_seconds=sent - start,
+                )
+
+            if throttled and attempt < self.table.max_retries:
+                delay = _get_retry_after(response)
+                if delay is None:
+                    delay = self.table.retry_backoff * 2**attempt
+                self.table.rate_limiter.penalize(delay)
+                attempt += 1
+                continue
+
+            if response.status >= 400:
+                raise requests.HTTPError(
+                    f"{response.status} Error for url: {response.url} [Error: {text}]"
+                )
+            return text
+
+    async def _send_threaded(
+        self, url: str, params: Dict[str, Any], query_stats: Optional[QueryStats]
+    ) -> str:
+        response = await asyncio.get_event_loop().run_in_executor(
+            None,
+            lambda: self.table._send(
+                "get", url, params=params, query_stats=query_stats
+            ),
+        )
+        if not response.ok:
+            # This raises with the error from Airtable
+            self.table._process_response(response)
+        return response.text
+
+    async def iterate(
+        self, query_stats: Optional[QueryStats] = None, **options: Any
+    ) -> AsyncIterator[Page]:
+        """The async counterpart of ``AirtableTable.iterate``."""
+        table = self.table
+        params = table._options_to_params(**options)
+        url = table.get_table_url(table.base_id, table.table_name)
+        send = self._send_aiohttp if aiohttp is not None else self._send_threaded
+        formula = options.get("formula")
+        _logger.debug("Listing %s with filterByFormula: %s", table.table_name, formula)
+        if query_stats is not None:
+            query_stats.add_formula(formula)
+
+        while True:
+            page = PageDecoder(await send(url, params, query_stats))
+            records = list(page.records())
+            if query_stats is not None:
+                query_stats.add(
+                    pages=1,
+                    records_decoded=page.decoded,
+                    json_seconds=page.decode_seconds,
+                )
+            yield records
+
+            if not page.offset:
+                break
+            params["offset"] = page.offset
+
+
+async def _fetch_all(table: AsyncAirtableTable, options: Dict[str, Any]) -> Page:
+    return [record async for page in table.iterate(**options) for record in page]
+
+
+def fetch_tables(tables: Sequence[AirtableTable], **options: Any) -> List[Page]:
+    """
+    Fetch the records of several tables concurrently (e.g. ahead of a join).
+
+    ``options`` (``fields``, ``formula``...) apply to every table. Tables on the
+    same base share its rate limit.
+    """
+
+    async def fetch() -> List[Page]:
+        return list(
+            await asyncio.gather(
+                *(_fetch_all(AsyncAirtableTable(table), options) for table in tables)
+            )
+        )
+
+    return run(fetch())
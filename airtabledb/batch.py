@@ -0,0 +1,116 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from shillelagh.fields import Field
+
+from .fields import AirtableFloat, Checkbox, Parser
+
+# -----------------------------------------------------------------------------
+
+Values = Union["array[float]", List[Any]]
+
+# -----------------------------------------------------------------------------
+
+
+class Column:
+    """
+    The values of one column of a batch, plus a bitmap of which of them are NULL.
+
+    ``AirtableFloat`` columns are held in an ``array("d")`` (with NULLs stored as
+    ``0.0``); all other columns are held in a list.
+    """
+
+    def __init__(self, values: Values, nulls: bytearray) -> None:
+        self.values = values
+        self.nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def is_null(self, index: int) -> bool:
+        return bool(self.nulls[index >> 3] & (1 << (index & 7)))
+
+    def __getitem__(self, index: int) -> Any:
+        return None if self.is_null(index) else self.values[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.__getitem__, range(len(self.values)))
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+
+class ColumnBatch:
+    """A page of results, held column by column."""
+
+    def __init__(self, columns: Dict[str, Column], num_rows: int) -> None:
+        self.columns = columns
+        self.num_rows = num_rows
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def to_pydict(self) -> Dict[str, List[Any]]:
+        return {
+            column_name: column.to_list()
+            for column_name, column in self.columns.items()
+        }
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield the batch row by row, for consumers that need rows (e.g. SQLite)."""
+        names = list(self.columns)
+        return (dict(zip(names, values)) for values in zip(*self.columns.values()))
+
+
+# -----------------------------------------------------------------------------
+
+
+def build_batch(
+    rows: Iterable[Dict[str, Any]],
+    columns: Dict[str, Field],
+    parsers: Dict[str, Parser],
+) -> ColumnBatch:
+    """
+    Decode ``rows`` (as returned by Airtable) into a ``ColumnBatch`` of ``columns``.
+
+    Each value is parsed with the column's parser, and written straight into the
+    column's buffer.
+    """
+    # name -> (parser, values, nulls, placeholder for NULL values, missing value)
+    buffers: Dict[str, Tuple[Parser, Values, bytearray, Any, Any]] = {}
+    for column_name, field in columns.items():
+        parse = parsers[column_name]
+        # Missing checkboxes are unchecked, anything else missing is NULL
+        missing = parse(None) if isinstance(field, Checkbox) else None
+        if isinstance(field, AirtableFloat):
+            buffers[column_name] = (parse, array("d"), bytearray(), 0.0, missing)
+        else:
+            buffers[column_name] = (parse, [], bytearray(), None, missing)
+
+    num_rows = 0
+    for row in rows:
+        byte, bit = num_rows >> 3, 1 << (num_rows & 7)
+        for column_name, (
+            parse,
+            values,
+            nulls,
+            placeholder,
+            missing,
+        ) in buffers.items():
+            if bit == 1:
+                nulls.append(0)
+            value = row.get(column_name)
+            value = parse(value) if value is not None else missing
+            if value is None:
+                nulls[byte] |= bit
+                value = placeholder
+            values.append(value)
+        num_rows += 1
+
+    return ColumnBatch(
+        {
+            column_name: Column(values, nulls)
+            for column_name, (_, values, nulls, _, _) in buffers.items()
+        },
+        num_rows,
+    )
@@ -0,0 +1,203 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import get_credentials_hash
+from .registry import Registry
+from .types import Page
+
+# -----------------------------------------------------------------------------
+
+MEMORY_CACHE = "memory"
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# -----------------------------------------------------------------------------
+
+
+def get_cache_key(
+    base_id: str,
+    table: str,
+    formula: Optional[str],
+    sort: List[str],
+    fields: Optional[List[str]],
+    limit: Optional[int],
+    *,
+    api_key: str,
+    api_url: Optional[str] = None,
+) -> str:
+    # Caches are shared by every connection, whatever its API key
+    credentials = get_credentials_hash(api_key, api_url)
+    return json.dumps([credentials, base_id, table, formula, sort, fields, limit])
+
+
+class PageCache(ABC):
+    """
+    A cache of the pages fetched for a query, with a TTL and LRU eviction.
+
+    ``max_bytes`` is measured on the JSON encoding of the pages.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[Page]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, pages: List[Page]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class MemoryPageCache(PageCache):
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        super().__init__(ttl, max_bytes)
+
+        # key -> (stored at, size, pages), oldest use first
+        self._entries: "OrderedDict[str, Tuple[float, int, List[Page]]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Page]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, size, pages = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._size -= size
+                return None
+
+            self._entries.move_to_end(key)
+            return pages
+
+    def set(self, key: str, pages: List[Page]) -> None:
+        size = len(json.dumps(pages))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+
+            self._entries[key] = (time.monotonic(), size, pages)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class SQLitePageCache(PageCache):
+    """A ``PageCache`` stored in a SQLite file so it outlives the process."""
+
+    def __init__(self, path: str, ttl: float, max_bytes: int) -> None:
+        super().__init__(ttl, max_bytes)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, "
+                "pages TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[List[Page]]:
+        # Wall clock time as entries are shared across processes
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT pages, stored_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            pages_raw, stored_at = row
+            if now - stored_at > self.ttl:
+                self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                return None
+
+            self._connection.execute(
+                "UPDATE pages SET used_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(pages_raw)
+
+    def set(self, key: str, pages: List[Page]) -> None:
+        pages_raw = json.dumps(pages)
+        size = len(pages_raw)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (key, pages_raw, size, now, now),
+            )
+            # Evict the least recently used entries until we fit
+            (total,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+            for evict_key, evict_size in self._connection.execute(
+                "SELECT key, size FROM pages ORDER BY used_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._connection.execute(
+                    "DELETE FROM pages WHERE key = ?", (evict_key,)
+                )
+                total -= evict_size
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM pages")
+
+
+# -----------------------------------------------------------------------------
+
+_page_caches: Registry[str, PageCache] = Registry("page cache")
+
+
+def get_page_cache(
+    location: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None
+) -> PageCache:
+    """
+    Return the process-wide page cache for a location, creating it if needed.
+
+    ``location`` is either ``"memory"`` or the path to a SQLite file. ``ttl`` and
+    ``max_bytes`` are only used when the cache is created.
+    """
+
+    def create() -> PageCache:
+        kwargs: Dict[str, Any] = dict(
+            ttl=ttl if ttl is not None else DEFAULT_TTL,
+            max_bytes=max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES,
+        )
+        if location == MEMORY_CACHE:
+            return MemoryPageCache(**kwargs)
+        return SQLitePageCache(location, **kwargs)
+
+    return _page_caches.get_or_create(location, create, ttl=ttl, max_bytes=max_bytes)
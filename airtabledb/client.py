@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests  # type: ignore[import]
+from pyairtable import Table
+from requests.adapters import HTTPAdapter  # type: ignore[import]
+
+from .decoder import PageDecoder
+from .instrumentation import QueryStats
+from .registry import Registry
+from .throttle import TokenBucket
+from .types import AirtableRecord
+
+# -----------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+# Airtable makes us wait 30 seconds after a 429, which these defaults cover
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 1.0
+
+TOO_MANY_REQUESTS = 429
+
+# Matches the requests default
+DEFAULT_POOL_SIZE = 10
+
+# Airtable's largest (and default) page size
+PAGE_SIZE = 100
+
+# -----------------------------------------------------------------------------
+
+# By the hash of the API key (the session sends it) and the base
+_sessions: Registry[Tuple[str, str], requests.Session] = Registry("session")
+
+
+def get_session(
+    api_key: str, base_id: str, pool_size: Optional[int] = None
+) -> requests.Session:
+    """
+    Return the process-wide session for a base, creating it if needed.
+
+    Sharing the session lets every table (and connection) on the base reuse the
+    same keep-alive connections. ``pool_size`` is only used when the session is
+    created.
+    """
+
+    def create() -> requests.Session:
+        session = requests.Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size or DEFAULT_POOL_SIZE
+            ),
+        )
+        return session
+
+    return _sessions.get_or_create(
+        (get_credentials_hash(api_key), base_id), create, pool_size=pool_size
+    )
+
+
+def get_credentials_hash(api_key: str, api_url: Optional[str] = None) -> str:
+    """
+    Identify the API key (and API) something was fetched with, without the key.
+
+    Anything shared across connections (e.g. cached pages) is scoped by this, as
+    each API key may see different bases, tables and records.
+    """
+    return hashlib.sha256(f"{api_url or ''}\n{api_key}".encode()).hexdigest()
+
+
+def _get_retry_after(response) -> Optional[float]:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        # This might be an HTTP date, which we don't bother with
+        return None
+
+
+class AirtableTable(Table):
+    """A ``Table`` whose requests are paced by a (possibly shared) rate limiter."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_id: str,
+        table_name: str,
+        *,
+        rate_limiter: TokenBucket,
+        session: Optional[requests.Session] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        api_url: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(api_key, base_id, table_name, **kwargs)
+
+        # e.g. a local stand-in for the API
+        if api_url is not None:
+            self.API_URL = api_url
+
+        if session is not None:
+            self.session = session
+            self._update_api_key(api_key)
+
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # pyairtable sleeps after every page; the rate limiter replaces that
+        self.API_LIMIT = 0
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params=None,
+        json_data=None,
+        query_stats: Optional[QueryStats] = None,
+    ):
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            self.rate_limiter.acquire()
+            sent = time.perf_counter()
+            response = self.session.request(
+                method, url, params=params, json=json_data, timeout=self.timeout
+            )
+            throttled = response.status_code == TOO_MANY_REQUESTS
+            if query_stats is not None:
+                query_stats.add(
+                    requests=1,
+                    throttled=int(throttled),
+                    bytes_received=len(response.content),
+                    request_seconds=time.perf_counter() - sent,
+                    throttle_seconds=sent - start,
+                )
+            if not throttled or attempt >= self.max_retries:
+                return response
+
+            # The penalty applies to the whole base so we hold off every caller
+            # sharing the rate limiter, not just this one.
+            delay = _get_retry_after(response)
+            if delay is None:
+                delay = self.retry_backoff * 2**attempt
+            self.rate_limiter.penalize(delay)
+            attempt += 1
+
+    def _request(self, method: str, url: str, params=None, json_data=None):
+        return self._process_response(
+            self._send(method, url, params=params, json_data=json_data)
+        )
+
+    def _iterate_pages(
+        self,
+        base_id: str,
+        table_name: str,
+        query_stats: Optional[QueryStats] = None,
+        **options,
+    ) -> Iterator[PageDecoder]:
+        params = self._options_to_params(**options)
+        table_url = self.get_table_url(base_id, table_name)
+        formula = options.get("formula")
+        _logger.debug("Listing %s with filterByFormula: %s", table_name, formula)
+        if query_stats is not None:
+            query_stats.add_formula(formula)
+        while True:
+            response = self._send(
+                "get", table_url, params=params, query_stats=query_stats
+            )
+            if not response.ok:
+                # This raises with the error from Airtable
+                self._process_response(response)
+
+            page = PageDecoder(response.text)
+            try:
+                yield page
+                page.finish()
+            finally:
+                if query_stats is not None:
+                    query_stats.add(
+                        pages=1,
+                        records_decoded=page.decoded,
+                        json_seconds=page.decode_seconds,
+                    )
+
+            if not page.offset:
+                break
+            params["offset"] = page.offset
+
+    def _iterate(
+        self,
+        base_id: str,
+        table_name: str,
+        query_stats: Optional[QueryStats] = None,
+        **options,
+    ):
+        for page in self._iterate_pages(
+            base_id, table_name, query_stats=query_stats, **options
+        ):
+            yield list(page.records())
+
+    def iterate(
+        self, query_stats: Optional[QueryStats] = None, **options
+    ) -> Iterator[List[AirtableRecord]]:
+        # Table.iterate calls ApiAbstract._iterate, bypassing ours (and sleeping
+        # between pages on top of the rate limiter)
+        return self._iterate(
+            self.base_id, self.table_name, query_stats=query_stats, **options
+        )
+
+    def iterate_rows(
+        self, query_stats: Optional[QueryStats] = None, **options
+    ) -> Iterator[Iterator[Dict[str, Any]]]:
+        """
+        Like ``iterate`` but each page lazily decodes its records into rows (with
+        ``id`` and ``createdTime``), as they are consumed.
+
+        Like ``iterate``, requests and pages are counted in ``query_stats``.
+        """
+        for page in self._iterate_pages(
+            self.base_id, self.table_name, query_stats=query_stats, **options
+        ):
+            yield page.rows()
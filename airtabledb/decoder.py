@@ -0,0 +1,107 @@
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from .types import AirtableRecord
+
+# -----------------------------------------------------------------------------
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+RECORDS_KEY = "records"
+OFFSET_KEY = "offset"
+
+# -----------------------------------------------------------------------------
+
+
+class PageDecoder:
+    """
+    Incrementally decode a page (``{"records": [...], "offset": ...}``) of results.
+
+    Records are decoded one at a time, as they are consumed, rather than building
+    the whole response tree up front. ``offset`` is known once the records have
+    been consumed.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.offset: Optional[str] = None
+        self.done = False
+        # Records decoded so far, and the time spent decoding them
+        self.decoded = 0
+        self.decode_seconds = 0.0
+
+        self._records = self._decode()
+
+    def _skip(self, pos: int) -> int:
+        match = _whitespace.match(self.text, pos)
+        return match.end() if match is not None else pos
+
+    def _expect(self, pos: int, char: str) -> int:
+        pos = self._skip(pos)
+        if self.text[pos : pos + 1] != char:
+            raise ValueError(f"Expected {char!r} at position {pos}")
+        return pos + 1
+
+    def _decode(self) -> Iterator[AirtableRecord]:
+        text = self.text
+        pos = self._expect(0, "{")
+
+        pos = self._skip(pos)
+        if text[pos : pos + 1] == "}":
+            self.done = True
+            return
+
+        while True:
+            key, pos = _decoder.raw_decode(text, self._skip(pos))
+            pos = self._skip(self._expect(pos, ":"))
+
+            if key == RECORDS_KEY:
+                pos = self._expect(pos, "[")
+                pos = self._skip(pos)
+                if text[pos : pos + 1] == "]":
+                    pos += 1
+                else:
+                    while True:
+                        start = time.perf_counter()
+                        record, pos = _decoder.raw_decode(text, self._skip(pos))
+                        self.decode_seconds += time.perf_counter() - start
+                        self.decoded += 1
+                        yield record
+                        pos = self._skip(pos)
+                        if text[pos : pos + 1] == "]":
+                            pos += 1
+                            break
+                        pos = self._expect(pos, ",")
+            else:
+                value, pos = _decoder.raw_decode(text, pos)
+                if key == OFFSET_KEY:
+                    self.offset = value
+
+            pos = self._skip(pos)
+            if text[pos : pos + 1] == "}":
+                break
+            pos = self._expect(pos, ",")
+
+        self.done = True
+
+    def records(self) -> Iterator[AirtableRecord]:
+        return self._records
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Decode each record straight into a row, merging id / createdTime into the
+        (freshly decoded, so not shared) ``fields`` dict rather than copying it.
+        """
+        for record in self._records:
+            row = record["fields"]
+            row["id"] = record["id"]
+            row["createdTime"] = record["createdTime"]
+            yield row
+
+    def finish(self) -> None:
+        """Decode any records that were not consumed, so ``offset`` is known."""
+        for _ in self._records:
+            pass
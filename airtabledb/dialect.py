@@ -4,27 +4,37 @@ import urllib.parse
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Collection,
     Dict,
     List,
     Optional,
     Sequence,
     Tuple,
+    TypeVar,
     Union,
+    cast,
 )
 
 from shillelagh.backends.apsw.dialects.base import APSWDialect
 
+from . import materialize
+from .metadata import fetch_base_metadata
+from .throttle import get_rate_limiter
 from .types import BaseMetadata
 
 if TYPE_CHECKING:
+    from shillelagh.backends.apsw.db import Connection as DBAPIConnection
     from sqlalchemy.engine import Connection
+    from sqlalchemy.engine.interfaces import ExecutionContext
     from sqlalchemy.engine.url import URL
 
 # -----------------------------------------------------------------------------
 
 ADAPTER_NAME = "airtable"
 
+T = TypeVar("T")
+
 # -----------------------------------------------------------------------------
 
 
@@ -46,6 +56,52 @@ def extract_query_host(
     return {}, url.host
 
 
+def _get_query_param(
+    url_query: Dict[str, Union[str, Sequence[str]]],
+    name: str,
+    parse: Callable[[str], T],
+) -> Optional[T]:
+    if name not in url_query:
+        return None
+
+    value_raw = url_query[name]
+    # The last value wins if the param is repeated
+    if not isinstance(value_raw, str):
+        value_raw = value_raw[-1]
+    return parse(value_raw)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+def _get_list_query_param(
+    url_query: Dict[str, Union[str, Sequence[str]]], name: str
+) -> List[str]:
+    value_raw = url_query.get(name, [])
+    if isinstance(value_raw, str):
+        return [value_raw]
+    return list(value_raw)
+
+
+def _parse_expand(values: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    # "table.link_field:field,field" to add the fields of the linked records
+    expand: Dict[str, Dict[str, List[str]]] = {}
+    for value in values:
+        link, _, fields = value.partition(":")
+        table, _, link_field = link.partition(".")
+        if not link_field or not fields:
+            raise ValueError(f"expand should be table.link_field:fields. Got: {value}")
+        expand.setdefault(table, {})[link_field] = fields.split(",")
+    return expand
+
+
+def _parse_materialize(value: str) -> Tuple[str, List[str]]:
+    # "table" or "table:column,column" to index the columns
+    table, _, columns = value.partition(":")
+    return table, [column for column in columns.split(",") if column]
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -98,23 +154,137 @@ class APSWAirtableDialect(APSWDialect):
             raise ValueError("Both password and airtable_api_key were provided")
 
         url_query, url_host = extract_query_host(url)
-        peek_rows = None
-        if "peek_rows" in url_query:
-            peek_rows_raw = url_query["peek_rows"]
-            if not isinstance(peek_rows_raw, str):
-                peek_rows_raw = peek_rows_raw[-1]
-            peek_rows = int(peek_rows_raw)
+        api_key = self.airtable_api_key or url.password
+        # The root of the API (e.g. a local stand-in), including the version
+        api_url = _get_query_param(url_query, "api_url", str)
+
+        # Fetch the Tables and Fields (with types) in a single call rather than
+        # peeking at rows
+        if (
+            _get_query_param(url_query, "metadata_api", _parse_bool)
+            and self.base_metadata is None
+        ):
+            if not api_key or url_host is None:
+                raise ValueError("metadata_api requires an API key and a base")
+            self.base_metadata = fetch_base_metadata(
+                str(api_key), url_host, api_url=api_url
+            )
+
+        peek_rows = _get_query_param(url_query, "peek_rows", int)
+        # Number of pages to fetch ahead of the query in a background thread
+        prefetch_pages = _get_query_param(url_query, "prefetch_pages", int)
+        # Number of disjoint shards to fetch concurrently on unordered scans
+        shards = _get_query_param(url_query, "shards", int)
+        # Fetch shards, pages ahead and IN chunks concurrently on an event loop
+        async_fetch = _get_query_param(url_query, "async_fetch", _parse_bool)
+        # Requests per second allowed on the base, shared by every adapter
+        rate_limit = _get_query_param(url_query, "rate_limit", float)
+        # Number of times to retry a request that was throttled (429)
+        max_retries = _get_query_param(url_query, "max_retries", int)
+        # Size of the connection pool shared by every adapter on the base
+        pool_size = _get_query_param(url_query, "pool_size", int)
+        # Either "memory" or the path of a SQLite file to cache pages in
+        cache = _get_query_param(url_query, "cache", str)
+        cache_ttl = _get_query_param(url_query, "cache_ttl", float)
+        cache_max_bytes = _get_query_param(url_query, "cache_max_bytes", int)
+        # Keep a local mirror of each table, checking for changes at most this often
+        sync_interval = _get_query_param(url_query, "sync_interval", float)
+        # Path of a file to persist the guessed column types in
+        schema_cache = _get_query_param(url_query, "schema_cache", str)
+        schema_cache_ttl = _get_query_param(url_query, "schema_cache_ttl", float)
+        # A Field (e.g. a CREATED_TIME() formula) to sort on for createdTime
+        created_time_field = _get_query_param(url_query, "created_time_field", str)
+        # Repeated point lookups (e.g. from joins) within a query are memoized
+        probe_ttl = _get_query_param(url_query, "probe_ttl", float)
+        probe_prefetch_threshold = _get_query_param(
+            url_query, "probe_prefetch_threshold", int
+        )
+        probe_max_bytes = _get_query_param(url_query, "probe_max_bytes", int)
+        # Count the rows of each table up front so queries are planned with them
+        collect_stats = _get_query_param(url_query, "collect_stats", _parse_bool)
+        stats_ttl = _get_query_param(url_query, "stats_ttl", float)
+        # Fields of linked records to add as columns, fetched in batches
+        expand = _parse_expand(_get_list_query_param(url_query, "expand"))
+
+        # Create the rate limiter up front. Adapter kwargs are pickled so the
+        # adapters look up this same instance by base.
+        if url_host is not None:
+            get_rate_limiter(url_host, rate_limit)
 
         # At some point we might have args
         adapter_kwargs = {
             ADAPTER_NAME: {
-                "api_key": self.airtable_api_key or url.password,
+                "api_key": api_key,
                 "base_id": url_host,
                 "base_metadata": self.base_metadata,
                 "peek_rows": peek_rows,
                 "date_columns": self.date_columns,
+                "prefetch_pages": prefetch_pages,
+                "shards": shards,
+                "rate_limit": rate_limit,
+                "max_retries": max_retries,
+                "pool_size": pool_size,
+                "cache": cache,
+                "cache_ttl": cache_ttl,
+                "cache_max_bytes": cache_max_bytes,
+                "sync_interval": sync_interval,
+                "schema_cache": schema_cache,
+                "schema_cache_ttl": schema_cache_ttl,
+                "created_time_field": created_time_field,
+                "probe_ttl": probe_ttl,
+                "probe_prefetch_threshold": probe_prefetch_threshold,
+                "probe_max_bytes": probe_max_bytes,
+                "collect_stats": bool(collect_stats),
+                "stats_ttl": stats_ttl,
+                "api_url": api_url,
+                "async_fetch": bool(async_fetch),
+                "expand": expand or None,
             }
         }
 
         # this seems gross, esp the path override. unclear why memory has to be set here
         return args, {**kwargs, "path": ":memory:", "adapter_kwargs": adapter_kwargs}
+
+    def on_connect_url(self, url: URL) -> Optional[Callable[[Any], None]]:
+        do_on_connect = super().on_connect_url(url)
+
+        url_query, _ = extract_query_host(url)
+        # Tables to copy into native SQLite tables on each new connection
+        tables = [
+            _parse_materialize(value)
+            for value in _get_list_query_param(url_query, "materialize")
+        ]
+        if not tables:
+            return do_on_connect
+        ttl = _get_query_param(url_query, "materialize_ttl", float)
+        # Either ":memory:" or the path of a SQLite file to keep the copies in
+        path = _get_query_param(url_query, "materialize_path", str)
+
+        def on_connect(connection: Any) -> None:
+            if do_on_connect is not None:
+                do_on_connect(connection)
+            for table, indexes in tables:
+                materialize.materialize(
+                    connection,
+                    table,
+                    indexes=indexes,
+                    ttl=ttl,
+                    path=path or materialize.MEMORY_PATH,
+                )
+
+        return on_connect
+
+    def _refresh_stale(self, context: Optional[ExecutionContext]) -> None:
+        if context is not None:
+            dbapi_connection = context.root_connection.connection.dbapi_connection
+            materialize.refresh_stale(cast("DBAPIConnection", dbapi_connection))
+
+    def do_execute(
+        self,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Optional[ExecutionContext] = None,
+    ) -> None:
+        self._refresh_stale(context)
+        super().do_execute(cursor, statement, parameters, context)
@@ -0,0 +1,233 @@
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from shillelagh.fields import Field
+from shillelagh.filters import Filter
+from shillelagh.typing import RequestedOrder
+
+from .adapter import AirtableAdapter
+from .batch import ColumnBatch
+from .fields import AirtableFloat
+from .types import BaseMetadata
+
+if TYPE_CHECKING:
+    import pandas as pd  # type: ignore[import]
+    import pyarrow as pa  # type: ignore[import]
+
+# -----------------------------------------------------------------------------
+
+
+def _get_adapter_and_columns(
+    base_id: str,
+    table: str,
+    columns: Optional[Sequence[str]],
+    api_key: str,
+    base_metadata: Optional[BaseMetadata],
+    peek_rows: Optional[int],
+    date_columns: Optional[Dict[str, Any]],
+    adapter_kwargs: Dict[str, Any],
+) -> Tuple[AirtableAdapter, Dict[str, Field]]:
+    adapter = AirtableAdapter(
+        table,
+        base_id=base_id,
+        api_key=api_key,
+        base_metadata=base_metadata,
+        peek_rows=peek_rows,
+        date_columns=date_columns,
+        **adapter_kwargs,
+    )
+
+    if columns is None:
+        return adapter, adapter.get_columns()
+
+    unknown = [column for column in columns if column not in adapter.columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}")
+    return adapter, {column: adapter.columns[column] for column in columns}
+
+
+def _get_batches(
+    base_id: str,
+    table: str,
+    columns: Optional[Sequence[str]],
+    formula: Optional[str],
+    *,
+    api_key: str,
+    bounds: Optional[Dict[str, Filter]],
+    order: Optional[List[Tuple[str, RequestedOrder]]],
+    limit: Optional[int],
+    base_metadata: Optional[BaseMetadata],
+    peek_rows: Optional[int],
+    date_columns: Optional[Dict[str, Any]],
+    adapter_kwargs: Dict[str, Any],
+) -> Tuple[Dict[str, Field], List[ColumnBatch]]:
+    adapter, fields = _get_adapter_and_columns(
+        base_id,
+        table,
+        columns,
+        api_key,
+        base_metadata,
+        peek_rows,
+        date_columns,
+        adapter_kwargs,
+    )
+    batches = list(
+        adapter.get_batches(
+            bounds, order, limit, requested_columns=list(fields), formula=formula
+        )
+    )
+    return fields, batches
+
+
+def _to_arrow_array(
+    pa: Any, field: Field, batches: List[ColumnBatch], name: str
+) -> Any:
+    if isinstance(field, AirtableFloat):
+        # The float buffers are used as is; our NULL bitmap is the inverse of
+        # Arrow's validity bitmap (same bit order)
+        return pa.chunked_array(
+            [
+                pa.Array.from_buffers(
+                    pa.float64(),
+                    len(batch),
+                    [
+                        pa.py_buffer(
+                            bytes(byte ^ 0xFF for byte in batch.columns[name].nulls)
+                        ),
+                        pa.py_buffer(batch.columns[name].values),
+                    ],
+                )
+                for batch in batches
+            ],
+            type=pa.float64(),
+        )
+
+    values = [value for batch in batches for value in batch.columns[name]]
+    if field.type == "TEXT":
+        # Text columns may hold numbers (e.g. lookups), which Arrow can't mix
+        values = [
+            value if value is None or isinstance(value, str) else str(value)
+            for value in values
+        ]
+        return pa.array(values, type=pa.string())
+    return pa.array(values)
+
+
+def read_arrow_table(
+    base_id: str,
+    table: str,
+    columns: Optional[Sequence[str]] = None,
+    formula: Optional[str] = None,
+    *,
+    api_key: str,
+    bounds: Optional[Dict[str, Filter]] = None,
+    order: Optional[List[Tuple[str, RequestedOrder]]] = None,
+    limit: Optional[int] = None,
+    base_metadata: Optional[BaseMetadata] = None,
+    peek_rows: Optional[int] = None,
+    date_columns: Optional[Dict[str, Any]] = None,
+    **adapter_kwargs: Any,
+) -> "pa.Table":
+    """
+    Read an Airtable table straight into a ``pyarrow.Table``, without going
+    through SQLite.
+
+    ``columns`` defaults to all of the columns. ``formula`` is a raw Airtable
+    formula to filter on, and is combined with any shillelagh ``bounds``. The
+    remaining arguments are those of ``AirtableAdapter``. Values of text columns
+    that aren't strings are converted with ``str``.
+    """
+    try:
+        import pyarrow as pa  # type: ignore[import]
+    except ImportError as ex:  # pragma: no cover
+        raise ImportError("read_arrow_table requires pyarrow") from ex
+
+    fields, batches = _get_batches(
+        base_id,
+        table,
+        columns,
+        formula,
+        api_key=api_key,
+        bounds=bounds,
+        order=order,
+        limit=limit,
+        base_metadata=base_metadata,
+        peek_rows=peek_rows,
+        date_columns=date_columns,
+        adapter_kwargs=adapter_kwargs,
+    )
+    return pa.table(
+        {
+            name: _to_arrow_array(pa, field, batches, name)
+            for name, field in fields.items()
+        }
+    )
+
+
+def read_table(
+    base_id: str,
+    table: str,
+    columns: Optional[Sequence[str]] = None,
+    formula: Optional[str] = None,
+    *,
+    api_key: str,
+    bounds: Optional[Dict[str, Filter]] = None,
+    order: Optional[List[Tuple[str, RequestedOrder]]] = None,
+    limit: Optional[int] = None,
+    base_metadata: Optional[BaseMetadata] = None,
+    peek_rows: Optional[int] = None,
+    date_columns: Optional[Dict[str, Any]] = None,
+    **adapter_kwargs: Any,
+) -> "pd.DataFrame":
+    """
+    Read an Airtable table straight into a ``pandas.DataFrame``, without going
+    through SQLite.
+
+    Takes the same arguments as ``read_arrow_table``, but doesn't need pyarrow.
+    Float columns are ``float64`` (with NULLs as ``NaN``); all others are
+    ``object``.
+    """
+    try:
+        import numpy as np  # type: ignore[import]
+        import pandas as pd  # type: ignore[import]
+    except ImportError as ex:  # pragma: no cover
+        raise ImportError("read_table requires pandas") from ex
+
+    fields, batches = _get_batches(
+        base_id,
+        table,
+        columns,
+        formula,
+        api_key=api_key,
+        bounds=bounds,
+        order=order,
+        limit=limit,
+        base_metadata=base_metadata,
+        peek_rows=peek_rows,
+        date_columns=date_columns,
+        adapter_kwargs=adapter_kwargs,
+    )
+
+    data: Dict[str, Any] = {}
+    for name, field in fields.items():
+        if isinstance(field, AirtableFloat):
+            values: "array[float]" = array("d")
+            nulls = []
+            for batch in batches:
+                column = batch.columns[name]
+                values.extend(column.values)
+                nulls.append(
+                    np.unpackbits(
+                        np.frombuffer(column.nulls, dtype=np.uint8), bitorder="little"
+                    )[: len(batch)]
+                )
+            series = np.frombuffer(values, dtype=np.float64).copy()
+            if nulls:
+                series[np.concatenate(nulls).astype(bool)] = np.nan
+            data[name] = series
+        else:
+            data[name] = pd.Series(
+                [value for batch in batches for value in batch.columns[name]],
+                dtype=object,
+            )
+    return pd.DataFrame(data, columns=list(fields))
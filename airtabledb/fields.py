@@ -1,8 +1,9 @@
 import json
 import math
-from typing import List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 
-from shillelagh.fields import Field, String
+from shillelagh.fields import Boolean, Field, String
 
 from .types import TypedDict
 
@@ -34,6 +35,29 @@ INF_REPRESENTATION = AirtableFloatTypeSpecial(specialValue="Infinity")
 INF_NEG_REPRESENTATION = AirtableFloatTypeSpecial(specialValue="-Infinity")
 ERROR_REPRESENTATION = AirtableFloatTypeError(error="#ERROR")
 
+# Keyed on the single (key, value) item of the representation
+FLOAT_REPRESENTATIONS: Mapping[Tuple[str, str], float] = MappingProxyType(
+    {
+        (SPECIAL_VALUE_KEY, NAN_REPRESENTATION["specialValue"]): math.nan,
+        (SPECIAL_VALUE_KEY, INF_REPRESENTATION["specialValue"]): math.inf,
+        (SPECIAL_VALUE_KEY, INF_NEG_REPRESENTATION["specialValue"]): -math.inf,
+        # We could have mapped this to None as well
+        (ERROR_VALUE_KEY, ERROR_REPRESENTATION["error"]): math.nan,
+    }
+)
+
+Parser = Callable[[Any], Any]
+
+
+def _parse_float_representation(value: Mapping[str, Any]) -> float:
+    if len(value) == 1:
+        ((k, v),) = value.items()
+        if isinstance(v, str):
+            ret = FLOAT_REPRESENTATIONS.get((k, v))
+            if ret is not None:
+                return ret
+    raise ValueError(f"Unknown float representation: {value}")
+
 
 class MaybeList(Field[AirtableInputTypes, AirtablePrimitiveTypes]):  # type: ignore
     def __init__(self, field: Field, *, allow_multiple=False, **kwargs) -> None:
@@ -103,6 +127,29 @@ class OverList(
             raise ValueError("Unable to handle list of length > 1")
 
 
+class LinkedValues(Field[List[AirtableRawInputTypes], str]):  # type: ignore
+    """
+    The values of a field across the records linked to (see ``links``), as text.
+
+    Each value is parsed and formatted by ``field`` before they are joined, so the
+    column has the same type however many records are linked to.
+    """
+
+    type = "TEXT"
+    db_api_type = "STRING"
+
+    def __init__(self, field: Field, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.field = field
+
+    def parse(self, value: Optional[List[AirtableRawInputTypes]]) -> Optional[str]:
+        if value is None:
+            return None
+        items = (self.field.format(self.field.parse(item)) for item in value)
+        return ", ".join(str(item) for item in items if item is not None) or None
+
+
 class AirtableFloat(
     Field[AirtableRawNumericInputTypes, Union[float, int]]  # type: ignore
 ):
@@ -115,20 +162,22 @@ class AirtableFloat(
         self, value: Optional[AirtableRawNumericInputTypes]
     ) -> Optional[Union[float, int]]:
         if isinstance(value, dict):
-            if value == NAN_REPRESENTATION:
-                return math.nan
-            elif value == INF_REPRESENTATION:
-                return math.inf
-            elif value == INF_NEG_REPRESENTATION:
-                return -math.inf
-            elif value == ERROR_REPRESENTATION:
-                # We could have mapped this to None as well
-                return math.nan
-            else:
-                raise ValueError(f"Unknown float representation: {value}")
+            return _parse_float_representation(value)
         return value
 
 
+class Checkbox(Boolean):
+    """
+    An Airtable checkbox.
+
+    Airtable leaves unchecked checkboxes out of records (and formulas treat them
+    as ``FALSE()``), so a missing value is unchecked rather than NULL.
+    """
+
+    def parse(self, value: Optional[bool]) -> Optional[bool]:
+        return False if value is None else value
+
+
 class AirtableScalar(
     Field[AirtableRawInputTypes, AirtablePrimitiveTypes]  # type: ignore
 ):
@@ -162,3 +211,111 @@ class AirtableScalar(
             return json.dumps(value)
         else:
             raise TypeError(f"Unknown type: {type(value)} (value: {value})")
+
+
+# -----------------------------------------------------------------------------
+# Compiled parsers do the same as ``Field.parse`` but with the dispatch on the
+# field (and its nested fields) done once, up front, rather than for every value.
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _parse_float(value: Any) -> Any:
+    if value.__class__ is dict:
+        return _parse_float_representation(value)
+    return value
+
+
+def _parse_checkbox(value: Any) -> Any:
+    return False if value is None else value
+
+
+def _parse_scalar_dict(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and (SPECIAL_VALUE_KEY in value or ERROR_VALUE_KEY in value):
+        return _parse_float_representation(value)
+    elif "id" in value:
+        # e.g. Attachments
+        return json.dumps(value)
+    raise TypeError(f"Unknown type: {type(value)} (value: {value})")
+
+
+_SCALAR_PARSERS: Mapping[type, Parser] = MappingProxyType(
+    {
+        str: _identity,
+        int: _identity,
+        float: _identity,
+        bool: _identity,
+        dict: _parse_scalar_dict,
+    }
+)
+
+
+def _parse_scalar(value: Any) -> Any:
+    if value is None:
+        return None
+    parser = _SCALAR_PARSERS.get(value.__class__)
+    if parser is None:
+        raise TypeError(f"Unknown type: {type(value)} (value: {value})")
+    return parser(value)
+
+
+# The item types OverList allows
+_LIST_ITEM_TYPES = frozenset((str, int, float, bool, dict, type(None)))
+
+
+def _compile_over_list(field: OverList) -> Parser:
+    parse_item_value = compile_parser(field.field)
+    allow_multiple = field.allow_multiple
+
+    def parse_item(value: Any) -> Any:
+        if value.__class__ not in _LIST_ITEM_TYPES:
+            raise TypeError(f"Unknown type: {type(value)}")
+        return parse_item_value(value)
+
+    def parse(value: Any) -> Any:
+        if value is None:
+            return None
+        elif value.__class__ is not list:
+            raise TypeError(f"Unknown type: {type(value)}")
+        elif len(value) == 0:
+            return None
+        elif len(value) == 1:
+            return parse_item(value[0])
+        elif allow_multiple:
+            return ", ".join([str(parse_item(v)) for v in value])
+        raise ValueError("Unable to handle list of length > 1")
+
+    return parse
+
+
+def _compile_maybe_list(field: MaybeList) -> Parser:
+    parse_scalar = compile_parser(field._scalar_handler)
+    parse_list = compile_parser(field._list_handler)
+
+    def parse(value: Any) -> Any:
+        if value is None:
+            return None
+        elif value.__class__ is list:
+            return parse_list(value)
+        return parse_scalar(value)
+
+    return parse
+
+
+def compile_parser(field: Field) -> Parser:
+    """Return a function equivalent to ``field.parse``, specialized to the field."""
+    if isinstance(field, MaybeList):
+        return _compile_maybe_list(field)
+    elif isinstance(field, OverList):
+        return _compile_over_list(field)
+    elif type(field) is AirtableFloat:
+        return _parse_float
+    elif type(field) is Checkbox:
+        return _parse_checkbox
+    elif type(field) is AirtableScalar:
+        return _parse_scalar
+    elif type(field) is String:
+        return _identity
+    return field.parse
@@ -0,0 +1,36 @@
+from typing import Any, Iterable, Set, Tuple
+
+from shillelagh.filters import Filter, Operator
+
+# -----------------------------------------------------------------------------
+
+
+class In(Filter):
+    """
+    Membership in a list of values, i.e. ``IN (...)``.
+
+    shillelagh (through SQLite) only ever passes one value at a time, so this is
+    built directly rather than from SQL operators.
+    """
+
+    operators: Set[Operator] = set()
+
+    def __init__(self, values: Iterable[Any]):
+        # Dedupe, keeping the order
+        self.values: Tuple[Any, ...] = tuple(dict.fromkeys(values))
+
+    @classmethod
+    def build(cls, operations: Set[Tuple[Operator, Any]]) -> Filter:
+        return cls(value for operator, value in operations)
+
+    def check(self, value: Any) -> bool:
+        return value in self.values
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, In):
+            return NotImplemented
+
+        return set(self.values) == set(other.values)
+
+    def __repr__(self) -> str:
+        return f"IN {self.values!r}"
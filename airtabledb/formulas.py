@@ -1,15 +1,36 @@
-from typing import Any, Dict
+import re
+import string
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple, Type
+from urllib.parse import quote_plus
 
 from pyairtable import formulas as base_formulas
 from shillelagh.filters import Equal, Filter, IsNotNull, IsNull, NotEqual, Range
 
+from .filters import In
+
 BLANK = "BLANK()"
 TRUE = "TRUE()"
 FALSE = "FALSE()"
 RECORD_ID = "RECORD_ID()"
+LAST_MODIFIED_TIME = "LAST_MODIFIED_TIME()"
 
 ID_FIELD = "id"
 
+# Airtable rejects URLs over 16k characters. This leaves room for the rest of the
+# query string (e.g. fields).
+MAX_FORMULA_LENGTH = 8000
+
+# Number of compiled formula templates (one per field and filter shape) and of
+# recent bounds -> formula results kept
+TEMPLATE_CACHE_SIZE = 1024
+FORMULA_CACHE_SIZE = 1024
+
+# Record ids are "rec" followed by random characters from this alphabet
+RECORD_ID_PREFIX = "rec"
+RECORD_ID_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
 
 def AND_BETTER(*args):
     if len(args) == 1:
@@ -17,6 +38,12 @@ def AND_BETTER(*args):
     return base_formulas.AND(*args)
 
 
+def OR_BETTER(*args):
+    if len(args) == 1:
+        return args[0]
+    return base_formulas.OR(*args)
+
+
 def NOT_EQUAL(left: Any, right: Any) -> str:
     """
     Creates an not equality assertion
@@ -47,8 +74,71 @@ def STR_CAST(left: Any) -> str:
     return '{} & ""'.format(left)
 
 
-def get_formula(field_name: str, filter: Filter) -> str:
-    if field_name == ID_FIELD:
+def REGEX_MATCH(left: Any, right: Any) -> str:
+    return "REGEX_MATCH({}, {})".format(left, right)
+
+
+def IS_AFTER(left: Any, right: Any) -> str:
+    return "IS_AFTER({}, {})".format(left, right)
+
+
+def DATETIME_PARSE(value: Any) -> str:
+    return "DATETIME_PARSE({})".format(value)
+
+
+def get_modified_since_formula(since: datetime) -> str:
+    """
+    Match the records modified (or created) after ``since``.
+
+    ``since`` should be timezone aware.
+    """
+    return IS_AFTER(
+        LAST_MODIFIED_TIME,
+        DATETIME_PARSE(base_formulas.to_airtable_value(since.isoformat())),
+    )
+
+
+def get_shard_formulas(num_shards: int) -> List[str]:
+    """
+    Split a table into ``num_shards`` disjoint shards that together cover it.
+
+    Shards are assigned on the first random character of the record id.
+    """
+    if not 1 <= num_shards <= len(RECORD_ID_ALPHABET):
+        raise ValueError(
+            f"num_shards should be between 1 and {len(RECORD_ID_ALPHABET)}. "
+            f"Got: {num_shards}"
+        )
+
+    formulas = []
+    size, extra = divmod(len(RECORD_ID_ALPHABET), num_shards)
+    start = 0
+    for i in range(num_shards):
+        end = start + size + (1 if i < extra else 0)
+        formulas.append(
+            REGEX_MATCH(
+                RECORD_ID,
+                base_formulas.to_airtable_value(
+                    f"^{RECORD_ID_PREFIX}[{RECORD_ID_ALPHABET[start:end]}]"
+                ),
+            )
+        )
+        start = end
+    return formulas
+
+
+def _get_in_terms(field_name: str, values: Sequence[Any]) -> List[str]:
+    # Each term is an equality
+    template = _compile_template(field_name, Equal.__name__, ())
+    return [_render_template(template, (value,)) for value in values]
+
+
+def _build_formula(field_name: str, filter: Filter) -> str:
+    if isinstance(filter, In):
+        if not filter.values:
+            return FALSE
+        return OR_BETTER(*_get_in_terms(field_name, filter.values))
+    elif field_name == ID_FIELD:
         if not isinstance(filter, Equal):
             raise NotImplementedError(field_name, filter)
 
@@ -107,7 +197,191 @@ def get_formula(field_name: str, filter: Filter) -> str:
         raise NotImplementedError(filter)
 
 
-def get_airtable_formula(bounds: Dict[str, Filter]) -> str:
+# -----------------------------------------------------------------------------
+# The formula of a filter is compiled into a template once per field and "shape"
+# (filter type and, for ranges, which ends are set / inclusive). Only the values
+# are escaped and filled in per call.
+
+
+class _Slot:
+    """Stands in for the value at ``index`` while compiling a template."""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+    def __str__(self) -> str:
+        return f"\x00{self.index}\x00"
+
+
+_SLOT_PATTERN = re.compile(r"\x00(\d+)\x00")
+
+# Literal parts, and the index of the value that goes between each of them
+Template = Tuple[Tuple[str, ...], Tuple[int, ...]]
+
+# By name, as mypy doesn't consider the classes hashable (for lru_cache)
+_TEMPLATE_FILTERS: Dict[str, Type[Filter]] = {
+    filter_type.__name__: filter_type
+    for filter_type in (Equal, NotEqual, Range, IsNull, IsNotNull)
+}
+
+
+def _get_shape(filter: Filter) -> Tuple[bool, ...]:
+    if isinstance(filter, Range):
+        return (
+            filter.start is not None,
+            filter.end is not None,
+            filter.include_start,
+            filter.include_end,
+            filter.start == filter.end,
+        )
+    return ()
+
+
+def _get_values(filter: Filter) -> Tuple[Any, ...]:
+    if isinstance(filter, Range):
+        return tuple(value for value in (filter.start, filter.end) if value is not None)
+    elif isinstance(filter, (Equal, NotEqual)):
+        return (filter.value,)
+    elif isinstance(filter, In):
+        return filter.values
+    return ()
+
+
+def _get_placeholder(filter_type: Type[Filter], shape: Tuple[bool, ...]) -> Filter:
+    if filter_type is Range:
+        has_start, has_end, include_start, include_end, is_point = shape
+        start = _Slot(0) if has_start else None
+        end = None
+        if has_end:
+            end = start if is_point else _Slot(1 if has_start else 0)
+        return Range(start, end, include_start, include_end)
+    elif filter_type is Equal:
+        return Equal(_Slot(0))
+    elif filter_type is NotEqual:
+        return NotEqual(_Slot(0))
+    return filter_type()
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(
+    field_name: str, filter_name: str, shape: Tuple[bool, ...]
+) -> Template:
+    filter_type = _TEMPLATE_FILTERS[filter_name]
+    # Slots aren't strings so to_airtable_value leaves them be
+    formula = _build_formula(field_name, _get_placeholder(filter_type, shape))
+    parts = _SLOT_PATTERN.split(formula)
+    return tuple(parts[::2]), tuple(int(index) for index in parts[1::2])
+
+
+def _render_template(template: Template, values: Sequence[Any]) -> str:
+    literals, indices = template
+    parts = [literals[0]]
+    for literal, index in zip(literals[1:], indices):
+        parts.append(str(base_formulas.to_airtable_value(values[index])))
+        parts.append(literal)
+    return "".join(parts)
+
+
+def get_formula(field_name: str, filter: Filter) -> str:
+    filter_name = type(filter).__name__
+    if _TEMPLATE_FILTERS.get(filter_name) is type(filter):
+        template = _compile_template(field_name, filter_name, _get_shape(filter))
+        return _render_template(template, _get_values(filter))
+    return _build_formula(field_name, filter)
+
+
+def _build_airtable_formula(bounds: Dict[str, Filter]) -> str:
     return AND_BETTER(
         *(get_formula(field_name, filter) for field_name, filter in bounds.items())
     )
+
+
+class _BoundsKey:
+    """Makes bounds hashable (if their values are) by what their formula depends on."""
+
+    def __init__(self, bounds: Dict[str, Filter]) -> None:
+        self.bounds = bounds
+        self.key = tuple(
+            (
+                field_name,
+                type(filter),
+                _get_shape(filter),
+                # 1 and 1.0 (and True) are equal but have different formulas
+                tuple((type(value), value) for value in _get_values(filter)),
+            )
+            for field_name, filter in bounds.items()
+        )
+        # Raises TypeError for unhashable values
+        self._hash = hash(self.key)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _BoundsKey) and self.key == other.key
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _get_cached_airtable_formula(bounds_key: _BoundsKey) -> str:
+    return _build_airtable_formula(bounds_key.bounds)
+
+
+def get_airtable_formula(bounds: Dict[str, Filter]) -> str:
+    try:
+        bounds_key = _BoundsKey(bounds)
+    except TypeError:
+        return _build_airtable_formula(bounds)
+    return _get_cached_airtable_formula(bounds_key)
+
+
+def _get_encoded_length(formula: str) -> int:
+    return len(quote_plus(formula))
+
+
+def get_airtable_formulas(
+    bounds: Dict[str, Filter], max_length: int = MAX_FORMULA_LENGTH
+) -> List[str]:
+    """
+    Like ``get_airtable_formula`` but splitting the values of the (largest) ``In``
+    filter across as many formulas as needed for each to stay under
+    ``max_length`` characters once URL encoded.
+
+    The union of the formulas' results is that of the single formula.
+    """
+    formula = get_airtable_formula(bounds)
+    in_bounds = [
+        (field_name, filter)
+        for field_name, filter in bounds.items()
+        if isinstance(filter, In)
+    ]
+    if not in_bounds or _get_encoded_length(formula) <= max_length:
+        return [formula]
+
+    field_name, in_filter = max(in_bounds, key=lambda bound: len(bound[1].values))
+    other_parts = [
+        get_formula(other_field_name, filter)
+        for other_field_name, filter in bounds.items()
+        if other_field_name != field_name
+    ]
+
+    def combine(terms: List[str]) -> str:
+        return AND_BETTER(*other_parts, OR_BETTER(*terms))
+
+    # Lengths add up as encoding is done character by character. Each term also
+    # takes an (encoded) comma.
+    comma_length = _get_encoded_length(",")
+    fixed_length = _get_encoded_length(combine(["", ""])) - comma_length
+
+    formulas = []
+    chunk: List[str] = []
+    chunk_length = fixed_length
+    for term in _get_in_terms(field_name, in_filter.values):
+        term_length = _get_encoded_length(term) + comma_length
+        if chunk and chunk_length + term_length > max_length:
+            formulas.append(combine(chunk))
+            chunk = []
+            chunk_length = fixed_length
+        chunk.append(term)
+        chunk_length += term_length
+    formulas.append(combine(chunk))
+    return formulas
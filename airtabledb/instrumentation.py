@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from opentelemetry import trace  # type: ignore[import]
+except ImportError:  # pragma: no cover
+    trace = None
+
+# -----------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+SPAN_NAME = "airtable.query"
+
+# The counters / timers of QueryStats, in the order they are reported
+COUNTERS = (
+    "requests",
+    "throttled",
+    "pages",
+    "bytes_received",
+    "records_decoded",
+    "rows",
+    "request_seconds",
+    "throttle_seconds",
+    "json_seconds",
+    "parse_seconds",
+)
+
+# -----------------------------------------------------------------------------
+
+
+class QueryStats:
+    """
+    Counters and timers for one query on a table, i.e. one call of ``get_rows``
+    (``get_data``, ``get_batches``...) on the adapter.
+
+    Requests may be sent from background threads (prefetching, shards) so the
+    counters are updated with ``add``.
+    """
+
+    def __init__(self, base_id: str, table: str) -> None:
+        self.base_id = base_id
+        self.table = table
+        # The filterByFormula of each listing, None when there is none
+        self.formulas: List[Optional[str]] = []
+
+        # Requests sent, including those throttled (429) and retried
+        self.requests = 0
+        self.throttled = 0
+        self.pages = 0
+        self.bytes_received = 0
+        self.records_decoded = 0
+        self.rows = 0
+        # Waiting on the API (and downloading)
+        self.request_seconds = 0.0
+        # Waiting on the (shared) rate limiter, including 429 penalties
+        self.throttle_seconds = 0.0
+        # Decoding the JSON of the pages
+        self.json_seconds = 0.0
+        # Parsing the values of the rows into Python types
+        self.parse_seconds = 0.0
+
+        self.started_at = time.monotonic()
+        self.elapsed: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._span: Any = None
+
+    def add(self, **amounts: float) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def add_formula(self, formula: Optional[str]) -> None:
+        with self._lock:
+            self.formulas.append(formula)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            base_id=self.base_id,
+            table=self.table,
+            formulas=list(self.formulas),
+            elapsed=self.elapsed,
+            **{name: getattr(self, name) for name in COUNTERS},
+        )
+
+
+QueryHook = Callable[[QueryStats], None]
+
+# -----------------------------------------------------------------------------
+
+_query_hooks: List[QueryHook] = []
+_query_hooks_lock = threading.Lock()
+
+
+def add_query_hook(hook: QueryHook) -> None:
+    """Call ``hook`` with the ``QueryStats`` of every query, once it is done."""
+    with _query_hooks_lock:
+        _query_hooks.append(hook)
+
+
+def remove_query_hook(hook: QueryHook) -> None:
+    with _query_hooks_lock:
+        _query_hooks.remove(hook)
+
+
+def start_query(base_id: str, table: str) -> QueryStats:
+    query_stats = QueryStats(base_id, table)
+    if trace is not None:
+        # Not made current: the query is a generator, consumed bit by bit
+        query_stats._span = trace.get_tracer(__name__).start_span(
+            SPAN_NAME,
+            attributes={"airtable.base_id": base_id, "airtable.table": table},
+        )
+    return query_stats
+
+
+def finish_query(query_stats: QueryStats) -> None:
+    """Report a query to the log, its span and the hooks."""
+    query_stats.elapsed = time.monotonic() - query_stats.started_at
+    _logger.debug("Query on %s: %s", query_stats.table, query_stats.to_dict())
+
+    span = query_stats._span
+    if span is not None:
+        for name in COUNTERS:
+            span.set_attribute(f"airtable.{name}", getattr(query_stats, name))
+        span.set_attribute(
+            "airtable.formulas", [formula or "" for formula in query_stats.formulas]
+        )
+        span.end()
+
+    with _query_hooks_lock:
+        hooks = list(_query_hooks)
+    for hook in hooks:
+        try:
+            hook(query_stats)
+        except Exception:
+            # Instrumentation should never fail a query
+            _logger.exception("Query hook %r failed", hook)
@@ -1,11 +1,38 @@
 from typing import Any, Dict, List, Tuple, Type
 
-from shillelagh.fields import Boolean, Field, String
+from shillelagh.fields import Boolean, Field, ISODate, ISODateTime, String
 
-from .fields import AirtableFloat, MaybeListString, OverList
+from .fields import (
+    AirtableFloat,
+    AirtableScalar,
+    Checkbox,
+    MaybeList,
+    MaybeListString,
+    OverList,
+)
 
 FieldInfo = Tuple[Type[Field], Dict[str, Any]]
 
+# The field classes that can be (de)serialized
+FIELD_CLASSES: Dict[str, Type[Field]] = {
+    field_cls.__name__: field_cls
+    for field_cls in (
+        AirtableFloat,
+        AirtableScalar,
+        Boolean,
+        Checkbox,
+        ISODate,
+        ISODateTime,
+        MaybeList,
+        MaybeListString,
+        OverList,
+        String,
+    )
+}
+
+# Marks a kwarg value that is itself a (serialized) field
+FIELD_KEY = "__field__"
+
 
 def guess_field(values: List[Any]) -> FieldInfo:
     types = set(type(v) for v in values)
@@ -19,7 +46,8 @@ def guess_field(values: List[Any]) -> FieldInfo:
             # This seems safest as there are cases where we get floats and ints
             return AirtableFloat, {}
         elif types0 is bool:
-            return Boolean, {}
+            # Only checkboxes are booleans
+            return Checkbox, {}
         elif types0 is list:
             item_field_cls, item_field_kwargs = guess_field(
                 [v for vi in values for v in vi]
@@ -39,3 +67,46 @@ def guess_field(values: List[Any]) -> FieldInfo:
     # Not totally sure when we hit this block
     # TODO(cancan101): for now, we always set allow_multiple
     return MaybeListString, {"allow_multiple": True}
+
+
+def _get_field_info(field: Field) -> FieldInfo:
+    """Recover the ``FieldInfo`` a (nested, so kwarg-less) field was built from."""
+    if isinstance(field, OverList):
+        return OverList, {"field": field.field, "allow_multiple": field.allow_multiple}
+    elif isinstance(field, MaybeListString):
+        return MaybeListString, {"allow_multiple": field._list_handler.allow_multiple}
+    elif isinstance(field, MaybeList):
+        return type(field), {
+            "field": field._scalar_handler,
+            "allow_multiple": field._list_handler.allow_multiple,
+        }
+    return type(field), {}
+
+
+def serialize_field_info(field_info: FieldInfo) -> Dict[str, Any]:
+    """Serialize a ``FieldInfo`` (e.g. from ``guess_field``) to JSON types."""
+    field_cls, field_kwargs = field_info
+    if FIELD_CLASSES.get(field_cls.__name__) is not field_cls:
+        raise TypeError(f"Unable to serialize field: {field_cls}")
+
+    return {
+        "type": field_cls.__name__,
+        "kwargs": {
+            k: (
+                {FIELD_KEY: serialize_field_info(_get_field_info(v))}
+                if isinstance(v, Field)
+                else v
+            )
+            for k, v in field_kwargs.items()
+        },
+    }
+
+
+def deserialize_field_info(value: Dict[str, Any]) -> FieldInfo:
+    field_kwargs = {}
+    for k, v in value["kwargs"].items():
+        if isinstance(v, dict) and FIELD_KEY in v:
+            nested_cls, nested_kwargs = deserialize_field_info(v[FIELD_KEY])
+            v = nested_cls(**nested_kwargs)
+        field_kwargs[k] = v
+    return FIELD_CLASSES[value["type"]], field_kwargs
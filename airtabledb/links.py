@@ -0,0 +1,151 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import aio
+from .client import AirtableTable
+from .filters import In
+from .formulas import ID_FIELD, get_airtable_formulas
+from .instrumentation import QueryStats
+from .local import Row
+from .types import Page
+
+# -----------------------------------------------------------------------------
+
+# Bounds the memory used by the linked records of a table
+MAX_LINKED_RECORDS = 10000
+
+# -----------------------------------------------------------------------------
+
+
+def get_derived_column(link_field: str, field: str) -> str:
+    """The name of the column holding ``field`` of the records linked to."""
+    return f"{link_field}.{field}"
+
+
+def _get_record_ids(value: Any) -> List[str]:
+    # Links are lists of record ids, but lookups of them may be strings
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [record_id for record_id in value if isinstance(record_id, str)]
+    return [value] if isinstance(value, str) else []
+
+
+class LinkedRecords:
+    """
+    The records of a linked table, fetched by id and remembered.
+
+    Each fetch looks up every id (of a page) not seen yet in as few requests as
+    possible: one ``OR(RECORD_ID() = ...)`` formula, split if it would be too long,
+    projected on just ``fields``.
+    """
+
+    def __init__(
+        self,
+        table: AirtableTable,
+        fields: List[str],
+        async_table: Optional[aio.AsyncAirtableTable] = None,
+        max_records: int = MAX_LINKED_RECORDS,
+    ) -> None:
+        self.table = table
+        self.fields = fields
+        self.async_table = async_table
+        self.max_records = max_records
+
+        self._records: Dict[str, Dict[str, Any]] = {}
+
+    def clear(self) -> None:
+        self._records = {}
+
+    def _fetch_pages(
+        self, formulas: List[str], query_stats: Optional[QueryStats]
+    ) -> Iterator[Page]:
+        if self.async_table is not None and len(formulas) > 1:
+            return aio.merge(
+                [
+                    self.async_table.iterate(
+                        query_stats=query_stats, formula=formula, fields=self.fields
+                    )
+                    for formula in formulas
+                ],
+                len(formulas),
+            )
+        return (
+            page
+            for formula in formulas
+            for page in self.table.iterate(
+                query_stats=query_stats, formula=formula, fields=self.fields
+            )
+        )
+
+    def fetch(
+        self, record_ids: Iterable[str], query_stats: Optional[QueryStats] = None
+    ) -> None:
+        """Fetch the records of ``record_ids`` that were not fetched yet."""
+        missing = [
+            record_id
+            for record_id in dict.fromkeys(record_ids)
+            if record_id not in self._records
+        ]
+        if not missing:
+            return
+        if len(self._records) + len(missing) > self.max_records:
+            self.clear()
+
+        formulas = get_airtable_formulas({ID_FIELD: In(missing)})
+        for page in self._fetch_pages(formulas, query_stats):
+            for record in page:
+                self._records[record["id"]] = record["fields"]
+        # Links to deleted records are not looked up again
+        for record_id in missing:
+            self._records.setdefault(record_id, {})
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(record_id)
+
+
+# The records linked to by a field, and the (derived column, field) to expose
+Expansion = Tuple[str, LinkedRecords, List[Tuple[str, str]]]
+
+
+def expand_rows(
+    rows: List[Row],
+    expansions: List[Expansion],
+    query_stats: Optional[QueryStats] = None,
+) -> List[Row]:
+    """
+    Add the derived columns of ``expansions`` to ``rows`` (e.g. a page), fetching
+    the records they link to in batches.
+
+    Each derived column holds the list of values of its field across the records
+    linked to (the link field's type then decides how it is parsed).
+    """
+    for link_field, linked_records, _ in expansions:
+        linked_records.fetch(
+            (
+                record_id
+                for row in rows
+                for record_id in _get_record_ids(row.get(link_field))
+            ),
+            query_stats,
+        )
+
+    expanded_rows = []
+    for row in rows:
+        derived: Dict[str, Any] = {}
+        for link_field, linked_records, columns in expansions:
+            records = [
+                linked_records.get(record_id)
+                for record_id in _get_record_ids(row.get(link_field))
+            ]
+            for column_name, field in columns:
+                values: List[Any] = []
+                for record in records:
+                    value = record.get(field) if record is not None else None
+                    # e.g. a multiple select, flattened across the records
+                    if isinstance(value, list):
+                        values.extend(value)
+                    elif value is not None:
+                        values.append(value)
+                derived[column_name] = values or None
+        expanded_rows.append(dict(row, **derived))
+    return expanded_rows
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+from shillelagh.fields import Field, Order
+from shillelagh.filters import Filter, IsNull
+from shillelagh.typing import RequestedOrder
+
+Row = Dict[str, Any]
+
+# -----------------------------------------------------------------------------
+# These evaluate filters / sorts on rows in storage format, for when a query is
+# answered from data we already have rather than by Airtable.
+
+
+def matches(row: Row, bounds: Dict[str, Filter], columns: Dict[str, Field]) -> bool:
+    for column_name, filter_ in bounds.items():
+        field = columns[column_name]
+        value = field.parse(row.get(column_name))
+        if isinstance(filter_, IsNull):
+            if value is not None:
+                return False
+            continue
+        # Like SQL, NULL fails every other comparison
+        if value is None:
+            return False
+        # Bounds are in storage format
+        if not filter_.check(field.format(value)):
+            return False
+    return True
+
+
+def _get_sort_key(value: Any) -> Tuple[int, Any]:
+    # Mirror SQLite: NULL < numbers < text < everything else
+    if value is None:
+        return (0, 0)
+    elif isinstance(value, (bool, int, float)):
+        return (1, value)
+    elif isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def sort_rows(
+    rows: Iterable[Row],
+    order: List[Tuple[str, RequestedOrder]],
+    columns: Dict[str, Field],
+) -> List[Row]:
+    sorted_rows = list(rows)
+    # Sorts are stable so we apply the least significant one first
+    for column_name, requested_order in reversed(order):
+
+        def get_key(row: Row, column_name=column_name) -> Tuple[int, Any]:
+            return _get_sort_key(columns[column_name].parse(row.get(column_name)))
+
+        sorted_rows.sort(key=get_key, reverse=requested_order is Order.DESCENDING)
+    return sorted_rows
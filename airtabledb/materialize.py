@@ -0,0 +1,232 @@
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Sequence
+
+import apsw
+from shillelagh.backends.apsw.db import Connection, convert_binding
+
+# -----------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+# The attached database that materialized tables live in. Unqualified names are
+# looked up in "main" first, where the virtual tables are, so a table is only
+# read from here once its virtual table is dropped.
+SCHEMA = "materialized"
+
+# In the materialized database: when (wall clock) each table was copied and how
+STATE_TABLE = "_airtabledb_materialized"
+
+MEMORY_PATH = ":memory:"
+
+# -----------------------------------------------------------------------------
+
+
+def _quote(name: str) -> str:
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+class Materialization:
+    """A table (or the rows matching ``where``) copied into a native SQLite table."""
+
+    def __init__(
+        self,
+        table: str,
+        where: Optional[str] = None,
+        parameters: Sequence[Any] = (),
+        indexes: Sequence[str] = (),
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.table = table
+        self.where = where
+        self.parameters = tuple(parameters)
+        self.indexes = tuple(indexes)
+        self.ttl = ttl
+
+        self.refreshed_at: Optional[float] = None
+
+    @property
+    def definition(self) -> str:
+        # A copy made with a different definition can't be reused
+        return json.dumps(
+            [self.where, [convert_binding(p) for p in self.parameters], self.indexes]
+        )
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        if self.refreshed_at is None:
+            return True
+        if self.ttl is None:
+            return False
+        return (now if now is not None else time.time()) - self.refreshed_at > self.ttl
+
+
+# -----------------------------------------------------------------------------
+
+# The materialized tables of a connection, by name
+Materializations = Dict[str, Materialization]
+
+_materializations: "weakref.WeakKeyDictionary[Connection, Materializations]" = (
+    weakref.WeakKeyDictionary()
+)
+_materializations_lock = threading.Lock()
+
+
+def _get_apsw_connection(connection: Connection) -> apsw.Connection:
+    """
+    The APSW connection underneath a shillelagh ``connection``.
+
+    Statements are run on it straight to SQLite: shillelagh's cursor would treat
+    dropping a table as dropping the Airtable table it comes from. shillelagh has
+    no public way to get it, so this is the one place relying on its private
+    ``_connection`` attribute.
+    """
+    return connection._connection
+
+
+def _execute(connection: Connection, sql: str, bindings: Sequence[Any] = ()) -> Any:
+    return _get_apsw_connection(connection).cursor().execute(sql, tuple(bindings))
+
+
+def attach(connection: Connection, path: str = MEMORY_PATH) -> None:
+    """
+    Attach the database materialized tables are stored in, if not done already.
+
+    ``path`` is either ``":memory:"`` or the path of a SQLite file, in which case
+    the copies outlive the connection (and are reused while fresh).
+    """
+    attached = {row[1] for row in _execute(connection, "PRAGMA database_list")}
+    if SCHEMA not in attached:
+        _execute(connection, f"ATTACH DATABASE ? AS {SCHEMA}", (path,))
+    _execute(
+        connection,
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{STATE_TABLE} ("
+        "name TEXT PRIMARY KEY, definition TEXT NOT NULL, refreshed_at REAL NOT NULL)",
+    )
+
+
+def _copy(connection: Connection, materialization: Materialization) -> None:
+    table = materialization.table
+    name = _quote(table)
+    staging = _quote(f"{table}__staging")
+
+    # Creates the virtual table if needed (shillelagh does it on "no such table")
+    connection.cursor().execute(f"SELECT * FROM main.{name} LIMIT 0")  # noqa: S608
+    # The columns keep the virtual table's types so values are converted back
+    columns = ", ".join(
+        f"{_quote(row[1])} {row[2]}"
+        for row in _execute(connection, f"PRAGMA main.table_info({name})")
+    )
+    where = f" WHERE {materialization.where}" if materialization.where else ""
+    now = time.time()
+
+    # A savepoint, as a transaction may already be open
+    _execute(connection, "SAVEPOINT airtabledb_materialize")
+    try:
+        _execute(connection, f"DROP TABLE IF EXISTS {SCHEMA}.{staging}")
+        _execute(connection, f"CREATE TABLE {SCHEMA}.{staging} ({columns})")
+        _execute(
+            connection,
+            f"INSERT INTO {SCHEMA}.{staging} "  # noqa: S608
+            f"SELECT * FROM main.{name}{where}",
+            [convert_binding(parameter) for parameter in materialization.parameters],
+        )
+        _execute(connection, f"DROP TABLE IF EXISTS {SCHEMA}.{name}")
+        _execute(connection, f"ALTER TABLE {SCHEMA}.{staging} RENAME TO {name}")
+        for column in materialization.indexes:
+            index = _quote(f"{table}__{column}")
+            _execute(
+                connection,
+                f"CREATE INDEX {SCHEMA}.{index} ON {name} ({_quote(column)})",
+            )
+        _execute(
+            connection,
+            f"INSERT OR REPLACE INTO {SCHEMA}.{STATE_TABLE} VALUES (?, ?, ?)",
+            (table, materialization.definition, now),
+        )
+        # From now on the table's name resolves to the copy
+        _execute(connection, f"DROP TABLE main.{name}")
+    except BaseException:
+        _execute(connection, "ROLLBACK TO airtabledb_materialize")
+        raise
+    finally:
+        _execute(connection, "RELEASE airtabledb_materialize")
+    materialization.refreshed_at = now
+
+
+def _get_saved_refresh(
+    connection: Connection, materialization: Materialization
+) -> Optional[float]:
+    """When a (file backed) copy with the same definition was made, if any."""
+    row = _execute(
+        connection,
+        "SELECT definition, refreshed_at "  # noqa: S608
+        f"FROM {SCHEMA}.{STATE_TABLE} WHERE name = ?",
+        (materialization.table,),
+    ).fetchone()
+    if row is None or row[0] != materialization.definition:
+        return None
+    return row[1]
+
+
+def materialize(
+    connection: Connection,
+    table: str,
+    *,
+    where: Optional[str] = None,
+    parameters: Sequence[Any] = (),
+    indexes: Sequence[str] = (),
+    ttl: Optional[float] = None,
+    path: str = MEMORY_PATH,
+) -> Materialization:
+    """
+    Copy a table (or the rows matching the SQL ``where``) into a native SQLite
+    table, indexed on ``indexes``.
+
+    Later queries on the table (on this connection) read the copy instead of
+    fetching from Airtable. The copy is refreshed with ``refresh`` or, with a
+    ``ttl`` (seconds), by ``refresh_stale`` (which the dialect calls before each
+    statement). A fresh copy already in the ``path`` file is reused.
+    """
+    attach(connection, path)
+
+    materialization = Materialization(table, where, parameters, indexes, ttl)
+    materialization.refreshed_at = _get_saved_refresh(connection, materialization)
+    if materialization.is_stale():
+        _copy(connection, materialization)
+    else:
+        # Drop the virtual table, if any, so the name resolves to the copy
+        _execute(connection, f"DROP TABLE IF EXISTS main.{_quote(table)}")
+
+    with _materializations_lock:
+        _materializations.setdefault(connection, {})[table] = materialization
+    return materialization
+
+
+def refresh(connection: Connection, table: Optional[str] = None) -> None:
+    """Copy ``table``, or every materialized table, again."""
+    with _materializations_lock:
+        materializations = dict(_materializations.get(connection, {}))
+    if table is not None:
+        materializations = {table: materializations[table]}
+
+    for materialization in materializations.values():
+        _copy(connection, materialization)
+
+
+def refresh_stale(connection: Connection) -> None:
+    """Copy again the materialized tables whose ``ttl`` has passed."""
+    with _materializations_lock:
+        materializations = list(_materializations.get(connection, {}).values())
+
+    now = time.time()
+    for materialization in materializations:
+        if not materialization.is_stale(now):
+            continue
+        try:
+            _copy(connection, materialization)
+        except apsw.LockedError:
+            # The copy is still being read (e.g. by an unconsumed result)
+            _logger.debug("Not refreshing %s: locked", materialization.table)
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional
+
+from pyairtable import Base
+from pyairtable.metadata import get_base_schema
+from shillelagh.fields import ISODate, ISODateTime, String
+
+from .fields import AirtableFloat, Checkbox, MaybeListString
+from .lib import FieldInfo
+from .types import BaseMetadata, ColumnMetadata, TableMetadata
+
+# -----------------------------------------------------------------------------
+
+# See: https://airtable.com/developers/web/api/field-model
+AIRTABLE_FIELD_TYPES: Dict[str, FieldInfo] = {
+    **{
+        field_type: (AirtableFloat, {})
+        for field_type in (
+            "autoNumber",
+            "count",
+            "currency",
+            "duration",
+            "number",
+            "percent",
+            "rating",
+        )
+    },
+    **{
+        field_type: (String, {})
+        for field_type in (
+            "email",
+            "multilineText",
+            "phoneNumber",
+            "richText",
+            "singleLineText",
+            "singleSelect",
+            "url",
+        )
+    },
+    "checkbox": (Checkbox, {}),
+    "date": (ISODate, {}),
+    **{
+        field_type: (ISODateTime, {})
+        for field_type in ("createdTime", "dateTime", "lastModifiedTime")
+    },
+}
+
+# Lists (e.g. links, lookups) and objects (e.g. attachments, collaborators)
+DEFAULT_FIELD_INFO: FieldInfo = (MaybeListString, {"allow_multiple": True})
+
+# -----------------------------------------------------------------------------
+
+
+def _get_column_metadata(field: Dict[str, Any]) -> ColumnMetadata:
+    column = ColumnMetadata(name=field["name"], type=field["type"])
+    if "options" in field:
+        column["options"] = field["options"]
+    return column
+
+
+def get_field_info(column: ColumnMetadata) -> FieldInfo:
+    field_type = column.get("type")
+    if field_type in ("formula", "rollup"):
+        # These are typed by their result
+        result = column.get("options", {}).get("result")
+        if result is not None:
+            return get_field_info(
+                _get_column_metadata(dict(result, name=column["name"]))
+            )
+
+    if field_type is None:
+        return DEFAULT_FIELD_INFO
+    return AIRTABLE_FIELD_TYPES.get(field_type, DEFAULT_FIELD_INFO)
+
+
+def get_created_time_field(columns: List[ColumnMetadata]) -> Optional[str]:
+    """
+    Find a Field holding the records' created time, which Airtable can sort on.
+
+    That is either a "Created time" Field or a ``CREATED_TIME()`` formula.
+    """
+    for column in columns:
+        field_type = column.get("type")
+        if field_type == "createdTime" or (
+            field_type == "formula"
+            and str(column.get("options", {}).get("formula", "")).strip().upper()
+            == "CREATED_TIME()"
+        ):
+            return column["name"]
+    return None
+
+
+def fetch_base_metadata(
+    api_key: str, base_id: str, api_url: Optional[str] = None
+) -> BaseMetadata:
+    """
+    Fetch the Tables and Fields (with types) of a Base in one Metadata API call.
+
+    See: https://airtable.com/developers/web/api/get-base-schema
+    """
+    base = Base(api_key, base_id)
+    if api_url is not None:
+        base.API_URL = api_url
+    base_schema = get_base_schema(base)
+    return {
+        table["id"]: TableMetadata(
+            name=table["name"],
+            columns=[_get_column_metadata(field) for field in table["fields"]],
+        )
+        for table in base_schema["tables"]
+    }
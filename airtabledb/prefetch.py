@@ -0,0 +1,78 @@
+import queue
+import threading
+from typing import Any, Iterator, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# -----------------------------------------------------------------------------
+
+# How often a blocked producer checks whether the consumer went away
+_PUT_TIMEOUT = 0.1
+
+_DONE = object()
+
+# -----------------------------------------------------------------------------
+
+
+def merge(iterators: Sequence[Iterator[T]], depth: int) -> Iterator[T]:
+    """
+    Iterate over each of ``iterators`` in its own background thread.
+
+    Items are yielded in the order they are produced, so the order across
+    iterators is not deterministic. The buffer is bounded so at most ``depth``
+    items (plus one per producer) are held in memory. Errors raised by any of the
+    ``iterators`` are re-raised to the consumer.
+    """
+    if depth < 1:
+        raise ValueError(f"depth should be at least 1. Got: {depth}")
+
+    buffer: "queue.Queue[Tuple[Any, Optional[BaseException]]]" = queue.Queue(
+        maxsize=depth
+    )
+    stop = threading.Event()
+
+    def put(item: Any, error: Optional[BaseException] = None) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put((item, error), timeout=_PUT_TIMEOUT)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def produce(items: Iterator[T]) -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as ex:
+            put(None, ex)
+            return
+        put(_DONE)
+
+    for items in iterators:
+        thread = threading.Thread(
+            target=produce, args=(items,), name="airtabledb-prefetch", daemon=True
+        )
+        thread.start()
+
+    remaining = len(iterators)
+    try:
+        while remaining:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        # Lets the producers exit if the consumer stops early (e.g. LIMIT)
+        stop.set()
+
+
+def prefetch(items: Iterator[T], depth: int) -> Iterator[T]:
+    """
+    Iterate over ``items`` in a background thread, staying up to ``depth`` ahead.
+    """
+    return merge([items], depth)
@@ -0,0 +1,98 @@
+import json
+import time
+from typing import Dict, List, Optional, Set
+
+from .local import Row
+
+# -----------------------------------------------------------------------------
+
+# How long lookups are remembered for, in case a (cached) statement is run again
+# without being planned, which is when the memo is otherwise cleared. Off by
+# default, as such a statement would otherwise get stale results.
+DEFAULT_PROBE_TTL = 0.0
+
+# Bounds the lookups tracked by the memo of a single query
+MAX_PROBES = 10000
+
+# Bounds the memory used by the memo of a single query (measured on the JSON
+# encoding of the rows)
+DEFAULT_MAX_PROBE_BYTES = 10 * 2**20
+
+# -----------------------------------------------------------------------------
+
+
+def _get_size(rows: List[Row]) -> int:
+    return len(json.dumps(rows, default=str))
+
+
+class ProbeMemo:
+    """
+    The results of the point lookups (``column = value``) made by one query.
+
+    SQLite runs nested loop joins by looking up the inner table once per outer row,
+    often with the same value. With this a lookup is remembered once it is repeated
+    (so is fetched at most twice), up to ``max_bytes`` of rows. Once more than
+    ``prefetch_threshold`` distinct lookups were made, the whole table is fetched
+    (once), and the remaining lookups answered from it.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        prefetch_threshold: Optional[int] = None,
+        max_bytes: int = DEFAULT_MAX_PROBE_BYTES,
+    ) -> None:
+        self.ttl = ttl
+        self.prefetch_threshold = prefetch_threshold
+        self.max_bytes = max_bytes
+
+        self.clear()
+
+    def clear(self) -> None:
+        """Start over, e.g. for a new query."""
+        self._seen: Set[str] = set()
+        self._rows: Dict[str, List[Row]] = {}
+        self._size = 0
+        self._table_rows: Optional[List[Row]] = None
+        self._prefetched = False
+        self._started_at = time.monotonic()
+
+    def _check_ttl(self) -> None:
+        if time.monotonic() - self._started_at > self.ttl:
+            self.clear()
+
+    def get(self, key: str) -> Optional[List[Row]]:
+        self._check_ttl()
+        return self._rows.get(key)
+
+    def set(self, key: str, rows: List[Row]) -> None:
+        """Record a lookup, keeping its ``rows`` if it was made before."""
+        if key not in self._seen:
+            if len(self._seen) < MAX_PROBES:
+                self._seen.add(key)
+            return
+
+        size = _get_size(rows)
+        if self._size + size <= self.max_bytes:
+            self._rows[key] = rows
+            self._size += size
+
+    @property
+    def should_prefetch(self) -> bool:
+        return (
+            self.prefetch_threshold is not None
+            and not self._prefetched
+            and len(self._seen) >= self.prefetch_threshold
+        )
+
+    def get_table_rows(self) -> Optional[List[Row]]:
+        self._check_ttl()
+        return self._table_rows
+
+    def set_table_rows(self, rows: List[Row]) -> None:
+        # A table too big to keep is not fetched again by the same query
+        self._prefetched = True
+        size = _get_size(rows)
+        if self._size + size <= self.max_bytes:
+            self._table_rows = rows
+            self._size += size
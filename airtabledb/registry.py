@@ -0,0 +1,74 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+# -----------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# -----------------------------------------------------------------------------
+
+
+class Registry(Generic[K, V]):
+    """
+    Objects shared by the whole process (rate limiters, caches, mirrors...), by key.
+
+    An object is created by the first caller asking for its key, with that caller's
+    ``options``. Later callers get the same object: if they ask for different
+    options these are not applied, which is logged. An option left as ``None``
+    (i.e. the default) never differs. Anything that must not be shared (e.g. data
+    fetched with an API key) has to be part of the key.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+        # key -> (object, the options it was created with)
+        self._entries: Dict[K, Tuple[V, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: K, create: Callable[[], V], **options: Any) -> V:
+        """
+        Return the object for ``key``, creating it with ``create`` if needed.
+
+        ``options`` are what ``create`` builds the object with.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                value = create()
+                self._entries[key] = (value, options)
+                return value
+
+        value, created_with = entry
+        different = sorted(
+            name
+            for name, option in options.items()
+            if option is not None
+            and created_with.get(name) is not None
+            and created_with[name] != option
+        )
+        if different:
+            _logger.warning(
+                "The %s for %r already exists with other %s, which are kept",
+                self.name,
+                key,
+                ", ".join(different),
+            )
+        return value
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (value, {})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .client import get_credentials_hash
+from .lib import FieldInfo, deserialize_field_info, serialize_field_info
+from .registry import Registry
+
+# -----------------------------------------------------------------------------
+
+DEFAULT_TTL = 24 * 60 * 60.0
+
+# -----------------------------------------------------------------------------
+
+
+def _get_key(
+    base_id: str,
+    table: str,
+    peek_rows: Optional[int],
+    api_key: str,
+    api_url: Optional[str],
+) -> str:
+    # Schemas (i.e. field names) are only shared with the same credentials
+    credentials = get_credentials_hash(api_key, api_url)
+    return json.dumps([credentials, base_id, table, peek_rows])
+
+
+class SchemaCache:
+    """
+    Inferred column schemas persisted to a JSON file, with a TTL.
+
+    This lets new connections skip peeking at rows to guess the field types.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # A missing or corrupt file is just an empty cache
+            return {}
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def get(
+        self,
+        base_id: str,
+        table: str,
+        peek_rows: Optional[int],
+        *,
+        api_key: str,
+        api_url: Optional[str] = None,
+    ) -> Optional[Dict[str, FieldInfo]]:
+        key = _get_key(base_id, table, peek_rows, api_key, api_url)
+        with self._lock:
+            entry = self._read().get(key)
+        if entry is None or time.time() - entry["stored_at"] > self.ttl:
+            return None
+        return {k: deserialize_field_info(v) for k, v in entry["columns"].items()}
+
+    def set(
+        self,
+        base_id: str,
+        table: str,
+        peek_rows: Optional[int],
+        columns: Dict[str, FieldInfo],
+        *,
+        api_key: str,
+        api_url: Optional[str] = None,
+    ) -> None:
+        key = _get_key(base_id, table, peek_rows, api_key, api_url)
+        entry = {
+            "stored_at": time.time(),
+            "columns": {k: serialize_field_info(v) for k, v in columns.items()},
+        }
+        with self._lock:
+            entries = self._read()
+            entries[key] = entry
+            self._write(entries)
+
+    def invalidate(
+        self, base_id: Optional[str] = None, table: Optional[str] = None
+    ) -> None:
+        """
+        Drop the schemas for a table, every table in a base or everything (with any
+        credentials).
+        """
+        with self._lock:
+            entries = {
+                key: entry
+                for key, entry in self._read().items()
+                if not (
+                    (base_id is None or json.loads(key)[1] == base_id)
+                    and (table is None or json.loads(key)[2] == table)
+                )
+            }
+            self._write(entries)
+
+
+# -----------------------------------------------------------------------------
+
+_schema_caches: Registry[str, SchemaCache] = Registry("schema cache")
+
+
+def get_schema_cache(path: str, ttl: Optional[float] = None) -> SchemaCache:
+    """
+    Return the process-wide schema cache for a path, creating it if needed.
+
+    ``ttl`` is only used when the cache is created.
+    """
+    return _schema_caches.get_or_create(
+        path,
+        lambda: SchemaCache(path, ttl if ttl is not None else DEFAULT_TTL),
+        ttl=ttl,
+    )
@@ -0,0 +1,125 @@
+import json
+import math
+import time
+from typing import Any, Collection, Dict, Hashable, List, Optional, Set, Tuple
+
+from shillelagh.filters import Operator
+
+from .client import PAGE_SIZE
+from .local import Row
+from .registry import Registry
+
+# -----------------------------------------------------------------------------
+
+DEFAULT_STATS_TTL = 3600.0
+
+# Past this many distinct values, a column's count is extrapolated
+MAX_DISTINCT = 10000
+
+# The cost of a request relative to that of decoding a row
+REQUEST_COST = 100.0
+ROW_COST = 1.0
+
+# Without better information, assume an equality matches this fraction of rows
+EQ_SELECTIVITY = 0.1
+# and that any other filter matches this fraction of rows (as SQLite does)
+RANGE_SELECTIVITY = 1 / 3
+
+# -----------------------------------------------------------------------------
+
+
+class TableStats:
+    """
+    The number of rows of a table and, if known, the number of distinct values in
+    each of its columns.
+    """
+
+    def __init__(
+        self, row_count: int, distinct: Optional[Dict[str, int]] = None
+    ) -> None:
+        self.row_count = row_count
+        self.distinct = distinct or {}
+        self.collected_at = time.monotonic()
+
+    def estimate_rows(self, filtered_columns: List[Tuple[str, Operator]]) -> float:
+        rows = float(self.row_count)
+        for column_name, operator in filtered_columns:
+            if operator is Operator.EQ:
+                if column_name == "id":
+                    rows = min(rows, 1)
+                    continue
+                distinct = self.distinct.get(column_name)
+                rows *= 1 / distinct if distinct else EQ_SELECTIVITY
+            else:
+                rows *= RANGE_SELECTIVITY
+        return rows
+
+    def estimate_cost(self, filtered_columns: List[Tuple[str, Operator]]) -> float:
+        """Estimate the cost of fetching the rows matching ``filtered_columns``."""
+        rows = self.estimate_rows(filtered_columns)
+        requests = max(1, math.ceil(rows / PAGE_SIZE))
+        return requests * REQUEST_COST + rows * ROW_COST
+
+
+def _get_hashable(value: Any) -> Hashable:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+class ScanStats:
+    """Collect ``TableStats`` from the rows of a full scan, as they go by."""
+
+    def __init__(self, column_names: Collection[str]) -> None:
+        self.row_count = 0
+        self._values: Dict[str, Set[Hashable]] = {
+            column_name: set() for column_name in column_names
+        }
+        # column -> number of rows seen when we stopped collecting its values
+        self._saturated_at: Dict[str, int] = {}
+
+    def add(self, row: Row) -> None:
+        self.row_count += 1
+        for column_name, values in self._values.items():
+            if column_name in self._saturated_at:
+                continue
+            value = row.get(column_name)
+            if value is not None:
+                values.add(_get_hashable(value))
+                if len(values) >= MAX_DISTINCT:
+                    self._saturated_at[column_name] = self.row_count
+
+    def finish(self, previous: Optional[TableStats] = None) -> TableStats:
+        """
+        The statistics of the scan, keeping the distinct counts of ``previous`` for
+        the columns that were not collected (e.g. not fetched).
+        """
+        distinct = dict(previous.distinct) if previous is not None else {}
+        for column_name, values in self._values.items():
+            saturated_at = self._saturated_at.get(column_name)
+            distinct[column_name] = (
+                len(values) * self.row_count // saturated_at
+                if saturated_at
+                else len(values)
+            )
+        return TableStats(self.row_count, distinct)
+
+
+# -----------------------------------------------------------------------------
+
+_table_stats: Registry[Tuple[str, str], TableStats] = Registry("table statistics")
+
+
+def get_table_stats(
+    base_id: str, table: str, ttl: Optional[float] = None
+) -> Optional[TableStats]:
+    """Return the process-wide statistics of a table, if known (and recent)."""
+    stats = _table_stats.get((base_id, table))
+    ttl = ttl if ttl is not None else DEFAULT_STATS_TTL
+    if stats is None or time.monotonic() - stats.collected_at > ttl:
+        return None
+    return stats
+
+
+def set_table_stats(base_id: str, table: str, stats: TableStats) -> None:
+    _table_stats.set((base_id, table), stats)
@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pyairtable import Table
+
+from .client import get_credentials_hash
+from .formulas import get_modified_since_formula
+from .registry import Registry
+from .types import AirtableRecord
+
+# -----------------------------------------------------------------------------
+
+# Allow for clock skew between us and Airtable when picking the next watermark
+WATERMARK_SKEW = timedelta(minutes=1)
+
+# -----------------------------------------------------------------------------
+
+
+class TableMirror:
+    """
+    A local copy of a table, kept up to date with ``LAST_MODIFIED_TIME()`` deltas.
+
+    After the first full load, each refresh fetches only the records modified since
+    the last one. Deleted records are reconciled with a scan that only fetches
+    ``id_fields`` (ideally a single, small field).
+
+    Note that ``LAST_MODIFIED_TIME()`` does not change when computed fields (e.g.
+    lookups or rollups) change due to edits in other tables.
+    """
+
+    def __init__(
+        self, table_api: Table, id_fields: List[str], sync_interval: float
+    ) -> None:
+        self.table_api = table_api
+        self.id_fields = id_fields
+        self.sync_interval = sync_interval
+
+        self._records: Dict[str, AirtableRecord] = {}
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _sync(self) -> None:
+        started_at = datetime.now(timezone.utc)
+
+        if self._watermark is None:
+            self._records = {record["id"]: record for record in self.table_api.all()}
+        else:
+            id_options = {"fields": self.id_fields} if self.id_fields else {}
+            record_ids = {record["id"] for record in self.table_api.all(**id_options)}
+            for record in self.table_api.all(
+                formula=get_modified_since_formula(self._watermark)
+            ):
+                self._records[record["id"]] = record
+            self._records = {
+                record_id: record
+                for record_id, record in self._records.items()
+                if record_id in record_ids
+            }
+
+        self._watermark = started_at - WATERMARK_SKEW
+        self._synced_at = time.monotonic()
+
+    def get_records(self) -> List[AirtableRecord]:
+        """Return every record, first syncing if ``sync_interval`` has passed."""
+        with self._lock:
+            if (
+                self._synced_at is None
+                or time.monotonic() - self._synced_at >= self.sync_interval
+            ):
+                self._sync()
+            return list(self._records.values())
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next access."""
+        with self._lock:
+            self._watermark = None
+            self._synced_at = None
+
+
+# -----------------------------------------------------------------------------
+
+# By the hash of the API key / URL the records are fetched with, base and table
+_mirrors: Registry[Tuple[str, str, str], TableMirror] = Registry("table mirror")
+
+
+def get_mirror(
+    base_id: str,
+    table: str,
+    table_api: Table,
+    id_fields: List[str],
+    sync_interval: float,
+) -> TableMirror:
+    """
+    Return the process-wide mirror of a table, creating it if needed.
+
+    Each API key (and API URL) of ``table_api`` gets its own mirror. The remaining
+    arguments are only used when the mirror is created.
+    """
+    credentials = get_credentials_hash(table_api.api_key, table_api.API_URL)
+    return _mirrors.get_or_create(
+        (credentials, base_id, table),
+        lambda: TableMirror(table_api, id_fields, sync_interval),
+        id_fields=id_fields,
+        sync_interval=sync_interval,
+    )
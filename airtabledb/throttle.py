@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Optional
+
+from .registry import Registry
+from .types import TypedDict
+
+# -----------------------------------------------------------------------------
+
+# Airtable allows 5 requests per second per base:
+# https://airtable.com/developers/web/api/rate-limits
+AIRTABLE_REQUESTS_PER_SECOND = 5.0
+
+# -----------------------------------------------------------------------------
+
+
+class ThrottleStats(TypedDict):
+    requests: int
+    throttled: int
+    wait_time: float
+
+
+class TokenBucket:
+    """A thread-safe token bucket that paces callers to ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate should be positive. Got: {rate}")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._requests = 0
+        self._throttled = 0
+        self._wait_time = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token, without blocking.
+
+        Returns the number of seconds the caller should wait before using it, e.g.
+        with ``asyncio.sleep``.
+        """
+        with self._lock:
+            self._refill()
+            # Tokens may go negative; each caller then waits for its reservation
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self._requests += 1
+            self._wait_time += wait
+        return wait
+
+    def acquire(self) -> float:
+        """
+        Take a token, blocking until one is available.
+
+        Returns the number of seconds spent waiting.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, delay: float) -> None:
+        """
+        Record that the server throttled us and hold off every caller for ``delay``.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0) - delay * self.rate
+            self._throttled += 1
+
+    def stats(self) -> ThrottleStats:
+        with self._lock:
+            return ThrottleStats(
+                requests=self._requests,
+                throttled=self._throttled,
+                wait_time=self._wait_time,
+            )
+
+
+# -----------------------------------------------------------------------------
+
+_rate_limiters: Registry[str, TokenBucket] = Registry("rate limiter")
+
+
+def get_rate_limiter(base_id: str, rate: Optional[float] = None) -> TokenBucket:
+    """
+    Return the process-wide rate limiter for a base, creating it if needed.
+
+    ``rate`` is only used when the rate limiter is created.
+    """
+    return _rate_limiters.get_or_create(
+        base_id, lambda: TokenBucket(rate or AIRTABLE_REQUESTS_PER_SECOND), rate=rate
+    )
@@ -1,5 +1,5 @@
 import sys
-from typing import Dict, List
+from typing import Any, Dict, List
 
 if sys.version_info >= (3, 8):
     from typing import TypedDict
@@ -7,13 +7,28 @@ else:  # pragma: no cover
     from typing_extensions import TypedDict
 
 
-class ColumnMetadata(TypedDict):
+class _ColumnMetadataRequired(TypedDict):
     name: str
 
 
+class ColumnMetadata(_ColumnMetadataRequired, total=False):
+    # The Airtable field type, e.g. "singleLineText"
+    type: str
+    options: Dict[str, Any]
+
+
 class TableMetadata(TypedDict):
     name: str
     columns: List[ColumnMetadata]
 
 
 BaseMetadata = Dict[str, TableMetadata]
+
+
+class AirtableRecord(TypedDict):
+    id: str
+    createdTime: str
+    fields: Dict[str, Any]
+
+
+Page = List[AirtableRecord]
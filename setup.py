@@ -117,6 +117,12 @@ setup(
         "shillelagh >= 1.0.6",
         "typing-extensions",
     ),
+    extras_require={
+        "arrow": ["pyarrow"],
+        "async": ["aiohttp"],
+        "opentelemetry": ["opentelemetry-api"],
+        "pandas": ["pandas"],
+    },
     license="MIT",
     classifiers=[
         # Trove classifiers
@@ -0,0 +1,365 @@
+"""
+End-to-end throughput / latency benchmarks, against ``FakeAirtable``.
+
+Run as ``python -m tests.benchmark``. Each scenario reports rows/sec, requests
+(to the API) per query and p50 / p99 query latency.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+from urllib.parse import quote
+
+from shillelagh import filters
+from shillelagh.fields import Boolean, Field, String
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+
+from airtabledb import cache, client, schema_cache, stats, sync, throttle
+from airtabledb.decoder import PageDecoder
+from airtabledb.fields import AirtableFloat, compile_parser
+from airtabledb.formulas import _build_airtable_formula, get_airtable_formula
+from airtabledb.metadata import fetch_base_metadata
+
+from .fake_airtable import FakeAirtable, Record
+
+# -----------------------------------------------------------------------------
+
+API_KEY = "keyBENCHMARK"
+BASE_ID = "appBENCHMARK"
+
+CATEGORIES = ["hardware", "software", "books", "music", "toys"]
+
+# Run with the rate limiter (and the server) all but out of the way, by default
+DEFAULT_RATE_LIMIT = 1000.0
+
+# -----------------------------------------------------------------------------
+
+
+class Result(NamedTuple):
+    name: str
+    # Seconds taken by each query
+    latencies: List[float]
+    rows: int
+    requests: int
+
+    @property
+    def queries(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def rows_per_second(self) -> float:
+        total = sum(self.latencies)
+        return self.rows / total if total else 0.0
+
+    @property
+    def requests_per_query(self) -> float:
+        return self.requests / self.queries if self.queries else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the latencies, in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+
+def format_results(results: Sequence[Result]) -> str:
+    lines = [
+        f"{'scenario':<16}{'queries':>8}{'rows/sec':>12}"
+        f"{'req/query':>11}{'p50 ms':>10}{'p99 ms':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.name:<16}{result.queries:>8}{result.rows_per_second:>12.0f}"
+            f"{result.requests_per_query:>11.1f}"
+            f"{result.percentile(50) * 1000:>10.1f}"
+            f"{result.percentile(99) * 1000:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+# -----------------------------------------------------------------------------
+
+
+def make_items(num_rows: int, seed: int = 0) -> List[Record]:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"item{i:06d}",
+            "price": round(rng.uniform(1, 1000), 2),
+            "quantity": rng.randint(0, 100),
+            "in_stock": rng.random() < 0.8,
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(CATEGORIES, 2),
+        }
+        for i in range(num_rows)
+    ]
+
+
+def make_orders(num_rows: int, num_items: int, seed: int = 0) -> List[Record]:
+    rng = random.Random(seed + 1)
+    return [
+        {
+            "number": i,
+            "item": f"item{rng.randrange(num_items):06d}",
+            "amount": rng.randint(1, 10),
+        }
+        for i in range(num_rows)
+    ]
+
+
+def _reset_shared_state() -> None:
+    # So each scenario starts cold, as a new process would
+    stats._table_stats.clear()
+    sync._mirrors.clear()
+    schema_cache._schema_caches.clear()
+    cache._page_caches.clear()
+    throttle._rate_limiters.clear()
+    client._sessions.clear()
+
+
+def _get_url(fake: FakeAirtable, rate_limit: float, **params: object) -> str:
+    query = "&".join(
+        f"{key}={quote(str(value), safe='')}"
+        for key, value in dict(
+            api_url=fake.api_url, metadata_api="true", rate_limit=rate_limit, **params
+        ).items()
+    )
+    return f"airtable://:{API_KEY}@{BASE_ID}?{query}"
+
+
+def _measure(
+    name: str, fake: FakeAirtable, queries: Iterator[Callable[[], int]]
+) -> Result:
+    latencies = []
+    rows = 0
+    fake.reset_counts()
+    for query in queries:
+        start = time.perf_counter()
+        rows += query()
+        latencies.append(time.perf_counter() - start)
+    return Result(name, latencies, rows, fake.request_count)
+
+
+def _execute(engine: Engine, sql: str, **params: object) -> Callable[[], int]:
+    def query() -> int:
+        with engine.connect() as connection:
+            return len(list(connection.execute(text(sql), params)))
+
+    return query
+
+
+# -----------------------------------------------------------------------------
+# Scenarios
+
+
+def bench_full_scan(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    return _measure(
+        "full_scan",
+        fake,
+        (_execute(engine, "SELECT * FROM items") for _ in range(iterations)),
+    )
+
+
+def bench_sharded_scan(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    # Shards fetched concurrently on the event loop
+    sharded_engine = create_engine(f"{engine.url}&shards=4&async_fetch=true")
+    return _measure(
+        "sharded_scan",
+        fake,
+        (_execute(sharded_engine, "SELECT * FROM items") for _ in range(iterations)),
+    )
+
+
+def bench_point_lookup(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    rng = random.Random(iterations)
+    return _measure(
+        "point_lookup",
+        fake,
+        (
+            _execute(
+                engine,
+                "SELECT * FROM items WHERE name = :name",
+                name=f"item{rng.randrange(num_rows):06d}",
+            )
+            for _ in range(iterations)
+        ),
+    )
+
+
+def bench_join(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    sql = (
+        "SELECT orders.number, items.price "
+        "FROM orders JOIN items ON items.name = orders.item"
+    )
+    return _measure("join", fake, (_execute(engine, sql) for _ in range(iterations)))
+
+
+def bench_introspection(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    def query() -> int:
+        # A fresh engine, so the metadata is fetched (or peeked at) again
+        _reset_shared_state()
+        new_engine = create_engine(str(engine.url))
+        return len(inspect(new_engine).get_columns("items"))
+
+    return _measure("introspection", fake, (query for _ in range(iterations)))
+
+
+def bench_decoding(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    # No requests: just decoding pages and parsing the values, as get_rows does
+    records = [
+        {"id": f"rec{i:014d}", "createdTime": "2022-01-01T00:00:00.000Z", "fields": r}
+        for i, r in enumerate(make_items(num_rows))
+    ]
+    pages = [
+        json.dumps({"records": records[start : start + 100], "offset": "itr"})
+        for start in range(0, len(records), 100)
+    ]
+    fields: Dict[str, Field] = {
+        "name": String(),
+        "price": AirtableFloat(),
+        "quantity": AirtableFloat(),
+        "in_stock": Boolean(),
+        "category": String(),
+    }
+    parsers = {name: compile_parser(field) for name, field in fields.items()}
+
+    def query() -> int:
+        count = 0
+        for page in pages:
+            for row in PageDecoder(page).rows():
+                {name: parse(row.get(name)) for name, parse in parsers.items()}
+                count += 1
+        return count
+
+    return _measure("decoding", fake, (query for _ in range(iterations)))
+
+
+def _bench_formulas(
+    name: str,
+    build: Callable[[Dict[str, filters.Filter]], str],
+    fake: FakeAirtable,
+    iterations: int,
+    num_rows: int,
+) -> Result:
+    # No requests: the formulas of a join's point lookups, the same few repeatedly,
+    # either cached or built each time
+    bounds = [
+        {
+            "price": filters.Range(start=0, end=i, include_start=True),
+            "name": filters.Equal(f"it's {i}"),
+            "id": filters.Equal(f"rec{i:014d}"),
+        }
+        for i in range(100)
+    ]
+
+    def query() -> int:
+        for i in range(num_rows):
+            build(bounds[i % len(bounds)])
+        return num_rows
+
+    return _measure(name, fake, (query for _ in range(iterations)))
+
+
+def bench_formulas(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    return _bench_formulas("formulas", get_airtable_formula, fake, iterations, num_rows)
+
+
+def bench_formulas_built(
+    fake: FakeAirtable, engine: Engine, iterations: int, num_rows: int
+) -> Result:
+    return _bench_formulas(
+        "formulas_built", _build_airtable_formula, fake, iterations, num_rows
+    )
+
+
+SCENARIOS: Dict[str, Callable[[FakeAirtable, Engine, int, int], Result]] = {
+    "full_scan": bench_full_scan,
+    "sharded_scan": bench_sharded_scan,
+    "point_lookup": bench_point_lookup,
+    "join": bench_join,
+    "introspection": bench_introspection,
+    "decoding": bench_decoding,
+    "formulas": bench_formulas,
+    "formulas_built": bench_formulas_built,
+}
+
+
+def run_benchmarks(
+    num_rows: int = 1000,
+    iterations: int = 10,
+    *,
+    latency: float = 0.0,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    throttle_every: Optional[int] = None,
+    scenarios: Optional[Sequence[str]] = None,
+) -> List[Result]:
+    results = []
+    with FakeAirtable(
+        api_key=API_KEY, latency=latency, throttle_every=throttle_every, retry_after=0
+    ) as fake:
+        fake.add_table(BASE_ID, "items", make_items(num_rows))
+        fake.add_table(BASE_ID, "orders", make_orders(num_rows // 10 or 1, num_rows))
+        # Fail fast if the server is not reachable
+        fetch_base_metadata(API_KEY, BASE_ID, api_url=fake.api_url)
+
+        for name in scenarios or SCENARIOS:
+            _reset_shared_state()
+            engine = create_engine(_get_url(fake, rate_limit))
+            results.append(SCENARIOS[name](fake, engine, iterations, num_rows))
+        _reset_shared_state()
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000, help="rows in the table")
+    parser.add_argument("--iterations", type=int, default=10, help="queries to run")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each request"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="requests per second allowed by the client",
+    )
+    parser.add_argument(
+        "--throttle-every", type=int, help="answer every n-th request with a 429"
+    )
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS), dest="scenarios"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.rows,
+        args.iterations,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        throttle_every=args.throttle_every,
+        scenarios=args.scenarios,
+    )
+    sys.stdout.write(format_results(results) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
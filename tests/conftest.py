@@ -1,10 +1,40 @@
-from typing import Generator
+from typing import Callable, Dict, Generator, List
 
 import pytest
 import responses
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Connection, Engine
 
+from airtabledb import (
+    aio,
+    cache,
+    client,
+    instrumentation,
+    schema_cache,
+    stats,
+    sync,
+    throttle,
+)
+from airtabledb.client import AirtableTable
+from airtabledb.throttle import TokenBucket
+
+from .fake_airtable import FakeAirtable, Record
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state() -> Generator[None, None, None]:
+    # Rate limiters, sessions, caches, mirrors, statistics and hooks are shared for
+    # the whole process
+    yield
+    instrumentation._query_hooks.clear()
+    stats._table_stats.clear()
+    sync._mirrors.clear()
+    schema_cache._schema_caches.clear()
+    cache._page_caches.clear()
+    throttle._rate_limiters.clear()
+    client._sessions.clear()
+    aio.shutdown()
+
 
 @pytest.fixture
 def engine() -> Engine:
@@ -23,6 +53,53 @@ def mocked_responses() -> Generator[responses.RequestsMock, None, None]:
         yield rsps
 
 
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    """The tables (name -> records) ``fake`` serves in "base", to override."""
+    return {}
+
+
+@pytest.fixture
+def fake(fake_tables: Dict[str, List[Record]]) -> Generator[FakeAirtable, None, None]:
+    """
+    A local stand-in for the API, for the key "key", serving ``fake_tables``
+    (which can be overridden, or parametrized, by a test module).
+    """
+    with FakeAirtable(api_key="key", retry_after=0) as fake:
+        for name, records in fake_tables.items():
+            fake.add_table("base", name, records)
+        yield fake
+
+
+@pytest.fixture
+def fake_table(fake: FakeAirtable) -> Callable[[str], AirtableTable]:
+    """Make the ``AirtableTable`` of a table of ``fake``, rate limited loosely."""
+
+    def get_table(name: str = "foo") -> AirtableTable:
+        return AirtableTable(
+            "key",
+            "base",
+            name,
+            rate_limiter=TokenBucket(rate=1000),
+            retry_backoff=0,
+            api_url=fake.api_url,
+        )
+
+    return get_table
+
+
+@pytest.fixture
+def fake_engine(fake: FakeAirtable) -> Callable[[str], Engine]:
+    """Make an engine on the base of ``fake``, with more of the URL's query."""
+
+    def get_engine(query: str = "") -> Engine:
+        return create_engine(
+            f"airtable://:key@base?metadata_api=true&api_url={fake.api_url}{query}"
+        )
+
+    return get_engine
+
+
 @pytest.fixture
 def single_record(mocked_responses: responses.RequestsMock) -> responses.BaseResponse:
     return mocked_responses.add(
@@ -0,0 +1,655 @@
+"""
+A local stand-in for the Airtable API, for end-to-end tests and benchmarks.
+
+It serves the List records and Get base schema endpoints: paging (``pageSize`` /
+``offset`` / ``maxRecords``), ``fields[]``, ``sort[i]`` and the subset of
+``filterByFormula`` that ``airtabledb.formulas`` generates. Latency and ``429``
+responses can be injected. Point ``api_url`` at ``FakeAirtable.api_url``.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from airtabledb.formulas import RECORD_ID_ALPHABET, RECORD_ID_PREFIX
+
+# -----------------------------------------------------------------------------
+
+MAX_PAGE_SIZE = 100
+
+Record = Dict[str, Any]
+Evaluator = Callable[[Record], Any]
+
+# -----------------------------------------------------------------------------
+# filterByFormula
+
+
+class FormulaError(ValueError):
+    pass
+
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<field>\{(?:[^}\\]|\\.)*\})
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Z_]+)
+      | (?P<op>!=|>=|<=|=|>|<|&|\(|\)|,|-)
+    )
+    """,
+    re.VERBOSE,
+)
+_ESCAPE_PATTERN = re.compile(r"\\(.)")
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+}
+
+
+def _tokenize(formula: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    formula = formula.rstrip()
+    while pos < len(formula):
+        match = _TOKEN_PATTERN.match(formula, pos)
+        if match is None or match.lastgroup is None:
+            raise FormulaError(f"Unexpected character at position {pos}: {formula}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+    return tokens
+
+
+def _to_scalar(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    elif isinstance(value, list):
+        return ", ".join(_to_text(item) for item in value)
+    elif isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _to_text(value: Any) -> str:
+    value = _to_scalar(value)
+    if value is None:
+        return ""
+    elif isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _is_truthy(value: Any) -> bool:
+    return bool(_to_scalar(value))
+
+
+def _coerce(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Bring both sides of a comparison to the same type, as Airtable does."""
+    left, right = _to_scalar(left), _to_scalar(right)
+    if left is None and right is None:
+        return 0, 0
+    elif left is None:
+        left = "" if isinstance(right, str) else 0
+    elif right is None:
+        right = "" if isinstance(left, str) else 0
+
+    if isinstance(left, str) != isinstance(right, str):
+        try:
+            return float(left), float(right)
+        except ValueError:
+            return _to_text(left), _to_text(right)
+    return left, right
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    text = _to_text(value)
+    if not text:
+        return None
+    return datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def _is_after(left: Any, right: Any) -> bool:
+    left, right = _parse_datetime(left), _parse_datetime(right)
+    return left is not None and right is not None and left > right
+
+
+def _function(name: str, args: Sequence[Evaluator]) -> Evaluator:
+    # Conditionals evaluate their arguments lazily
+    if name == "AND":
+        return lambda record: all(_is_truthy(arg(record)) for arg in args)
+    elif name == "OR":
+        return lambda record: any(_is_truthy(arg(record)) for arg in args)
+    elif name == "IF":
+        if len(args) not in (2, 3):
+            raise FormulaError("IF takes 2 or 3 arguments")
+        condition, then = args[0], args[1]
+        otherwise = args[2] if len(args) == 3 else (lambda record: None)
+        return lambda record: (
+            then(record) if _is_truthy(condition(record)) else otherwise(record)
+        )
+
+    functions: Dict[str, Callable[..., Any]] = {
+        "TRUE": lambda record: True,
+        "FALSE": lambda record: False,
+        "BLANK": lambda record: None,
+        "NOT": lambda record, value: not _is_truthy(value),
+        "RECORD_ID": lambda record: record["id"],
+        "CREATED_TIME": lambda record: record["createdTime"],
+        "LAST_MODIFIED_TIME": lambda record: record.get(
+            "lastModifiedTime", record["createdTime"]
+        ),
+        "DATETIME_PARSE": lambda record, value: _parse_datetime(value),
+        "IS_AFTER": lambda record, left, right: _is_after(left, right),
+        "IS_BEFORE": lambda record, left, right: _is_after(right, left),
+        "REGEX_MATCH": lambda record, text, pattern: (
+            re.search(_to_text(pattern), _to_text(text)) is not None
+        ),
+        "LOWER": lambda record, value: _to_text(value).lower(),
+    }
+    if name not in functions:
+        raise FormulaError(f"Unknown function: {name}")
+    function = functions[name]
+    return lambda record: function(record, *(arg(record) for arg in args))
+
+
+class _Parser:
+    """
+    Compile a formula into a function of a record.
+
+    Comparisons bind looser than ``&`` (concatenation), which binds looser than
+    a unary minus.
+    """
+
+    def __init__(self, formula: str) -> None:
+        self.tokens = _tokenize(formula)
+        self.pos = 0
+
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None, None
+
+    def _take(self, value: Optional[str] = None) -> Tuple[str, str]:
+        if self.pos >= len(self.tokens):
+            raise FormulaError("Unexpected end of formula")
+        token = self.tokens[self.pos]
+        if value is not None and token != ("op", value):
+            raise FormulaError(f"Expected {value!r}. Got: {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Evaluator:
+        evaluator = self._comparison()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Unexpected token: {self.tokens[self.pos][1]!r}")
+        return evaluator
+
+    def _comparison(self) -> Evaluator:
+        left = self._concatenation()
+        kind, value = self._peek()
+        if kind != "op" or value not in _COMPARISONS:
+            return left
+
+        self._take()
+        right = self._concatenation()
+        compare = _COMPARISONS[str(value)]
+        return lambda record: compare(*_coerce(left(record), right(record)))
+
+    def _concatenation(self) -> Evaluator:
+        parts = [self._unary()]
+        while self._peek() == ("op", "&"):
+            self._take()
+            parts.append(self._unary())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda record: "".join(_to_text(part(record)) for part in parts)
+
+    def _unary(self) -> Evaluator:
+        if self._peek() == ("op", "-"):
+            self._take()
+            operand = self._unary()
+            return lambda record: -_coerce(operand(record), 0)[0]
+        return self._primary()
+
+    def _primary(self) -> Evaluator:
+        kind, value = self._take()
+        if kind == "field":
+            name = _ESCAPE_PATTERN.sub(r"\1", value[1:-1])
+            return lambda record: record["fields"].get(name)
+        elif kind == "string":
+            text = _ESCAPE_PATTERN.sub(r"\1", value[1:-1])
+            return lambda record: text
+        elif kind == "number":
+            number = float(value) if any(c in value for c in ".eE") else int(value)
+            return lambda record: number
+        elif kind == "name":
+            self._take("(")
+            args = []
+            if self._peek() != ("op", ")"):
+                args.append(self._comparison())
+                while self._peek() == ("op", ","):
+                    self._take()
+                    args.append(self._comparison())
+            self._take(")")
+            return _function(value, args)
+        elif (kind, value) == ("op", "("):
+            evaluator = self._comparison()
+            self._take(")")
+            return evaluator
+        raise FormulaError(f"Unexpected token: {value!r}")
+
+
+def compile_formula(formula: str) -> Evaluator:
+    """Compile a ``filterByFormula`` into a predicate on (raw) records."""
+    evaluator = _Parser(formula).parse()
+    return lambda record: _is_truthy(evaluator(record))
+
+
+# -----------------------------------------------------------------------------
+# Sorting
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Blanks sort first (ascending), then numbers, then text
+    value = _to_scalar(value)
+    if value is None or value == "":
+        return (0, 0)
+    elif isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def sort_records(records: List[Record], sort: List[Tuple[str, str]]) -> None:
+    # Stable sorts, least significant first
+    for field_name, direction in reversed(sort):
+        records.sort(
+            key=lambda record: _sort_key(record["fields"].get(field_name)),
+            reverse=direction == "desc",
+        )
+
+
+# -----------------------------------------------------------------------------
+# Server
+
+
+def _infer_field_type(values: List[Any]) -> str:
+    for value in values:
+        if isinstance(value, bool):
+            return "checkbox"
+        elif isinstance(value, (int, float)):
+            return "number"
+        elif isinstance(value, list):
+            return "multipleSelects"
+        elif isinstance(value, str):
+            return "singleLineText"
+    return "singleLineText"
+
+
+class _Table:
+    def __init__(
+        self,
+        table_id: str,
+        name: str,
+        records: List[Record],
+        fields: Optional[List[Dict[str, Any]]],
+    ) -> None:
+        self.id = table_id
+        self.name = name
+        self.records = records
+
+        if fields is None:
+            values: Dict[str, List[Any]] = {}
+            for record in records:
+                for key, value in record["fields"].items():
+                    values.setdefault(key, []).append(value)
+            fields = [
+                {"name": key, "type": _infer_field_type(field_values)}
+                for key, field_values in values.items()
+            ]
+        self.fields = [
+            dict(field, id=field.get("id", f"fld{table_id[3:]}{i:03d}"))
+            for i, field in enumerate(fields)
+        ]
+        self.field_names = {field["name"] for field in self.fields}
+
+    def get_schema(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "primaryFieldId": self.fields[0]["id"] if self.fields else None,
+            "fields": self.fields,
+            "views": [],
+        }
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, error_type: str, message: str = "") -> None:
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+        self.message = message
+
+
+class FakeAirtable:
+    """
+    A local Airtable API server, running in a background thread.
+
+    ``latency`` (seconds) is added to every request. Requests are throttled
+    (``429``) beyond ``rate_limit`` per second and / or on every
+    ``throttle_every``-th request, with a ``Retry-After`` of ``retry_after``
+    seconds (if set).
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        latency: float = 0.0,
+        rate_limit: Optional[float] = None,
+        throttle_every: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+
+        # Requests (path and query) that were served, and those throttled
+        self.requests: List[Tuple[str, Dict[str, List[str]]]] = []
+        self.throttled = 0
+
+        self._bases: Dict[str, Dict[str, _Table]] = {}
+        self._lock = threading.Lock()
+        self._received = 0
+        self._recent: Deque[float] = deque()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- setup ----------------------------------------------------------------
+
+    def add_table(
+        self,
+        base_id: str,
+        name: str,
+        records: List[Record],
+        fields: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """
+        Add a table of records and return its id.
+
+        Records are either Airtable records (``id`` / ``createdTime`` /
+        ``fields``) or just the fields, in which case the rest is made up.
+        ``fields`` is the schema (``name`` / ``type`` / ``options``) served by the
+        Metadata API; it is inferred from the records when omitted.
+        """
+        tables = self._bases.setdefault(base_id, {})
+        table_id = f"tbl{len(tables):014d}"
+        # Random (but reproducible) ids, as shards go by their first character
+        rng = random.Random(f"{base_id}/{name}")
+        normalized = [
+            record
+            if "fields" in record
+            else {
+                "id": RECORD_ID_PREFIX
+                + "".join(rng.choice(RECORD_ID_ALPHABET) for _ in range(14)),
+                "createdTime": "2022-01-01T00:00:00.000Z",
+                "fields": record,
+            }
+            for record in records
+        ]
+        tables[table_id] = _Table(table_id, name, normalized, fields)
+        return table_id
+
+    def update_record(
+        self, base_id: str, table: str, record_id: str, fields: Record
+    ) -> None:
+        """Update the fields of a record, bumping its ``LAST_MODIFIED_TIME()``."""
+        for record in self._get_table(base_id, table).records:
+            if record["id"] == record_id:
+                record["fields"].update(fields)
+                record["lastModifiedTime"] = (
+                    datetime.now(timezone.utc)
+                    .isoformat(timespec="milliseconds")
+                    .replace("+00:00", "Z")
+                )
+                return
+        raise KeyError(record_id)
+
+    def get_table_id(self, base_id: str, table: str) -> str:
+        """The id of a table, e.g. for the ``linkedTableId`` of another."""
+        return self._get_table(base_id, table).id
+
+    def get_records(self, base_id: str, table: str) -> List[Record]:
+        """The records of a table, as Airtable returns them."""
+        return self._get_table(base_id, table).records
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled = 0
+
+    @property
+    def request_count(self) -> int:
+        return len(self.requests)
+
+    @property
+    def api_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v0"
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def start(self) -> "FakeAirtable":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, as with the real API
+            protocol_version = "HTTP/1.1"
+            # Otherwise delayed ACKs add ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                status, headers, body = fake._handle(self.path, self.headers)
+                # Like Airtable, non-ASCII text is sent as is (rather than escaped)
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-airtable", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeAirtable":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # -- requests -------------------------------------------------------------
+
+    def _get_table(self, base_id: str, table: str) -> _Table:
+        tables = self._bases.get(base_id, {})
+        if table in tables:
+            return tables[table]
+        for candidate in tables.values():
+            if candidate.name == table:
+                return candidate
+        raise _HTTPError(404, "TABLE_NOT_FOUND", f"Could not find table {table}")
+
+    def _is_throttled(self) -> bool:
+        with self._lock:
+            self._received += 1
+            if self.throttle_every and self._received % self.throttle_every == 0:
+                return True
+
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return True
+                self._recent.append(now)
+        return False
+
+    def _handle(
+        self, path: str, headers: Any
+    ) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        try:
+            if (
+                self.api_key is not None
+                and headers.get("Authorization") != f"Bearer {self.api_key}"
+            ):
+                raise _HTTPError(401, "AUTHENTICATION_REQUIRED")
+
+            if self._is_throttled():
+                with self._lock:
+                    self.throttled += 1
+                retry_headers = (
+                    {"Retry-After": str(self.retry_after)}
+                    if self.retry_after is not None
+                    else {}
+                )
+                return (
+                    429,
+                    retry_headers,
+                    {"errors": [{"error": "RATE_LIMIT_REACHED", "message": ""}]},
+                )
+
+            url = urlsplit(path)
+            query = parse_qs(url.query)
+            with self._lock:
+                self.requests.append((url.path, query))
+
+            parts = [unquote(part) for part in url.path.split("/") if part]
+            if len(parts) == 5 and parts[:3] == ["v0", "meta", "bases"]:
+                if parts[4] != "tables":
+                    raise _HTTPError(404, "NOT_FOUND")
+                tables = self._bases.get(parts[3], {})
+                return (
+                    200,
+                    {},
+                    {"tables": [table.get_schema() for table in tables.values()]},
+                )
+            elif len(parts) == 3 and parts[0] == "v0":
+                return 200, {}, self._list_records(parts[1], parts[2], query)
+            raise _HTTPError(404, "NOT_FOUND")
+        except _HTTPError as ex:
+            return (
+                ex.status,
+                {},
+                {"error": {"type": ex.error_type, "message": ex.message}},
+            )
+
+    def _list_records(
+        self, base_id: str, table_name: str, query: Dict[str, List[str]]
+    ) -> Dict[str, Any]:
+        table = self._get_table(base_id, table_name)
+
+        def get_int(key: str, default: Optional[int]) -> Optional[int]:
+            try:
+                return int(query[key][0]) if key in query else default
+            except ValueError:
+                raise _HTTPError(422, "INVALID_REQUEST_UNKNOWN", key)
+
+        page_size = get_int("pageSize", MAX_PAGE_SIZE) or MAX_PAGE_SIZE
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise _HTTPError(422, "INVALID_PAGE_SIZE")
+        max_records = get_int("maxRecords", None)
+
+        fields = query.get("fields[]")
+        if fields is not None:
+            unknown = set(fields) - table.field_names
+            if unknown:
+                raise _HTTPError(422, "UNKNOWN_FIELD_NAME", ", ".join(sorted(unknown)))
+
+        sort: List[Tuple[str, str]] = []
+        while f"sort[{len(sort)}][field]" in query:
+            i = len(sort)
+            field_name = query[f"sort[{i}][field]"][0]
+            if field_name not in table.field_names:
+                raise _HTTPError(422, "UNKNOWN_FIELD_NAME", field_name)
+            sort.append((field_name, query.get(f"sort[{i}][direction]", ["asc"])[0]))
+
+        records = table.records
+        formula = query.get("filterByFormula", [""])[0]
+        if formula:
+            try:
+                predicate = compile_formula(formula)
+                records = [record for record in records if predicate(record)]
+            except (FormulaError, re.error) as ex:
+                raise _HTTPError(422, "INVALID_FILTER_BY_FORMULA", str(ex))
+        else:
+            records = list(records)
+
+        if sort:
+            sort_records(records, sort)
+        if max_records is not None:
+            records = records[:max_records]
+
+        offset = query.get("offset", ["itr0"])[0]
+        if not re.fullmatch(r"itr\d+", offset):
+            raise _HTTPError(422, "LIST_RECORDS_ITERATOR_NOT_AVAILABLE")
+        start = int(offset[3:])
+        page = records[start : start + page_size]
+
+        body: Dict[str, Any] = {
+            "records": [
+                {
+                    "id": record["id"],
+                    "createdTime": record["createdTime"],
+                    "fields": (
+                        record["fields"]
+                        if fields is None
+                        else {
+                            key: value
+                            for key, value in record["fields"].items()
+                            if key in fields
+                        }
+                    ),
+                }
+                for record in page
+            ]
+        }
+        if start + page_size < len(records):
+            body["offset"] = f"itr{start + page_size}"
+        return body
@@ -1,7 +1,17 @@
 import pytest
-from shillelagh.fields import Order
+from shillelagh.fields import Boolean, ISODate, ISODateTime, Order, String
+from shillelagh.filters import IsNotNull, IsNull, Range
 
-from airtabledb.adapter import _get_table_by_name, get_airtable_sort
+from airtabledb.adapter import (
+    AirtableAdapter,
+    _create_field,
+    _get_options,
+    _get_table_by_name,
+    get_airtable_fields,
+    get_airtable_sort,
+    get_minimal_field,
+)
+from airtabledb.fields import AirtableFloat, MaybeListString, OverList
 from airtabledb.types import BaseMetadata, TableMetadata
 
 
@@ -11,6 +21,9 @@ def test_get_airtable_sort() -> None:
         "a",
         "-b",
     ]
+    assert get_airtable_sort(
+        [("createdTime", Order.DESCENDING)], {"createdTime": "Created"}
+    ) == ["-Created"]
 
 
 def test_get_table_by_name() -> None:
@@ -19,3 +32,67 @@ def test_get_table_by_name() -> None:
 
     with pytest.raises(IndexError):
         _get_table_by_name("foox", base_metadata=base_metadata)
+
+
+def test_get_airtable_fields() -> None:
+    assert get_airtable_fields({"b", "id"}, ["a", "b", "c"]) == ["b"]
+    assert get_airtable_fields({"c", "a"}, ["a", "b", "c"]) == ["a", "c"]
+
+    # Only asking for id / createdTime still needs some projection
+    assert get_airtable_fields({"id", "createdTime"}, ["a", "b"]) == ["a"]
+    assert get_airtable_fields({"id"}, []) == []
+    assert get_airtable_fields({"id"}, ["a", "b"], "b") == ["b"]
+
+
+def test_get_minimal_field() -> None:
+    assert get_minimal_field({}) is None
+    assert get_minimal_field({"a": String(), "b": MaybeListString()}) == "a"
+    assert (
+        get_minimal_field({"a": String(), "b": ISODate(), "c": AirtableFloat()}) == "c"
+    )
+
+
+def test_get_fields_strict() -> None:
+    base_metadata: BaseMetadata = dict(
+        tblFoo=TableMetadata(name="foo", columns=[{"name": "a"}, {"name": "b"}])
+    )
+    adapter = AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=base_metadata,
+        peek_rows=None,
+        date_columns=None,
+    )
+
+    assert adapter._get_fields(None) is None
+    assert adapter._get_fields({"a", "b", "id"}) is None
+    assert adapter._get_fields({"b", "createdTime"}) == ["b"]
+    assert adapter._get_fields({"id"}) == ["a"]
+
+
+def test_create_field_date_filters() -> None:
+    assert _create_field(ISODate, {}).filters == [IsNull, IsNotNull]
+    assert _create_field(ISODateTime, {}).filters == [IsNull, IsNotNull]
+    assert Range in _create_field(AirtableFloat, {}).filters
+
+
+def test_create_field_order() -> None:
+    # shillelagh pushes LIMIT down even when SQLite sorts, so the adapter sorts
+    # every column (locally when Airtable's sort doesn't match SQLite's)
+    assert _create_field(AirtableFloat, {}).order is Order.ANY
+    assert _create_field(Boolean, {}).order is Order.ANY
+    assert _create_field(ISODateTime, {}).order is Order.ANY
+    assert _create_field(String, {}).order is Order.ANY
+    assert _create_field(MaybeListString, {}).order is Order.ANY
+    assert _create_field(OverList, {"field": String()}).order is Order.ANY
+
+
+def test_get_options() -> None:
+    assert _get_options(None, None) == {}
+    assert _get_options(["a"], 10) == {
+        "fields": ["a"],
+        "max_records": 10,
+        "page_size": 10,
+    }
+    assert _get_options(None, 250) == {"max_records": 250, "page_size": 100}
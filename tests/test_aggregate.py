@@ -0,0 +1,83 @@
+import pytest
+import responses
+
+from airtabledb.adapter import AirtableAdapter
+from airtabledb.aggregate import AGGREGATES
+from airtabledb.types import BaseMetadata, TableMetadata
+
+
+def test_aggregates():
+    assert AGGREGATES["COUNT"]([1, 2]) == 2
+    assert AGGREGATES["SUM"]([1, 2.5]) == 3.5
+    assert AGGREGATES["AVG"]([1, 2]) == 1.5
+    assert AGGREGATES["MIN"](["b", "a"]) == "a"
+    assert AGGREGATES["MAX"]([1, 2]) == 2
+
+    # As in SQL
+    assert AGGREGATES["COUNT"]([]) == 0
+    for function in ("SUM", "AVG", "MIN", "MAX"):
+        assert AGGREGATES[function]([]) is None
+
+
+@pytest.fixture
+def adapter(mocked_responses: responses.RequestsMock) -> AirtableAdapter:
+    base_metadata: BaseMetadata = dict(
+        tblFoo=TableMetadata(
+            name="foo",
+            columns=[
+                {"name": "notes", "type": "multilineText"},
+                {"name": "amount", "type": "number"},
+                {"name": "status", "type": "singleSelect"},
+            ],
+        )
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": f"rec{i}",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"amount": i} if i else {},
+                }
+                for i in range(4)
+            ]
+        },
+    )
+    return AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=base_metadata,
+        peek_rows=None,
+        date_columns=None,
+    )
+
+
+def test_get_count(
+    adapter: AirtableAdapter, mocked_responses: responses.RequestsMock
+) -> None:
+    assert adapter.get_count(formula="{status}='Open'") == 4
+
+    # Only the smallest field is fetched
+    url = mocked_responses.calls[-1].request.url  # type: ignore
+    assert "fields%5B%5D=amount" in url
+    assert "notes" not in url
+    assert "filterByFormula=%7Bstatus%7D%3D%27Open%27" in url
+
+
+def test_get_aggregate(
+    adapter: AirtableAdapter, mocked_responses: responses.RequestsMock
+) -> None:
+    assert adapter.get_aggregate("sum", "amount") == 6
+    assert adapter.get_aggregate("MAX", "amount") == 3
+    assert adapter.get_aggregate("COUNT", "amount") == 3
+
+    url = mocked_responses.calls[-1].request.url  # type: ignore
+    assert url.endswith("?fields%5B%5D=amount")
+
+    with pytest.raises(ValueError, match="Unsupported aggregate"):
+        adapter.get_aggregate("MEDIAN", "amount")
+    with pytest.raises(ValueError, match="Unknown column"):
+        adapter.get_aggregate("SUM", "nope")
@@ -0,0 +1,220 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, List
+
+import pytest
+import requests  # type: ignore[import]
+from shillelagh.fields import Order
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from airtabledb import aio
+from airtabledb.adapter import AirtableAdapter
+from airtabledb.client import AirtableTable
+from airtabledb.filters import In
+from airtabledb.formulas import RECORD_ID_ALPHABET
+from airtabledb.instrumentation import QueryStats, add_query_hook
+
+from .fake_airtable import FakeAirtable, Record
+
+# Spread over the shards, which go by the first character of the id
+IDS = [f"rec{RECORD_ID_ALPHABET[i % 62]}{i:013d}" for i in range(600)]
+
+RECORDS = [
+    {"id": IDS[i], "createdTime": "2022-01-01T00:00:00.000Z", "fields": {"num": i}}
+    for i in range(600)
+]
+
+
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    return {name: RECORDS for name in ("foo", "bar", "baz")}
+
+
+@pytest.fixture(params=["threaded", "aiohttp"])
+def transport(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Send the requests from worker threads, or with aiohttp if installed."""
+    if request.param == "aiohttp":
+        pytest.importorskip("aiohttp")
+    else:
+        monkeypatch.setattr(aio, "aiohttp", None)
+    return request.param
+
+
+async def _count(start: int, stop: int, delay: float = 0.0) -> AsyncIterator[int]:
+    for i in range(start, stop):
+        await asyncio.sleep(delay)
+        yield i
+
+
+async def _fail() -> AsyncIterator[int]:
+    yield 1
+    raise ValueError("boom")
+
+
+def test_merge() -> None:
+    assert sorted(aio.merge([_count(0, 5), _count(5, 10)], 2)) == list(range(10))
+    assert list(aio.merge([], 1)) == []
+
+    with pytest.raises(ValueError, match="boom"):
+        list(aio.merge([_fail(), _count(0, 3)], 1))
+
+    with pytest.raises(ValueError):
+        list(aio.merge([_count(0, 1)], 0))
+
+
+def test_merge_concurrent() -> None:
+    start = time.monotonic()
+    items = list(aio.merge([_count(0, 3, 0.1) for _ in range(5)], 5))
+    assert len(items) == 15
+    # One after the other would take 1.5s
+    assert time.monotonic() - start < 1.0
+
+
+def test_merge_early_stop() -> None:
+    items = aio.merge([_count(0, 1000, 0.001)], 1)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+
+
+def test_iterate(
+    fake: FakeAirtable, fake_table: Callable[[str], AirtableTable], transport: str
+) -> None:
+    fake.throttle_every = 2
+    table = aio.AsyncAirtableTable(fake_table("foo"))
+    query_stats = QueryStats("base", "foo")
+
+    async def fetch() -> List[List[str]]:
+        return [
+            [record["id"] for record in page]
+            async for page in table.iterate(
+                query_stats=query_stats, formula="{num} < 150", page_size=100
+            )
+        ]
+
+    pages = aio.run(fetch())
+    assert [len(page) for page in pages] == [100, 50]
+    assert query_stats.pages == 2
+    assert query_stats.throttled == 1
+    assert query_stats.formulas == ["{num} < 150"]
+
+
+def test_iterate_error(
+    fake_table: Callable[[str], AirtableTable], transport: str
+) -> None:
+    table = aio.AsyncAirtableTable(fake_table("foo"))
+
+    async def fetch() -> None:
+        async for _ in table.iterate(fields=["nope"]):
+            pass
+
+    with pytest.raises(requests.HTTPError, match="UNKNOWN_FIELD_NAME"):
+        aio.run(fetch())
+
+
+def test_shutdown(fake_table: Callable[[str], AirtableTable]) -> None:
+    pytest.importorskip("aiohttp")
+    aio.fetch_tables([fake_table("foo")], formula="{num} < 10")
+    (session,) = aio._aiohttp_sessions.values()
+    loop = aio.get_event_loop()
+
+    aio.shutdown()
+    assert session.closed
+    assert loop.is_closed()
+    assert not aio._aiohttp_sessions
+
+    # A new loop (and session) is started when needed
+    results = aio.fetch_tables([fake_table("foo")], formula="{num} < 10")
+    assert len(results[0]) == 10
+    assert aio.get_event_loop() is not loop
+
+
+def test_fetch_tables(
+    fake: FakeAirtable, fake_table: Callable[[str], AirtableTable], transport: str
+) -> None:
+    fake.latency = 0.3
+    tables = [fake_table(name) for name in ("foo", "bar", "baz")]
+
+    start = time.monotonic()
+    results = aio.fetch_tables(tables, formula="{num} < 10")
+    elapsed = time.monotonic() - start
+
+    assert [len(records) for records in results] == [10, 10, 10]
+    # One after the other would take 0.9s
+    assert elapsed < 0.75
+
+
+def test_execute_sharded(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine], transport: str
+) -> None:
+    fake.latency = 0.05
+    engine = fake_engine("&shards=4&async_fetch=true&rate_limit=1000")
+    with engine.connect() as connection:
+        rows = list(connection.execute(text("SELECT num FROM foo")))
+
+    assert sorted(num for (num,) in rows) == list(range(600))
+    # The metadata, then two pages per shard
+    assert fake.request_count == 1 + 4 * 2
+
+
+def test_execute_prefetched(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine], transport: str
+) -> None:
+    engine = fake_engine("&prefetch_pages=2&async_fetch=true&rate_limit=1000")
+    queries: List[QueryStats] = []
+    add_query_hook(queries.append)
+    with engine.connect() as connection:
+        # Without a formula
+        rows = list(connection.execute(text("SELECT num FROM foo")))
+
+    assert [num for (num,) in rows] == list(range(600))
+    # The metadata, then six pages
+    assert fake.request_count == 1 + 6
+    assert queries[-1].pages == 6
+
+
+def test_bytes_received(
+    fake: FakeAirtable,
+    fake_table: Callable[[str], AirtableTable],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    aiohttp = pytest.importorskip("aiohttp")
+    fake.add_table("base", "accents", [{"name": "é" * 100}])
+    table = fake_table("accents")
+
+    def get_bytes_received() -> int:
+        query_stats = QueryStats("base", "accents")
+        aio.fetch_tables([table], query_stats=query_stats)
+        return query_stats.bytes_received
+
+    monkeypatch.setattr(aio, "aiohttp", None)
+    threaded = get_bytes_received()
+    monkeypatch.setattr(aio, "aiohttp", aiohttp)
+    # Bytes rather than characters, like requests
+    assert get_bytes_received() == threaded > 200
+
+
+def test_in_chunks(fake: FakeAirtable) -> None:
+    ids = IDS[::2]
+    adapter = AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=None,
+        peek_rows=1,
+        date_columns=None,
+        rate_limit=1000,
+        api_url=fake.api_url,
+        async_fetch=True,
+    )
+    queries: List[QueryStats] = []
+    add_query_hook(queries.append)
+
+    batches = list(
+        adapter.get_batches({"id": In(ids)}, [("num", Order.DESCENDING)], formula=None)
+    )
+
+    nums = [num for batch in batches for num in batch.to_pydict()["num"]]
+    assert nums == list(range(598, -1, -2))
+    # Too many ids for one URL, so they were fetched (concurrently) in chunks
+    assert len(queries[-1].formulas) > 1
@@ -0,0 +1,151 @@
+import math
+from array import array
+from typing import Any, Dict, List
+
+import responses
+from shillelagh.fields import Field, Order
+
+from airtabledb.adapter import AirtableAdapter
+from airtabledb.batch import build_batch
+from airtabledb.fields import AirtableFloat, Checkbox, MaybeListString, compile_parser
+from airtabledb.filters import In
+from airtabledb.types import BaseMetadata, TableMetadata
+
+
+def test_build_batch() -> None:
+    columns: Dict[str, Field] = {"num": AirtableFloat(), "name": MaybeListString()}
+    parsers = {name: compile_parser(field) for name, field in columns.items()}
+    rows: List[Dict[str, Any]] = [
+        {"num": 1.5, "name": "a"},
+        {"name": ["b"]},
+        {"num": {"specialValue": "Infinity"}, "name": None, "other": 1},
+    ]
+    rows.extend({"num": i} for i in range(7))
+
+    batch = build_batch(rows, columns, parsers)
+
+    assert len(batch) == 10
+    num = batch.columns["num"]
+    assert isinstance(num.values, array)
+    assert num.to_list() == [1.5, None, math.inf, 0, 1, 2, 3, 4, 5, 6]
+    assert num.nulls == bytearray([0b00000010, 0b00])
+    assert batch.columns["name"].to_list() == ["a", "b"] + [None] * 8
+
+    assert list(batch.rows())[:2] == [
+        {"num": 1.5, "name": "a"},
+        {"num": None, "name": "b"},
+    ]
+
+
+def test_build_batch_checkbox() -> None:
+    columns: Dict[str, Field] = {"done": Checkbox()}
+    parsers = {"done": compile_parser(columns["done"])}
+
+    batch = build_batch([{"done": True}, {}], columns, parsers)
+
+    # Unchecked checkboxes are left out of records
+    assert batch.columns["done"].to_list() == [True, False]
+
+
+def test_build_batch_empty() -> None:
+    batch = build_batch(
+        [], {"num": AirtableFloat()}, {"num": compile_parser(AirtableFloat())}
+    )
+
+    assert len(batch) == 0
+    assert batch.to_pydict() == {"num": []}
+    assert list(batch.rows()) == []
+
+
+def test_get_batches(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata: BaseMetadata = dict(
+        tblFoo=TableMetadata(
+            name="foo",
+            columns=[
+                {"name": "num", "type": "number"},
+                {"name": "name", "type": "singleLineText"},
+            ],
+        )
+    )
+    record = {"id": "recA", "createdTime": "2022-03-07T20:25:26.000Z"}
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [dict(record, fields={"num": 1, "name": "a"})],
+            "offset": "itr1",
+        },
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={"records": [dict(record, id="recB", fields={"name": "b"})]},
+    )
+    adapter = AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=base_metadata,
+        peek_rows=None,
+        date_columns=None,
+    )
+
+    batches = list(adapter.get_batches(requested_columns={"id", "num", "name"}))
+
+    assert [batch.to_pydict() for batch in batches] == [
+        {"num": [1.0], "name": ["a"], "id": ["recA"]},
+        {"num": [None], "name": ["b"], "id": ["recB"]},
+    ]
+
+
+def test_get_batches_in(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata: BaseMetadata = dict(
+        tblFoo=TableMetadata(name="foo", columns=[{"name": "num", "type": "number"}])
+    )
+    ids = [f"rec{i:014}" for i in range(300)]
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": "rec00000000000002",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"num": 2},
+                },
+            ]
+        },
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": "rec00000000000299",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"num": 1},
+                },
+            ]
+        },
+    )
+    adapter = AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=base_metadata,
+        peek_rows=None,
+        date_columns=None,
+    )
+
+    batches = list(
+        adapter.get_batches(
+            {"id": In(ids)}, [("num", Order.ASCENDING)], requested_columns={"id"}
+        )
+    )
+
+    # Too many ids for one URL, so they were split over two requests
+    assert len(mocked_responses.calls) == 2
+    assert [batch.to_pydict() for batch in batches] == [
+        {"id": ["rec00000000000299", "rec00000000000002"]}
+    ]
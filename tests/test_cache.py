@@ -0,0 +1,105 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from airtabledb.cache import (
+    MemoryPageCache,
+    PageCache,
+    SQLitePageCache,
+    get_cache_key,
+    get_page_cache,
+)
+from airtabledb.types import AirtableRecord, Page
+
+
+def _get_page(record_id: str) -> Page:
+    return [AirtableRecord(id=record_id, createdTime="", fields={"a": 1})]
+
+
+def _get_caches(tmp_path: Path, ttl: float, max_bytes: int):
+    return [
+        MemoryPageCache(ttl=ttl, max_bytes=max_bytes),
+        SQLitePageCache(str(tmp_path / "cache.db"), ttl=ttl, max_bytes=max_bytes),
+    ]
+
+
+def test_get_cache_key():
+    def get_key(*args, api_key="key", api_url=None):
+        return get_cache_key("base", "table", *args, api_key=api_key, api_url=api_url)
+
+    key = get_key(None, [], None, None)
+    assert key == get_key(None, [], None, None)
+    assert key != get_key(None, [], None, 10)
+    assert key != get_key(None, [], ["a"], None)
+    assert key != get_key("{a}=1", [], None, None)
+    assert key != get_key(None, ["-a"], None, None)
+    # Connections with other API keys (or APIs) don't share cached pages
+    assert key != get_key(None, [], None, None, api_key="other")
+    assert key != get_key(None, [], None, None, api_url="http://localhost/v0")
+    assert "key" not in json.loads(key)
+
+
+def test_page_cache_abstract():
+    with pytest.raises(TypeError):
+        PageCache(ttl=60, max_bytes=1000)  # type: ignore[abstract]
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_page_cache(tmp_path: Path, index: int):
+    page_cache: PageCache = _get_caches(tmp_path, ttl=60, max_bytes=1000)[index]
+
+    assert page_cache.get("k1") is None
+    page_cache.set("k1", [_get_page("rec1")])
+    assert page_cache.get("k1") == [_get_page("rec1")]
+
+    page_cache.clear()
+    assert page_cache.get("k1") is None
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_page_cache_ttl(tmp_path: Path, index: int):
+    page_cache: PageCache = _get_caches(tmp_path, ttl=0.01, max_bytes=1000)[index]
+
+    page_cache.set("k1", [_get_page("rec1")])
+    time.sleep(0.02)
+    assert page_cache.get("k1") is None
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_page_cache_lru(tmp_path: Path, index: int):
+    # Fits two of these entries
+    page_cache: PageCache = _get_caches(tmp_path, ttl=60, max_bytes=150)[index]
+
+    page_cache.set("k1", [_get_page("rec1")])
+    page_cache.set("k2", [_get_page("rec2")])
+    # k1 is now the most recently used
+    assert page_cache.get("k1") is not None
+    page_cache.set("k3", [_get_page("rec3")])
+
+    assert page_cache.get("k1") is not None
+    assert page_cache.get("k2") is None
+    assert page_cache.get("k3") is not None
+
+    # Too large to ever fit
+    page_cache.set("k4", [_get_page("rec4")] * 10)
+    assert page_cache.get("k4") is None
+
+
+def test_page_cache_sqlite_persists(tmp_path: Path):
+    path = str(tmp_path / "cache.db")
+    SQLitePageCache(path, ttl=60, max_bytes=1000).set("k1", [_get_page("rec1")])
+
+    assert SQLitePageCache(path, ttl=60, max_bytes=1000).get("k1") == [
+        _get_page("rec1")
+    ]
+
+
+def test_get_page_cache(tmp_path: Path):
+    page_cache = get_page_cache("memory", ttl=10)
+    assert isinstance(page_cache, MemoryPageCache)
+    assert page_cache.ttl == 10
+    assert get_page_cache("memory") is page_cache
+
+    assert isinstance(get_page_cache(str(tmp_path / "cache.db")), SQLitePageCache)
@@ -0,0 +1,129 @@
+from typing import List
+
+import pyairtable.api.abstract
+import pytest
+import requests  # type: ignore[import]
+import responses
+
+from airtabledb.client import AirtableTable, get_session
+from airtabledb.throttle import TokenBucket
+
+URL = "https://api.airtable.com/v0/base/foo"
+
+
+def _get_table(**kwargs) -> AirtableTable:
+    return AirtableTable(
+        "key", "base", "foo", rate_limiter=TokenBucket(rate=1000), **kwargs
+    )
+
+
+def test_retry_throttled(mocked_responses: responses.RequestsMock) -> None:
+    throttled = mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        status=429,
+        headers={"Retry-After": "0"},
+        json={"errors": [{"error": "RATE_LIMIT_REACHED"}]},
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        json={"records": [{"id": "recXXX", "createdTime": "", "fields": {}}]},
+    )
+
+    table = _get_table()
+    assert [r["id"] for r in table.all()] == ["recXXX"]
+    assert throttled.call_count == 1
+    assert table.rate_limiter.stats()["throttled"] == 1
+
+
+def test_retry_exhausted(mocked_responses: responses.RequestsMock) -> None:
+    throttled = mocked_responses.add(method=responses.GET, url=URL, status=429)
+
+    table = _get_table(max_retries=2, retry_backoff=0.001)
+    with pytest.raises(requests.HTTPError):
+        table.all()
+    assert throttled.call_count == 3
+
+
+def test_get_session():
+    session = get_session("key", "appShared", pool_size=3)
+    assert get_session("key", "appShared") is session
+    assert session.get_adapter(URL)._pool_maxsize == 3
+
+    assert get_session("key", "appOther") is not session
+    assert get_session("otherkey", "appShared") is not session
+
+
+def test_shared_session():
+    session = get_session("key", "base")
+    table = _get_table(session=session)
+    other_table = AirtableTable(
+        "key", "base", "bar", rate_limiter=table.rate_limiter, session=session
+    )
+
+    assert table.session is other_table.session is session
+    assert session.headers["Authorization"] == "Bearer key"
+
+
+def test_iterate_pages(mocked_responses: responses.RequestsMock) -> None:
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        match=[responses.matchers.query_param_matcher({"pageSize": "1"})],
+        json={
+            "records": [{"id": "rec1", "createdTime": "t1", "fields": {"a": 1}}],
+            "offset": "itr/rec1",
+        },
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        match=[
+            responses.matchers.query_param_matcher(
+                {"pageSize": "1", "offset": "itr/rec1"}
+            )
+        ],
+        json={"records": [{"id": "rec2", "createdTime": "t2", "fields": {}}]},
+    )
+
+    table = _get_table()
+    assert [[r["id"] for r in page] for page in table.iterate(page_size=1)] == [
+        ["rec1"],
+        ["rec2"],
+    ]
+    assert [list(rows) for rows in table.iterate_rows(page_size=1)] == [
+        [{"a": 1, "id": "rec1", "createdTime": "t1"}],
+        [{"id": "rec2", "createdTime": "t2"}],
+    ]
+
+
+def test_iterate_no_sleep(
+    mocked_responses: responses.RequestsMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        json={"records": [{"id": "rec1", "createdTime": "t1", "fields": {}}]},
+    )
+    sleeps: List[float] = []
+    monkeypatch.setattr(pyairtable.api.abstract.time, "sleep", sleeps.append)
+
+    # pyairtable's own paging (which sleeps API_LIMIT after each page) is paced
+    # by the rate limiter instead
+    table = _get_table()
+    assert len(list(pyairtable.Table.iterate(table))) == 1
+    assert len(table.all()) == 1
+    assert not any(sleeps)
+
+
+def test_iterate_error(mocked_responses: responses.RequestsMock) -> None:
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        status=422,
+        json={"error": {"type": "INVALID_FILTER_BY_FORMULA"}},
+    )
+
+    with pytest.raises(requests.HTTPError, match="INVALID_FILTER_BY_FORMULA"):
+        list(_get_table().iterate_rows())
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from airtabledb.decoder import PageDecoder
+
+RECORDS = [
+    {
+        "id": "rec1",
+        "createdTime": "2022-03-07T20:25:26.000Z",
+        "fields": {"a": 'x], {"y": [', "b": [1, 2], "c": {"id": "att1"}},
+    },
+    {"id": "rec2", "createdTime": "2022-03-07T20:25:27.000Z", "fields": {"é": 1.5}},
+]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_page_decoder(indent):
+    text = json.dumps({"records": RECORDS, "offset": "itr/rec2"}, indent=indent)
+
+    page = PageDecoder(text)
+    assert page.offset is None
+    assert list(page.records()) == RECORDS
+    assert page.done
+    assert page.offset == "itr/rec2"
+    assert page.decoded == 2
+    assert page.decode_seconds > 0
+
+
+def test_page_decoder_offset_first():
+    page = PageDecoder(json.dumps({"offset": "itr", "records": RECORDS}))
+    assert list(page.records()) == RECORDS
+    assert page.offset == "itr"
+
+
+def test_page_decoder_empty():
+    page = PageDecoder('{"records": []}')
+    assert list(page.records()) == []
+    assert page.offset is None
+
+    page = PageDecoder(" { } ")
+    assert list(page.records()) == []
+    assert page.done
+
+
+def test_page_decoder_rows():
+    page = PageDecoder(json.dumps({"records": RECORDS}))
+    rows = list(page.rows())
+    assert rows[1] == {
+        "é": 1.5,
+        "id": "rec2",
+        "createdTime": "2022-03-07T20:25:27.000Z",
+    }
+    assert rows[0]["b"] == [1, 2]
+
+
+def test_page_decoder_lazy():
+    page = PageDecoder(json.dumps({"records": RECORDS, "offset": "itr"}))
+    records = page.records()
+    assert next(records)["id"] == "rec1"
+    assert not page.done
+
+    page.finish()
+    assert page.done
+    assert page.offset == "itr"
+
+
+def test_page_decoder_invalid():
+    with pytest.raises(ValueError):
+        list(PageDecoder("[]").records())
+    with pytest.raises(ValueError):
+        list(PageDecoder('{"records": [{}').records())
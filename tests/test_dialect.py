@@ -1,10 +1,17 @@
-from typing import Any, Dict
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Tuple
 
+import pytest
 import responses
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import URL, Connection, Engine, make_url
 
 from airtabledb.dialect import APSWAirtableDialect, extract_query_host
+from airtabledb.formulas import get_shard_formulas
+
+from .test_metadata import BASE_SCHEMA
 
 # -----------------------------------------------------------------------------
 
@@ -37,7 +44,7 @@ def test_execute(
         == "https://api.airtable.com/v0/base/foo?pageSize=1&maxRecords=1"
     )
     last_response_url = mocked_responses.calls[-1].request.url  # type: ignore
-    assert last_response_url == "https://api.airtable.com/v0/base/foo"
+    assert last_response_url == "https://api.airtable.com/v0/base/foo?fields%5B%5D=baz"
 
 
 def test_execute_limit(
@@ -61,7 +68,8 @@ def test_execute_limit(
     assert single_record.call_count == 2
     assert (
         mocked_responses.calls[-1].request.url  # type: ignore
-        == "https://api.airtable.com/v0/base/foo?maxRecords=2"
+        == "https://api.airtable.com/v0/base/foo"
+        "?maxRecords=2&pageSize=2&fields%5B%5D=baz"
     )
 
 
@@ -157,3 +165,353 @@ def test_peek_rows_dupe():
     url_http = make_url("airtable://foo?peek_rows=12&peek_rows=13")
     _, kwargs = APSWAirtableDialect().create_connect_args(url_http)
     assert _get_adapter_kwargs(kwargs)["peek_rows"] == 13
+
+
+def test_prefetch_pages():
+    url_http = make_url("airtable://foo")
+    _, kwargs = APSWAirtableDialect().create_connect_args(url_http)
+    assert _get_adapter_kwargs(kwargs)["prefetch_pages"] is None
+
+    url_http = make_url("airtable://foo?prefetch_pages=3")
+    _, kwargs = APSWAirtableDialect().create_connect_args(url_http)
+    assert _get_adapter_kwargs(kwargs)["prefetch_pages"] == 3
+
+
+def test_expand():
+    url_http = make_url("airtable://foo")
+    _, kwargs = APSWAirtableDialect().create_connect_args(url_http)
+    assert _get_adapter_kwargs(kwargs)["expand"] is None
+
+    url_http = make_url(
+        "airtable://foo?expand=orders.item:name,price&expand=orders.customer:email"
+    )
+    _, kwargs = APSWAirtableDialect().create_connect_args(url_http)
+    assert _get_adapter_kwargs(kwargs)["expand"] == {
+        "orders": {"item": ["name", "price"], "customer": ["email"]}
+    }
+
+    with pytest.raises(ValueError):
+        APSWAirtableDialect().create_connect_args(make_url("airtable://foo?expand=a"))
+
+
+def test_execute_prefetch(
+    single_record: responses.BaseResponse,
+) -> None:
+    with create_engine("airtable://api@base?prefetch_pages=2").connect() as connection:
+        rows = list(connection.execute(text("SELECT * FROM foo")))
+
+    assert len(rows) == 1
+    assert single_record.call_count == 2
+
+
+def test_execute_sharded(mocked_responses: responses.RequestsMock) -> None:
+    for i, shard_formula in enumerate(get_shard_formulas(2)):
+        mocked_responses.add(
+            method=responses.GET,
+            url="https://api.airtable.com/v0/base/foo",
+            match=[
+                responses.matchers.query_param_matcher(
+                    {"filterByFormula": shard_formula, "fields[]": "baz"}
+                )
+            ],
+            json={
+                "records": [
+                    {
+                        "id": f"rec{i}",
+                        "createdTime": "2022-03-07T20:25:26.000Z",
+                        "fields": {"baz": i},
+                    }
+                ]
+            },
+        )
+    # probe
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        match=[
+            responses.matchers.query_param_matcher({"pageSize": "1", "maxRecords": "1"})
+        ],
+        json={
+            "records": [
+                {
+                    "id": "rec0",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"baz": 0},
+                }
+            ]
+        },
+    )
+
+    with create_engine("airtable://api@base?shards=2").connect() as connection:
+        rows = list(connection.execute(text("SELECT id, baz FROM foo")))
+
+    assert sorted(rows) == [("rec0", 0), ("rec1", 1)]
+
+
+def test_execute_cached(
+    single_record: responses.BaseResponse,
+) -> None:
+    with create_engine("airtable://api@base?cache=memory").connect() as connection:
+        for _ in range(3):
+            rows = list(connection.execute(text("SELECT * FROM foo")))
+            assert len(rows) == 1
+
+    # once for probing and once for data
+    assert single_record.call_count == 2
+
+
+def test_execute_synced(
+    single_record: responses.BaseResponse,
+) -> None:
+    with create_engine(
+        "airtable://api@base?sync_interval=3600"
+    ).connect() as connection:
+        for _ in range(3):
+            rows = list(connection.execute(text("SELECT * FROM foo WHERE baz = 1")))
+            assert len(rows) == 1
+        rows = list(connection.execute(text("SELECT * FROM foo WHERE baz = 2")))
+        assert len(rows) == 0
+
+    # once for probing and once for the initial load
+    assert single_record.call_count == 2
+
+
+def test_execute_schema_cache(
+    single_record: responses.BaseResponse, tmp_path: Path
+) -> None:
+    url = f"airtable://api@base?schema_cache={tmp_path / 'schema.json'}"
+    for _ in range(2):
+        with create_engine(url).connect() as connection:
+            rows = list(connection.execute(text("SELECT * FROM foo")))
+            assert len(rows) == 1
+            assert set(rows[0].keys()) == {"id", "createdTime", "baz"}
+
+    # once for probing and twice for data
+    assert single_record.call_count == 3
+
+
+def test_execute_metadata_api(mocked_responses: responses.RequestsMock) -> None:
+    schema = mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/meta/bases/base/tables",
+        json=BASE_SCHEMA,
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": "recXXX",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {
+                        "Name": "a",
+                        "Amount": 1.5,
+                        "Done": True,
+                        "Due": "2022-03-08",
+                        "Links": ["recA", "recB"],
+                    },
+                }
+            ]
+        },
+    )
+
+    engine = create_engine("airtable://:key@base?metadata_api=true")
+    with engine.connect() as connection:
+        assert inspect(connection).get_table_names() == ["foo"]
+
+        rows = list(
+            connection.execute(
+                text("SELECT Name, Amount, Done, Due, Links, Total FROM foo")
+            )
+        )
+
+    assert rows == [("a", 1.5, True, date(2022, 3, 8), "recA, recB", None)]
+    assert schema.call_count == 1
+
+
+def test_metadata_api_no_key() -> None:
+    url_http = make_url("airtable://foo?metadata_api=true")
+    with pytest.raises(ValueError):
+        APSWAirtableDialect().create_connect_args(url_http)
+
+
+def test_execute_sort_pushdown(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata = {
+        "tblFoo": {
+            "name": "foo",
+            "columns": [
+                {"name": "Name", "type": "singleLineText"},
+                {"name": "Amount", "type": "number"},
+                {"name": "Created", "type": "createdTime"},
+            ],
+        }
+    }
+    records = mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": "recB",
+                    "createdTime": "2022-03-08T20:25:26.000Z",
+                    "fields": {"Name": "b", "Amount": 1},
+                },
+                {
+                    "id": "recA",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"Name": "a", "Amount": 2},
+                },
+            ]
+        },
+    )
+
+    engine = create_engine("airtable://:key@base", base_metadata=base_metadata)
+    with engine.connect() as connection:
+        rows = list(
+            connection.execute(
+                text("SELECT id FROM foo ORDER BY createdTime DESC LIMIT 20")
+            )
+        )
+        assert rows == [("recB",), ("recA",)]
+        assert records.call_count == 1
+        url = mocked_responses.calls[-1].request.url  # type: ignore
+        assert "sort%5B0%5D%5Bfield%5D=Created" in url
+        assert "sort%5B0%5D%5Bdirection%5D=desc" in url
+        assert "maxRecords=20" in url
+
+        # Airtable sorts text differently, so SQLite sorts it
+        rows = list(connection.execute(text("SELECT Name FROM foo ORDER BY Name")))
+        assert rows == [("a",), ("b",)]
+        assert "sort" not in mocked_responses.calls[-1].request.url  # type: ignore
+
+
+def test_execute_limit_offset(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata = {"tblFoo": {"name": "foo", "columns": [{"name": "baz"}]}}
+    records = mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": f"rec{i}",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"baz": i},
+                }
+                for i in range(3)
+            ]
+        },
+    )
+
+    engine = create_engine("airtable://:key@base", base_metadata=base_metadata)
+    with engine.connect() as connection:
+        rows = list(connection.execute(text("SELECT id FROM foo LIMIT 1 OFFSET 2")))
+
+    assert rows == [("rec2",)]
+    assert records.call_count == 1
+    assert (
+        mocked_responses.calls[-1].request.url  # type: ignore
+        == "https://api.airtable.com/v0/base/foo?maxRecords=3&pageSize=3"
+    )
+
+
+def _add_join_tables(mocked_responses: responses.RequestsMock) -> Dict[str, Any]:
+    def record(record_id: str, **fields: Any) -> Dict[str, Any]:
+        return {
+            "id": record_id,
+            "createdTime": "2022-03-07T20:25:26.000Z",
+            "fields": fields,
+        }
+
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                record(f"recF{i}", link=link)
+                for i, link in enumerate(["recA", "recB", "recA", "recA", "recB"])
+            ]
+        },
+    )
+
+    def get_bar(request: Any) -> Tuple[int, Dict[str, str], str]:
+        records = [
+            record(record_id, name=record_id.lower())
+            for record_id in ("recA", "recB")
+            if "filterByFormula" not in request.url
+            or f"'{record_id}'" in request.url.replace("%27", "'")
+        ]
+        return 200, {}, json.dumps({"records": records})
+
+    mocked_responses.add_callback(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/bar",
+        callback=get_bar,
+    )
+    return {
+        "tblFoo": {"name": "foo", "columns": [{"name": "link"}]},
+        "tblBar": {"name": "bar", "columns": [{"name": "name"}]},
+    }
+
+
+JOIN_QUERY = """
+SELECT foo.id, bar.name
+FROM foo JOIN bar ON bar.id = foo.link
+ORDER BY foo.id
+"""
+
+
+def test_execute_join_memoized(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata = _add_join_tables(mocked_responses)
+
+    engine = create_engine(
+        "airtable://:key@base?probe_ttl=10", base_metadata=base_metadata
+    )
+    with engine.connect() as connection:
+        rows = list(connection.execute(text(JOIN_QUERY)))
+
+    assert rows == [
+        ("recF0", "reca"),
+        ("recF1", "recb"),
+        ("recF2", "reca"),
+        ("recF3", "reca"),
+        ("recF4", "recb"),
+    ]
+    bar_calls = [call for call in mocked_responses.calls if "/bar" in call.request.url]
+    # Only remembered once repeated: twice per distinct id rather than once per
+    # row of foo
+    assert len(bar_calls) == 4
+
+
+def test_execute_join_not_memoized(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata = _add_join_tables(mocked_responses)
+
+    engine = create_engine("airtable://:key@base", base_metadata=base_metadata)
+    with engine.connect() as connection:
+        rows = list(connection.execute(text(JOIN_QUERY)))
+
+    assert len(rows) == 5
+    bar_calls = [call for call in mocked_responses.calls if "/bar" in call.request.url]
+    # Off by default: once per row of foo
+    assert len(bar_calls) == 5
+
+
+def test_execute_join_prefetched(mocked_responses: responses.RequestsMock) -> None:
+    base_metadata = _add_join_tables(mocked_responses)
+
+    engine = create_engine(
+        "airtable://:key@base?probe_ttl=10&probe_prefetch_threshold=1",
+        base_metadata=base_metadata,
+    )
+    with engine.connect() as connection:
+        rows = list(connection.execute(text(JOIN_QUERY)))
+
+    assert len(rows) == 5
+    bar_urls = [
+        call.request.url
+        for call in mocked_responses.calls
+        if "/bar" in call.request.url
+    ]
+    # One lookup, and then the whole table
+    assert len(bar_urls) == 2
+    assert "filterByFormula" not in bar_urls[1]
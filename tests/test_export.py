@@ -0,0 +1,76 @@
+import math
+
+import pytest
+import responses
+
+from airtabledb.export import _get_adapter_and_columns, read_arrow_table, read_table
+from airtabledb.types import BaseMetadata, TableMetadata
+
+BASE_METADATA: BaseMetadata = dict(
+    tblFoo=TableMetadata(
+        name="foo",
+        columns=[
+            {"name": "num", "type": "number"},
+            {"name": "name", "type": "singleLineText"},
+        ],
+    )
+)
+
+
+def add_two_pages(mocked_responses: responses.RequestsMock) -> None:
+    record = {"id": "recA", "createdTime": "2022-03-07T20:25:26.000Z"}
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [dict(record, fields={"num": 1.5, "name": "a"})],
+            "offset": "itr1",
+        },
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={"records": [dict(record, id="recB", fields={"name": 2})]},
+    )
+
+
+def test_unknown_columns() -> None:
+    with pytest.raises(ValueError, match="Unknown columns"):
+        _get_adapter_and_columns(
+            "base", "foo", ["num", "bar"], "key", BASE_METADATA, None, None, {}
+        )
+
+
+def test_read_arrow_table(mocked_responses: responses.RequestsMock) -> None:
+    pytest.importorskip("pyarrow")
+    add_two_pages(mocked_responses)
+
+    table = read_arrow_table(
+        "base",
+        "foo",
+        ["id", "num", "name"],
+        "{num} > 0",
+        api_key="key",
+        base_metadata=BASE_METADATA,
+    )
+
+    assert table.to_pydict() == {
+        "id": ["recA", "recB"],
+        "num": [1.5, None],
+        "name": ["a", "2"],
+    }
+    assert "filterByFormula=%7Bnum%7D+%3E+0" in mocked_responses.calls[0].request.url
+
+
+def test_read_table(mocked_responses: responses.RequestsMock) -> None:
+    pytest.importorskip("pandas")
+    add_two_pages(mocked_responses)
+
+    df = read_table(
+        "base", "foo", ["num", "name"], api_key="key", base_metadata=BASE_METADATA
+    )
+
+    assert list(df.columns) == ["num", "name"]
+    assert df["num"][0] == 1.5
+    assert math.isnan(df["num"][1])
+    assert list(df["name"]) == ["a", 2]
@@ -0,0 +1,230 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from shillelagh.filters import Equal, Filter, IsNotNull, IsNull, NotEqual, Range
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from airtabledb.client import AirtableTable
+from airtabledb.filters import In
+from airtabledb.formulas import (
+    get_airtable_formula,
+    get_modified_since_formula,
+    get_shard_formulas,
+)
+from airtabledb.metadata import fetch_base_metadata
+
+from .benchmark import SCENARIOS, format_results, run_benchmarks
+from .fake_airtable import FakeAirtable, FormulaError, Record, compile_formula
+
+RECORDS: List[Dict[str, Any]] = [
+    {
+        "id": f"rec{i}",
+        "createdTime": "2022-01-01T00:00:00.000Z",
+        "fields": fields,
+    }
+    for i, fields in enumerate(
+        [
+            {"name": "a", "amount": 1, "done": True, "tags": ["x", "y"]},
+            {"name": "b's", "amount": 2.5},
+            {"name": "c", "amount": 10, "done": False},
+            {"amount": 0},
+        ]
+    )
+]
+
+
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    return {"foo": RECORDS}
+
+
+def _matches(formula: str) -> List[str]:
+    predicate = compile_formula(formula)
+    return [record["id"] for record in RECORDS if predicate(record)]
+
+
+@pytest.mark.parametrize(
+    "bounds,expected",
+    [
+        ({"name": Equal("a")}, ["rec0"]),
+        ({"name": Equal("b's")}, ["rec1"]),
+        ({"name": NotEqual("a")}, ["rec1", "rec2", "rec3"]),
+        ({"amount": Range(1, 10, True, False)}, ["rec0", "rec1"]),
+        ({"amount": Range(2, None, False, False)}, ["rec1", "rec2"]),
+        ({"amount": Range(0, 0, True, True)}, ["rec3"]),
+        ({"name": IsNull()}, ["rec3"]),
+        ({"name": IsNotNull()}, ["rec0", "rec1", "rec2"]),
+        ({"done": Equal(True)}, ["rec0"]),
+        ({"id": Equal("rec2")}, ["rec2"]),
+        ({"name": In(["a", "c", "z"])}, ["rec0", "rec2"]),
+        ({"name": In([])}, []),
+        (
+            {"name": IsNotNull(), "amount": Range(None, 5, False, False)},
+            ["rec0", "rec1"],
+        ),
+    ],
+)
+def test_compile_formula(bounds: Dict[str, Filter], expected: List[str]) -> None:
+    assert _matches(get_airtable_formula(bounds)) == expected
+
+
+def test_compile_formula_functions() -> None:
+    since = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    assert len(_matches(get_modified_since_formula(since))) == 4
+    assert _matches(get_modified_since_formula(datetime.now(timezone.utc))) == []
+
+    # Every record is in exactly one shard
+    shards = [_matches(formula) for formula in get_shard_formulas(3)]
+    assert sorted(sum(shards, [])) == ["rec0", "rec1", "rec2", "rec3"]
+
+    assert _matches("{tags} = 'x, y'") == ["rec0"]
+    assert _matches("{amount} >= -1") == ["rec0", "rec1", "rec2", "rec3"]
+    assert _matches('{name} & "" = \'ab\' & "\'s"') == []
+
+    with pytest.raises(FormulaError):
+        compile_formula("NOPE()")
+    with pytest.raises(FormulaError):
+        compile_formula("{name} = ")
+
+
+def test_list_records(
+    fake: FakeAirtable, fake_table: Callable[[str], AirtableTable]
+) -> None:
+    table = fake_table("foo")
+
+    pages = list(table.iterate(page_size=3))
+    assert [len(page) for page in pages] == [3, 1]
+    assert fake.request_count == 2
+
+    records = table.all(
+        sort=["-amount"], fields=["name"], formula="{amount} > 0", max_records=2
+    )
+    assert [(record["id"], record["fields"]) for record in records] == [
+        ("rec2", {"name": "c"}),
+        ("rec1", {"name": "b's"}),
+    ]
+
+
+def test_list_records_errors(fake_table: Callable[[str], AirtableTable]) -> None:
+    table = fake_table("foo")
+    with pytest.raises(Exception, match="422"):
+        table.all(fields=["nope"])
+    with pytest.raises(Exception, match="422"):
+        table.all(formula="{name} =")
+    with pytest.raises(Exception, match="404"):
+        fake_table("bar").all()
+
+
+def test_throttled(
+    fake: FakeAirtable, fake_table: Callable[[str], AirtableTable]
+) -> None:
+    fake.throttle_every = 2
+    records = fake_table("foo").all(page_size=1)
+
+    assert len(records) == 4
+    # Every other request was throttled and retried
+    assert fake.throttled == 3
+    assert fake.request_count == 4
+
+
+def test_metadata_and_query(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine]
+) -> None:
+    base_metadata = fetch_base_metadata("key", "base", api_url=fake.api_url)
+    assert [table["name"] for table in base_metadata.values()] == ["foo"]
+    assert {
+        column["name"]: column["type"]
+        for column in next(iter(base_metadata.values()))["columns"]
+    } == {
+        "name": "singleLineText",
+        "amount": "number",
+        "done": "checkbox",
+        "tags": "multipleSelects",
+    }
+
+    engine = fake_engine("")
+    with engine.connect() as connection:
+        rows = list(
+            connection.execute(
+                text("SELECT id, amount FROM foo WHERE amount > 1 ORDER BY amount")
+            )
+        )
+    assert rows == [("rec1", 2.5), ("rec2", 10.0)]
+
+
+@pytest.mark.parametrize("query", ["", "&sync_interval=60"])
+def test_checkbox(fake_engine: Callable[[str], Engine], query: str) -> None:
+    # Unchecked checkboxes are missing from records, pushed down or not
+    engine = fake_engine(query)
+    with engine.connect() as connection:
+        assert list(
+            connection.execute(text("SELECT id, done FROM foo WHERE done = 0"))
+        ) == [("rec1", False), ("rec2", False), ("rec3", False)]
+        assert (
+            list(connection.execute(text("SELECT id FROM foo WHERE done IS NULL")))
+            == []
+        )
+        assert list(connection.execute(text("SELECT id FROM foo WHERE done"))) == [
+            ("rec0",)
+        ]
+
+
+# (name, amount), names being of mixed case, which Airtable sorts differently
+# from SQLite
+NAMES_AMOUNTS: List[Tuple[str, int]] = [
+    (f"N{i}" if i % 5 == 0 else f"n{i}", i % 4) for i in range(250)
+]
+
+SORT_QUERIES = [
+    "",
+    "&sync_interval=60",
+    "&cache=memory",
+    "&prefetch_pages=2",
+    "&shards=4",
+    "&probe_ttl=10",
+]
+
+
+@pytest.mark.parametrize("query", SORT_QUERIES)
+def test_order_limit_offset(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine], query: str
+) -> None:
+    fake.add_table(
+        "base", "names", [{"name": n, "amount": a} for n, a in NAMES_AMOUNTS]
+    )
+    engine = fake_engine(query)
+    names = [name for name, _ in NAMES_AMOUNTS]
+    with engine.connect() as connection:
+        # LIMIT is pushed down even though Airtable can't sort text like SQLite
+        rows = connection.execute(text("SELECT name FROM names ORDER BY name LIMIT 3"))
+        assert [name for (name,) in rows] == sorted(names)[:3]
+
+        # OFFSET too only applies once sorted
+        rows = connection.execute(
+            text("SELECT name FROM names ORDER BY name LIMIT 3 OFFSET 4")
+        )
+        assert [name for (name,) in rows] == sorted(names)[4:7]
+
+        rows = connection.execute(
+            text("SELECT name FROM names ORDER BY amount DESC, name LIMIT 5 OFFSET 3")
+        )
+        assert [name for (name,) in rows] == [
+            name for name, _ in sorted(NAMES_AMOUNTS, key=lambda r: (-r[1], r[0]))
+        ][3:8]
+
+
+def test_run_benchmarks() -> None:
+    results = run_benchmarks(150, 2)
+
+    assert [result.name for result in results] == list(SCENARIOS)
+    by_name = {result.name: result for result in results}
+    # Two pages per scan
+    assert by_name["full_scan"].rows == 300
+    assert by_name["full_scan"].requests_per_query == 2
+    assert by_name["point_lookup"].requests_per_query == 1
+    assert by_name["decoding"].requests == 0
+    assert by_name["formulas"].requests == 0
+    assert all(result.percentile(99) >= result.percentile(50) for result in results)
+    assert "full_scan" in format_results(results)
@@ -1,8 +1,19 @@
 import math
+from typing import Any, List
 
 import pytest
+from shillelagh.fields import Boolean, ISODate, String
 
-from airtabledb.fields import AirtableFloat, AirtableScalar, MaybeListString, OverList
+from airtabledb.fields import (
+    AirtableFloat,
+    AirtableScalar,
+    Checkbox,
+    LinkedValues,
+    MaybeList,
+    MaybeListString,
+    OverList,
+    compile_parser,
+)
 
 
 def test_maybe_list_string_none():
@@ -45,6 +56,17 @@ def test_maybe_list_string_special():
         field.parse({"specialValue": "XXX"})
 
 
+def test_linked_values():
+    field = LinkedValues(ISODate())
+
+    assert field.type == "TEXT"
+    assert field.parse(None) is None
+    assert field.parse([]) is None
+    assert field.parse(["2022-01-05"]) == "2022-01-05"
+    assert field.parse(["2022-01-05", "2022-02-01"]) == "2022-01-05, 2022-02-01"
+    assert LinkedValues(AirtableFloat()).parse([1.5, 2]) == "1.5, 2"
+
+
 def test_airtable_float_special():
     field = AirtableFloat()
     assert math.isnan(field.parse({"specialValue": "NaN"}))
@@ -107,3 +129,65 @@ def test_airtable_scalar():
 
     with pytest.raises(TypeError):
         assert field.parse({})
+
+
+COMPILED_VALUES: List[Any] = [
+    None,
+    "a",
+    1,
+    1.5,
+    True,
+    [],
+    ["a"],
+    [1],
+    [None],
+    [{"id": "att1"}],
+    [1, 2],
+    [[1]],
+    [{}],
+    {},
+    {"id": "att1", "url": "http://example.com"},
+    {"specialValue": "Infinity"},
+    {"specialValue": "XXX"},
+    {"specialValue": ["NaN"]},
+    {"error": "#ERROR"},
+]
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        AirtableFloat(),
+        AirtableScalar(),
+        String(),
+        Boolean(),
+        Checkbox(),
+        MaybeListString(),
+        MaybeListString(allow_multiple=True),
+        MaybeList(AirtableFloat()),
+        OverList(AirtableScalar(), allow_multiple=True),
+    ],
+)
+@pytest.mark.parametrize("value", COMPILED_VALUES)
+def test_compile_parser(field, value):
+    parse = compile_parser(field)
+
+    try:
+        expected = field.parse(value)
+    except Exception as ex:
+        with pytest.raises(type(ex)):
+            parse(value)
+    else:
+        actual = parse(value)
+        if isinstance(expected, float) and math.isnan(expected):
+            assert math.isnan(actual)
+        else:
+            assert actual == expected
+
+
+def test_compile_parser_special():
+    parse = compile_parser(MaybeListString())
+
+    assert math.isnan(parse({"specialValue": "NaN"}))
+    assert math.isnan(parse([{"error": "#ERROR"}]))
+    assert parse([{"specialValue": "-Infinity"}]) == -math.inf
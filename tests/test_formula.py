@@ -1,6 +1,21 @@
+from datetime import datetime, timezone
+from urllib.parse import quote_plus
+
+import pytest
 from shillelagh import filters
 
-from airtabledb.formulas import get_airtable_formula, get_formula
+from airtabledb.filters import In
+from airtabledb.formulas import (
+    AND_BETTER,
+    RECORD_ID_ALPHABET,
+    _build_airtable_formula,
+    _build_formula,
+    get_airtable_formula,
+    get_airtable_formulas,
+    get_formula,
+    get_modified_since_formula,
+    get_shard_formulas,
+)
 
 
 def test_get_formula_is_null():
@@ -75,3 +90,108 @@ def test_get_formula_eq():
 
 def test_get_formula_neq():
     assert get_formula("the field", filters.NotEqual(33)) == "{the field}!=33"
+
+
+def test_get_shard_formulas():
+    assert get_shard_formulas(1) == [
+        "REGEX_MATCH(RECORD_ID(), '^rec[0123456789"
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz]')"
+    ]
+
+    shard_formulas = get_shard_formulas(5)
+    assert len(shard_formulas) == 5
+    assert shard_formulas[0] == "REGEX_MATCH(RECORD_ID(), '^rec[0123456789ABC]')"
+
+    # The shards are disjoint and cover every record id
+    shard_chars = [f.split("[")[1].split("]")[0] for f in shard_formulas]
+    assert "".join(shard_chars) == RECORD_ID_ALPHABET
+
+    with pytest.raises(ValueError):
+        get_shard_formulas(0)
+    with pytest.raises(ValueError):
+        get_shard_formulas(len(RECORD_ID_ALPHABET) + 1)
+
+
+def test_get_modified_since_formula():
+    assert (
+        get_modified_since_formula(datetime(2022, 3, 7, 20, 25, tzinfo=timezone.utc))
+        == "IS_AFTER(LAST_MODIFIED_TIME(), "
+        "DATETIME_PARSE('2022-03-07T20:25:00+00:00'))"
+    )
+
+
+def test_get_formula_in():
+    assert (
+        get_formula("id", In(["recA", "recB", "recA"]))
+        == "OR(RECORD_ID()='recA',RECORD_ID()='recB')"
+    )
+    assert get_formula("id", In(["recA"])) == "RECORD_ID()='recA'"
+    assert get_formula("the field", In([1, 2])) == "OR({the field}=1,{the field}=2)"
+    assert get_formula("the field", In([])) == "FALSE()"
+
+
+def test_get_airtable_formulas():
+    bounds = {"id": In([f"rec{i:014}" for i in range(100)])}
+    assert get_airtable_formulas(bounds) == [get_airtable_formula(bounds)]
+
+    bounds["the field"] = filters.Equal(1)
+    formulas = get_airtable_formulas(bounds, max_length=500)
+    assert len(formulas) > 1
+    assert all(len(quote_plus(formula)) <= 500 for formula in formulas)
+    assert all(formula.startswith("AND({the field}=1,OR(") for formula in formulas)
+    # Every id is in exactly one formula
+    assert sum(formula.count("RECORD_ID()") for formula in formulas) == 100
+    assert "RECORD_ID()='rec00000000000099'" in formulas[-1]
+
+
+@pytest.mark.parametrize("field_name", ["the field", "it's {x}", "id"])
+@pytest.mark.parametrize(
+    "value", [1, 1.5, True, "a'b", "{x}", datetime(2022, 3, 7, tzinfo=timezone.utc)]
+)
+def test_get_formula_template(field_name, value):
+    filters_ = [
+        filters.Equal(value),
+        filters.NotEqual(value),
+        filters.IsNull(),
+        filters.IsNotNull(),
+        filters.Range(start=value, end=value, include_start=True, include_end=True),
+        filters.Range(start=value, include_start=True),
+        filters.Range(end=value),
+        filters.Range(start=value, end="z", include_end=True),
+    ]
+    for filter_ in filters_:
+        try:
+            expected = _build_formula(field_name, filter_)
+        except NotImplementedError:
+            with pytest.raises(NotImplementedError):
+                get_formula(field_name, filter_)
+        else:
+            # Twice to also go through the compiled template
+            assert get_formula(field_name, filter_) == expected
+            assert get_formula(field_name, filter_) == expected
+
+
+def test_get_airtable_formula_cache():
+    assert get_airtable_formula({"a": filters.Equal(1)}) == "{a}=1"
+    # Equal values, but different formulas
+    assert get_airtable_formula({"a": filters.Equal(1.0)}) == "{a}=1.0"
+    assert get_airtable_formula({"a": filters.Equal("1")}) == "{a}='1'"
+    # Unhashable values are not cached
+    assert get_airtable_formula({"a": filters.Equal([1])}) == "{a}=[1]"
+
+
+def test_get_airtable_formula_compiled():
+    bounds = {
+        "the field": filters.Range(start=0, end=10, include_start=True),
+        "other field": filters.Equal("it's"),
+        "id": filters.Equal("recXXX"),
+    }
+
+    # The templated and cached formulas are those built field by field (see
+    # tests/benchmark.py for how long each takes)
+    uncompiled = AND_BETTER(
+        *(_build_formula(field_name, f) for field_name, f in bounds.items())
+    )
+    assert _build_airtable_formula(bounds) == uncompiled
+    assert get_airtable_formula(bounds) == uncompiled
+    assert get_airtable_formula(bounds) == uncompiled
@@ -0,0 +1,133 @@
+import logging
+from typing import Callable, Dict, Generator, List
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from airtabledb.instrumentation import (
+    QueryStats,
+    add_query_hook,
+    finish_query,
+    remove_query_hook,
+    start_query,
+)
+
+from .fake_airtable import FakeAirtable, Record
+
+RECORDS = [{"name": f"n{i}", "amount": i} for i in range(150)]
+
+
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    return {"foo": RECORDS}
+
+
+@pytest.fixture
+def queries() -> Generator[List[QueryStats], None, None]:
+    queries: List[QueryStats] = []
+    add_query_hook(queries.append)
+    yield queries
+    remove_query_hook(queries.append)
+
+
+def test_query_stats() -> None:
+    query_stats = QueryStats("base", "foo")
+    query_stats.add(requests=1, bytes_received=10)
+    query_stats.add(requests=1, json_seconds=0.5)
+    query_stats.add_formula("TRUE()")
+
+    assert query_stats.to_dict() == {
+        "base_id": "base",
+        "table": "foo",
+        "formulas": ["TRUE()"],
+        "elapsed": None,
+        "requests": 2,
+        "throttled": 0,
+        "pages": 0,
+        "bytes_received": 10,
+        "records_decoded": 0,
+        "rows": 0,
+        "request_seconds": 0.0,
+        "throttle_seconds": 0.0,
+        "json_seconds": 0.5,
+        "parse_seconds": 0.0,
+    }
+
+
+def test_query_hook_failure(caplog: pytest.LogCaptureFixture) -> None:
+    def hook(query_stats: QueryStats) -> None:
+        raise RuntimeError("boom")
+
+    add_query_hook(hook)
+    query_stats = start_query("base", "foo")
+    with caplog.at_level(logging.ERROR):
+        finish_query(query_stats)
+
+    assert query_stats.elapsed is not None
+    assert "failed" in caplog.text
+
+
+def test_query_instrumented(
+    fake: FakeAirtable,
+    fake_engine: Callable[[str], Engine],
+    queries: List[QueryStats],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    fake.throttle_every = 3
+    engine = fake_engine("")
+    with caplog.at_level(logging.DEBUG, logger="airtabledb"):
+        with engine.connect() as connection:
+            rows = list(connection.execute(text("SELECT name FROM foo")))
+            filtered = list(
+                connection.execute(text("SELECT name FROM foo WHERE amount < 5"))
+            )
+
+    assert len(rows) == 150
+    assert len(filtered) == 5
+    scan, lookup = [query for query in queries if query.rows]
+
+    # Two pages, one request of which was throttled and retried
+    assert scan.table == "foo"
+    assert scan.formulas == [None]
+    assert scan.pages == 2
+    assert scan.requests == 3
+    assert scan.throttled == 1
+    assert scan.records_decoded == scan.rows == 150
+    assert scan.bytes_received > 0
+    assert scan.json_seconds > 0
+    assert scan.parse_seconds > 0
+    assert scan.elapsed is not None and scan.elapsed >= scan.request_seconds
+
+    assert lookup.formulas == ["{amount} < 5"]
+    assert lookup.rows == 5
+    assert "filterByFormula: {amount} < 5" in caplog.text
+
+
+def test_query_span(fake_engine: Callable[[str], Engine]) -> None:
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry import trace  # type: ignore[import]
+    from opentelemetry.sdk.trace import TracerProvider  # type: ignore[import]
+    from opentelemetry.sdk.trace.export import (  # type: ignore[import]
+        SimpleSpanProcessor,
+    )
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # type: ignore[import] # noqa: E501
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    engine = fake_engine("")
+    with engine.connect() as connection:
+        list(connection.execute(text("SELECT name FROM foo")))
+
+    spans = [
+        span
+        for span in exporter.get_finished_spans()
+        if span.attributes["airtable.rows"]
+    ]
+    assert spans[0].name == "airtable.query"
+    assert spans[0].attributes["airtable.pages"] == 2
@@ -1,7 +1,10 @@
-from shillelagh.fields import Boolean, String
+import json
+
+import pytest
+from shillelagh.fields import ISODate, String
 
 from airtabledb import fields
-from airtabledb.lib import guess_field
+from airtabledb.lib import deserialize_field_info, guess_field, serialize_field_info
 
 
 def test_guess_field():
@@ -9,7 +12,7 @@ def test_guess_field():
     assert guess_field([1.5])[0] is fields.AirtableFloat
     assert guess_field([1, 1.5])[0] is fields.AirtableFloat
 
-    assert guess_field([True])[0] is Boolean
+    assert guess_field([True])[0] is fields.Checkbox
 
     assert guess_field(["a"])[0] is String
 
@@ -23,3 +26,35 @@ def test_guess_field():
 
     # Not sure if this comes up in practice
     assert guess_field(["a", 4])[0] is fields.MaybeListString
+
+
+def test_serialize_field_info():
+    for values in ([1], [True], ["a"], [["a"], ["b"]], [[1.5]], ["a", 4], [[["a"]]]):
+        field_info = guess_field(values)
+        serialized = serialize_field_info(field_info)
+        # Round trips through JSON
+        assert json.loads(json.dumps(serialized)) == serialized
+
+        field_cls, field_kwargs = deserialize_field_info(serialized)
+        assert field_cls is field_info[0]
+        assert serialize_field_info((field_cls, field_kwargs)) == serialized
+
+    field_cls, field_kwargs = deserialize_field_info(
+        serialize_field_info(guess_field([["a"], ["b"]]))
+    )
+    assert type(field_kwargs["field"]) is String
+    assert field_kwargs["allow_multiple"] is True
+
+    field_cls, field_kwargs = deserialize_field_info(
+        serialize_field_info((fields.MaybeList, {"field": ISODate()}))
+    )
+    assert field_cls is fields.MaybeList
+    assert type(field_kwargs["field"]) is ISODate
+
+
+def test_serialize_field_info_unknown():
+    class Unknown(String):
+        pass
+
+    with pytest.raises(TypeError):
+        serialize_field_info((Unknown, {}))
@@ -0,0 +1,206 @@
+from typing import Callable, Dict, List
+
+import pytest
+from shillelagh.filters import Filter, Range
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from airtabledb.adapter import AirtableAdapter
+from airtabledb.client import AirtableTable
+from airtabledb.instrumentation import QueryStats, add_query_hook
+from airtabledb.links import LinkedRecords, expand_rows
+from airtabledb.metadata import fetch_base_metadata
+
+from .fake_airtable import FakeAirtable, Record
+
+ITEMS = [
+    {"name": f"item{i}", "price": float(i), "tags": ["a", "b"] if i % 2 else ["c"]}
+    for i in range(300)
+]
+
+
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    return {"items": ITEMS}
+
+
+@pytest.fixture
+def orders(fake: FakeAirtable) -> str:
+    """Add the orders, linking to the items, and return the id of their table."""
+    item_ids = [record["id"] for record in fake.get_records("base", "items")]
+    return fake.add_table(
+        "base",
+        "orders",
+        [
+            # Each order links to two of the items, items being reused
+            {"number": i, "items": [item_ids[i % 150], item_ids[i % 150 + 150]]}
+            for i in range(200)
+        ]
+        + [{"number": 200}],
+        fields=[
+            {"name": "number", "type": "number"},
+            {
+                "name": "items",
+                "type": "multipleRecordLinks",
+                "options": {"linkedTableId": fake.get_table_id("base", "items")},
+            },
+        ],
+    )
+
+
+def test_linked_records(
+    fake: FakeAirtable, fake_table: Callable[[str], AirtableTable]
+) -> None:
+    table = fake_table("items")
+    item_ids = [record["id"] for record in fake.get_records("base", "items")]
+    linked_records = LinkedRecords(table, ["price"])
+
+    linked_records.fetch(item_ids + ["recMISSING"])
+    # 300 ids take more than one formula, but not one request per id
+    assert 1 < fake.request_count < 10
+    assert linked_records.get(item_ids[3]) == {"price": 3.0}
+    assert linked_records.get("recMISSING") == {}
+
+    fake.reset_counts()
+    rows = expand_rows(
+        [{"items": item_ids[1:3]}, {"items": None}],
+        [("items", linked_records, [("items.price", "price")])],
+    )
+    assert rows == [
+        {"items": item_ids[1:3], "items.price": [1.0, 2.0]},
+        {"items": None, "items.price": None},
+    ]
+    assert fake.request_count == 0
+
+
+def test_expand(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine], orders: str
+) -> None:
+    engine = fake_engine("&expand=orders.items:name,price,tags")
+    queries: List[QueryStats] = []
+    add_query_hook(queries.append)
+
+    with engine.connect() as connection:
+        fake.reset_counts()
+        rows = list(
+            connection.execute(
+                text(
+                    'SELECT number, "items.name", "items.price", "items.tags" '
+                    "FROM orders ORDER BY number"
+                )
+            )
+        )
+    assert rows[0] == (0, "item0, item150", "0.0, 150.0", "c, c")
+    assert rows[1] == (1, "item1, item151", "1.0, 151.0", "a, b, a, b")
+    assert rows[-1] == (200, None, None, None)
+
+    # 3 pages of orders, and the items they link to in a few batches per page
+    # (rather than one lookup per order)
+    (query_stats,) = [qs for qs in queries if qs.table == "orders"]
+    assert query_stats.requests == fake.request_count
+    assert fake.request_count < 15
+    assert any("RECORD_ID()" in (formula or "") for formula in query_stats.formulas)
+
+
+def test_expand_typed(fake: FakeAirtable, fake_engine: Callable[[str], Engine]) -> None:
+    tasks_id = fake.add_table(
+        "base",
+        "tasks",
+        [
+            {"due": "2022-01-05", "hours": 1.5},
+            {"due": "2022-02-01", "hours": 2.5},
+            {"due": "2022-03-01", "hours": 4.5},
+        ],
+        fields=[
+            {"name": "due", "type": "date"},
+            {"name": "hours", "type": "number"},
+        ],
+    )
+    task_ids = [record["id"] for record in fake.get_records("base", "tasks")]
+    fake.add_table(
+        "base",
+        "projects",
+        [{"number": 0, "tasks": task_ids[:2]}, {"number": 1, "tasks": task_ids[2:]}],
+        fields=[
+            {"name": "number", "type": "number"},
+            {
+                "name": "tasks",
+                "type": "multipleRecordLinks",
+                "options": {"linkedTableId": tasks_id},
+            },
+        ],
+    )
+    engine = fake_engine("&expand=projects.tasks:due,hours")
+
+    with engine.connect() as connection:
+        rows = list(
+            connection.execute(
+                text(
+                    'SELECT "tasks.due", "tasks.hours" FROM projects '
+                    'ORDER BY "tasks.due"'
+                )
+            )
+        )
+    # Text, whether one or several records are linked to
+    assert rows == [
+        ("2022-01-05, 2022-02-01", "1.5, 2.5"),
+        ("2022-03-01", "4.5"),
+    ]
+
+
+def test_expand_not_requested(fake: FakeAirtable, orders: str) -> None:
+    adapter = AirtableAdapter(
+        "orders",
+        base_id="base",
+        api_key="key",
+        base_metadata=fetch_base_metadata("key", "base", api_url=fake.api_url),
+        peek_rows=None,
+        date_columns=None,
+        rate_limit=1000,
+        api_url=fake.api_url,
+        expand={"orders": {"items": ["price"]}},
+    )
+    bounds: Dict[str, Filter] = {"number": Range(None, 5, False, False)}
+
+    fake.reset_counts()
+    rows = list(adapter.get_data(bounds, [], requested_columns=["number"]))
+    assert len(rows) == 5
+    assert "items.price" not in rows[0]
+    assert fake.request_count == 1
+
+    # The link field is fetched for the derived column
+    fake.reset_counts()
+    rows = list(adapter.get_data(bounds, [], requested_columns=["items.price"]))
+    assert [row["items.price"] for row in rows[:2]] == [[0.0, 150.0], [1.0, 151.0]]
+    assert fake.request_count == 2
+
+
+def test_expand_query_stats(fake: FakeAirtable, orders: str) -> None:
+    adapter = AirtableAdapter(
+        "orders",
+        base_id="base",
+        api_key="key",
+        base_metadata=fetch_base_metadata("key", "base", api_url=fake.api_url),
+        peek_rows=None,
+        date_columns=None,
+        rate_limit=1000,
+        api_url=fake.api_url,
+        expand={"orders": {"items": ["price"]}},
+    )
+    item_ids = [record["id"] for record in fake.get_records("base", "items")]
+
+    query_stats = adapter._start_query()
+    pages = adapter._expand_row_pages(iter([iter([{"items": item_ids[:2]}])]), None)
+    # e.g. the other side of a self join, started before the first page is read
+    other_query_stats = adapter._start_query()
+    assert [row["items.price"] for rows in pages for row in rows] == [[0.0, 1.0]]
+
+    assert query_stats.requests == 1
+    assert other_query_stats.requests == 0
+
+
+def test_expand_errors(fake_engine: Callable[[str], Engine], orders: str) -> None:
+    for expand in ("orders.items:nope", "orders.number:name", "orders.nope:name"):
+        with pytest.raises(ValueError):
+            with fake_engine(f"&expand={expand}").connect() as connection:
+                connection.execute(text("SELECT * FROM orders"))
@@ -0,0 +1,60 @@
+from shillelagh import filters
+from shillelagh.fields import Order, String
+
+from airtabledb.fields import AirtableFloat, MaybeListString
+from airtabledb.local import matches, sort_rows
+
+COLUMNS = {
+    "id": String(),
+    "num": AirtableFloat(),
+    "any": MaybeListString(allow_multiple=True),
+}
+
+
+def test_matches():
+    row = {"id": "rec1", "num": 3, "any": ["a"]}
+
+    assert matches(row, {}, COLUMNS)
+    assert matches(row, {"id": filters.Equal("rec1")}, COLUMNS)
+    assert not matches(row, {"id": filters.Equal("rec2")}, COLUMNS)
+    assert matches(row, {"any": filters.Equal("a")}, COLUMNS)
+    assert matches(
+        row, {"num": filters.Range(start=2, end=3, include_end=True)}, COLUMNS
+    )
+    assert not matches(row, {"num": filters.Range(start=3)}, COLUMNS)
+    assert matches(row, {"num": filters.NotEqual(2)}, COLUMNS)
+    assert not matches(row, {"num": filters.IsNull()}, COLUMNS)
+    assert matches(row, {"num": filters.IsNotNull()}, COLUMNS)
+
+
+def test_matches_null():
+    row = {"id": "rec1"}
+
+    assert matches(row, {"num": filters.IsNull()}, COLUMNS)
+    assert not matches(row, {"num": filters.IsNotNull()}, COLUMNS)
+    assert not matches(row, {"num": filters.NotEqual(2)}, COLUMNS)
+    assert not matches(row, {"num": filters.Range(end=2)}, COLUMNS)
+
+
+def test_sort_rows():
+    rows = [
+        {"id": "rec1", "num": 2, "any": "b"},
+        {"id": "rec2", "num": 1, "any": "b"},
+        {"id": "rec3", "any": "a"},
+        {"id": "rec4", "num": 3, "any": 1},
+    ]
+
+    def ids(order):
+        return [row["id"] for row in sort_rows(rows, order, COLUMNS)]
+
+    assert ids([]) == ["rec1", "rec2", "rec3", "rec4"]
+    # NULLs first, like SQLite
+    assert ids([("num", Order.ASCENDING)]) == ["rec3", "rec2", "rec1", "rec4"]
+    assert ids([("num", Order.DESCENDING)]) == ["rec4", "rec1", "rec2", "rec3"]
+    # Numbers before text
+    assert ids([("any", Order.ASCENDING), ("num", Order.DESCENDING)]) == [
+        "rec4",
+        "rec3",
+        "rec1",
+        "rec2",
+    ]
@@ -0,0 +1,111 @@
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from airtabledb import materialize
+
+from .fake_airtable import FakeAirtable, Record
+
+RECORDS = [{"name": f"n{i}", "amount": i} for i in range(250)]
+
+
+@pytest.fixture
+def fake_tables() -> Dict[str, List[Record]]:
+    return {"foo": RECORDS}
+
+
+def test_materialize_url(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine]
+) -> None:
+    engine = fake_engine("&materialize=foo:name,amount")
+
+    with engine.connect() as connection:
+        # Copied once, in 3 pages
+        assert fake.request_count == 4
+        fake.reset_counts()
+
+        assert list(
+            connection.execute(text("SELECT name, amount FROM foo WHERE name = 'n3'"))
+        ) == [("n3", 3.0)]
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(250,)]
+        plan = list(
+            connection.execute(
+                text("EXPLAIN QUERY PLAN SELECT * FROM foo WHERE name = 'n3'")
+            )
+        )
+        assert "USING INDEX foo__name" in plan[0][-1]
+        assert fake.request_count == 0
+
+        # Not refreshed without a TTL
+        ((record_id,),) = connection.execute(
+            text("SELECT id FROM foo WHERE name = 'n0'")
+        )
+        fake.update_record("base", "foo", record_id, {"name": "new"})
+        assert list(
+            connection.execute(text("SELECT COUNT(*) FROM foo WHERE name = 'new'"))
+        ) == [(0,)]
+
+        dbapi_connection: Any = connection.connection.dbapi_connection
+        materialize.refresh(dbapi_connection)
+        assert list(
+            connection.execute(text("SELECT COUNT(*) FROM foo WHERE name = 'new'"))
+        ) == [(1,)]
+        assert fake.request_count == 3
+
+
+def test_materialize_ttl(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine]
+) -> None:
+    engine = fake_engine("&materialize=foo&materialize_ttl=0.1")
+
+    with engine.connect() as connection:
+        fake.reset_counts()
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(250,)]
+        assert fake.request_count == 0
+
+        time.sleep(0.2)
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(250,)]
+        assert fake.request_count == 3
+
+
+def test_materialize_where(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine]
+) -> None:
+    engine = fake_engine("")
+
+    with engine.connect() as connection:
+        dbapi_connection: Any = connection.connection.dbapi_connection
+        materialization = materialize.materialize(
+            dbapi_connection, "foo", where="amount < ?", parameters=[10]
+        )
+        assert not materialization.is_stale()
+
+        fake.reset_counts()
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(10,)]
+        assert fake.request_count == 0
+
+
+def test_materialize_path(
+    fake: FakeAirtable, fake_engine: Callable[[str], Engine], tmp_path: Path
+) -> None:
+    path = tmp_path / "materialized.db"
+    query = f"&materialize=foo:name&materialize_path={path}"
+
+    with fake_engine(query).connect() as connection:
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(250,)]
+
+    # A new engine reuses the copy in the file
+    fake.reset_counts()
+    with fake_engine(query).connect() as connection:
+        assert list(connection.execute(text("SELECT COUNT(*) FROM foo"))) == [(250,)]
+    assert fake.request_count == 1
+
+    # But not a copy made with a different definition
+    fake.reset_counts()
+    with fake_engine(f"&materialize=foo&materialize_path={path}").connect():
+        pass
+    assert fake.request_count == 4
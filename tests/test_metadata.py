@@ -0,0 +1,114 @@
+import responses
+from shillelagh.fields import ISODate, ISODateTime, String
+
+from airtabledb.fields import AirtableFloat, Checkbox, MaybeListString
+from airtabledb.metadata import (
+    fetch_base_metadata,
+    get_created_time_field,
+    get_field_info,
+)
+from airtabledb.types import ColumnMetadata
+
+BASE_SCHEMA = {
+    "tables": [
+        {
+            "id": "tblFoo",
+            "name": "foo",
+            "primaryFieldId": "fld1",
+            "fields": [
+                {"id": "fld1", "name": "Name", "type": "singleLineText"},
+                {
+                    "id": "fld2",
+                    "name": "Amount",
+                    "type": "currency",
+                    "options": {"precision": 2, "symbol": "$"},
+                },
+                {"id": "fld3", "name": "Done", "type": "checkbox"},
+                {"id": "fld4", "name": "Due", "type": "date"},
+                {
+                    "id": "fld5",
+                    "name": "Total",
+                    "type": "formula",
+                    "options": {"result": {"type": "number"}},
+                },
+                {"id": "fld6", "name": "Links", "type": "multipleRecordLinks"},
+            ],
+            "views": [],
+        }
+    ]
+}
+
+
+def test_get_field_info():
+    def field_cls(**kwargs):
+        return get_field_info(ColumnMetadata(name="col", **kwargs))[0]
+
+    assert field_cls() is MaybeListString
+    assert field_cls(type="singleLineText") is String
+    assert field_cls(type="number") is AirtableFloat
+    assert field_cls(type="checkbox") is Checkbox
+    assert field_cls(type="date") is ISODate
+    assert field_cls(type="dateTime") is ISODateTime
+    assert field_cls(type="multipleAttachments") is MaybeListString
+    assert field_cls(type="somethingNew") is MaybeListString
+
+    assert (
+        field_cls(type="formula", options={"result": {"type": "number"}})
+        is AirtableFloat
+    )
+    assert (
+        field_cls(type="rollup", options={"result": {"type": "dateTime"}})
+        is ISODateTime
+    )
+    # Results can be lists
+    assert field_cls(type="formula", options={}) is MaybeListString
+
+
+def test_fetch_base_metadata(mocked_responses: responses.RequestsMock) -> None:
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/meta/bases/base/tables",
+        json=BASE_SCHEMA,
+    )
+
+    base_metadata = fetch_base_metadata("key", "base")
+    assert list(base_metadata) == ["tblFoo"]
+    assert base_metadata["tblFoo"]["name"] == "foo"
+
+    columns = base_metadata["tblFoo"]["columns"]
+    assert [col["name"] for col in columns] == [
+        "Name",
+        "Amount",
+        "Done",
+        "Due",
+        "Total",
+        "Links",
+    ]
+    assert columns[1] == {
+        "name": "Amount",
+        "type": "currency",
+        "options": {"precision": 2, "symbol": "$"},
+    }
+
+
+def test_get_created_time_field():
+    assert get_created_time_field([ColumnMetadata(name="a", type="number")]) is None
+    assert (
+        get_created_time_field(
+            [
+                ColumnMetadata(name="a", type="number"),
+                ColumnMetadata(name="b", type="createdTime"),
+            ]
+        )
+        == "b"
+    )
+    assert (
+        get_created_time_field(
+            [
+                ColumnMetadata(
+                    name="c", type="formula", options={"formula": "created_time() "}
+                )
+            ]
+        )
+        == "c"
+    )
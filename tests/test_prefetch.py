@@ -0,0 +1,54 @@
+import threading
+from typing import Iterator
+
+import pytest
+
+from airtabledb.prefetch import merge, prefetch
+
+
+def test_prefetch_order():
+    assert list(prefetch(iter(range(10)), 2)) == list(range(10))
+    assert list(prefetch(iter([]), 1)) == []
+
+
+def test_prefetch_error():
+    def items() -> Iterator[int]:
+        yield 1
+        raise KeyError("boom")
+
+    it = prefetch(items(), 3)
+    assert next(it) == 1
+    with pytest.raises(KeyError):
+        next(it)
+
+
+def test_prefetch_bounded():
+    produced = []
+    release = threading.Event()
+
+    def items() -> Iterator[int]:
+        for i in range(10):
+            produced.append(i)
+            yield i
+        release.set()
+
+    it = prefetch(items(), 2)
+    assert next(it) == 0
+    # Give the producer a chance to run ahead
+    assert not release.wait(0.3)
+    # One consumed, two buffered and one waiting to be put
+    assert len(produced) <= 4
+
+    it.close()
+
+
+def test_prefetch_invalid_depth():
+    with pytest.raises(ValueError):
+        list(prefetch(iter([1]), 0))
+
+
+def test_merge():
+    merged = list(merge([iter(range(5)), iter(range(10, 13)), iter([])], 2))
+    assert sorted(merged) == [0, 1, 2, 3, 4, 10, 11, 12]
+
+    assert list(merge([], 1)) == []
@@ -0,0 +1,58 @@
+import time
+
+from airtabledb.probes import ProbeMemo
+
+
+def test_probe_memo():
+    memo = ProbeMemo(ttl=60)
+
+    assert memo.get("a") is None
+    # Only kept once repeated
+    memo.set("a", [{"id": "recA"}])
+    assert memo.get("a") is None
+    memo.set("a", [{"id": "recA"}])
+    assert memo.get("a") == [{"id": "recA"}]
+
+    memo.clear()
+    assert memo.get("a") is None
+
+
+def test_probe_memo_max_bytes():
+    memo = ProbeMemo(ttl=60, max_bytes=30)
+    for key in ("a", "a", "b", "b"):
+        memo.set(key, [{"id": f"rec{key}"}])
+
+    assert memo.get("a") == [{"id": "reca"}]
+    assert memo.get("b") is None
+
+
+def test_probe_memo_ttl():
+    memo = ProbeMemo(ttl=0.01)
+    memo.set("a", [])
+    memo.set("a", [])
+    memo.set_table_rows([])
+
+    time.sleep(0.02)
+    assert memo.get("a") is None
+    assert memo.get_table_rows() is None
+
+
+def test_probe_memo_should_prefetch():
+    assert not ProbeMemo(ttl=60).should_prefetch
+
+    memo = ProbeMemo(ttl=60, prefetch_threshold=2)
+    memo.set("a", [])
+    assert not memo.should_prefetch
+    memo.set("b", [])
+    assert memo.should_prefetch
+
+    memo.set_table_rows([{"id": "recA"}])
+    assert not memo.should_prefetch
+    assert memo.get_table_rows() == [{"id": "recA"}]
+
+    # Not fetched again when too big to keep
+    memo = ProbeMemo(ttl=60, prefetch_threshold=1, max_bytes=10)
+    memo.set("a", [])
+    memo.set_table_rows([{"id": "recA"}])
+    assert not memo.should_prefetch
+    assert memo.get_table_rows() is None
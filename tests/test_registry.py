@@ -0,0 +1,27 @@
+import pytest
+
+from airtabledb.registry import Registry
+
+
+def test_registry(caplog: pytest.LogCaptureFixture) -> None:
+    registry: Registry[str, object] = Registry("thing")
+
+    thing = registry.get_or_create("a", object, size=1, ttl=None)
+    assert registry.get_or_create("a", object, size=1, ttl=None) is thing
+    # None is the default, which doesn't differ from anything
+    assert registry.get_or_create("a", object, size=None, ttl=5) is thing
+    assert not caplog.records
+
+    assert registry.get_or_create("a", object, size=2) is thing
+    assert "The thing for 'a' already exists with other size" in caplog.text
+
+    assert registry.get_or_create("b", object) is not thing
+    assert registry.get("a") is thing
+    assert registry.get("c") is None
+
+    other = object()
+    registry.set("a", other)
+    assert registry.get("a") is other
+
+    registry.clear()
+    assert registry.get("a") is None
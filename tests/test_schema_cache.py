@@ -0,0 +1,84 @@
+import time
+from pathlib import Path
+
+from shillelagh.fields import String
+
+from airtabledb.fields import AirtableFloat, OverList
+from airtabledb.schema_cache import SchemaCache, get_schema_cache
+
+
+def test_schema_cache(tmp_path: Path):
+    path = str(tmp_path / "schema.json")
+    schema_cache = SchemaCache(path)
+
+    assert schema_cache.get("base", "foo", None, api_key="key") is None
+    schema_cache.set(
+        "base",
+        "foo",
+        None,
+        {
+            "a": (AirtableFloat, {}),
+            "b": (OverList, {"field": String(), "allow_multiple": True}),
+        },
+        api_key="key",
+    )
+
+    # Read back by another instance (e.g. another process)
+    columns = SchemaCache(path).get("base", "foo", None, api_key="key")
+    assert columns is not None
+    assert columns["a"] == (AirtableFloat, {})
+    assert columns["b"][0] is OverList
+    assert type(columns["b"][1]["field"]) is String
+
+    # Keyed by peek_rows too
+    assert schema_cache.get("base", "foo", 10, api_key="key") is None
+    assert schema_cache.get("base", "bar", None, api_key="key") is None
+    # and by credentials, as the field names may not be visible to everyone
+    assert schema_cache.get("base", "foo", None, api_key="other") is None
+    assert (
+        schema_cache.get("base", "foo", None, api_key="key", api_url="http://fake")
+        is None
+    )
+
+
+def test_schema_cache_ttl(tmp_path: Path):
+    schema_cache = SchemaCache(str(tmp_path / "schema.json"), ttl=0.01)
+    schema_cache.set("base", "foo", None, {"a": (AirtableFloat, {})}, api_key="key")
+    time.sleep(0.02)
+    assert schema_cache.get("base", "foo", None, api_key="key") is None
+
+
+def test_schema_cache_invalidate(tmp_path: Path):
+    schema_cache = SchemaCache(str(tmp_path / "schema.json"))
+    for base_id, table in [("base", "foo"), ("base", "bar"), ("other", "foo")]:
+        schema_cache.set(
+            base_id, table, None, {"a": (AirtableFloat, {})}, api_key="key"
+        )
+
+    schema_cache.invalidate("base", "foo")
+    assert schema_cache.get("base", "foo", None, api_key="key") is None
+    assert schema_cache.get("base", "bar", None, api_key="key") is not None
+
+    schema_cache.invalidate("base")
+    assert schema_cache.get("base", "bar", None, api_key="key") is None
+    assert schema_cache.get("other", "foo", None, api_key="key") is not None
+
+    schema_cache.invalidate()
+    assert schema_cache.get("other", "foo", None, api_key="key") is None
+
+
+def test_schema_cache_corrupt(tmp_path: Path):
+    path = tmp_path / "schema.json"
+    path.write_text("{not json")
+
+    schema_cache = SchemaCache(str(path))
+    assert schema_cache.get("base", "foo", None, api_key="key") is None
+    schema_cache.set("base", "foo", None, {"a": (AirtableFloat, {})}, api_key="key")
+    assert schema_cache.get("base", "foo", None, api_key="key") is not None
+
+
+def test_get_schema_cache(tmp_path: Path):
+    path = str(tmp_path / "schema.json")
+    schema_cache = get_schema_cache(path, ttl=10)
+    assert schema_cache.ttl == 10
+    assert get_schema_cache(path) is schema_cache
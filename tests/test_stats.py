@@ -0,0 +1,162 @@
+import time
+from typing import Any, Dict, Generator, cast
+
+import pytest
+import responses
+from shillelagh.filters import Operator
+
+from airtabledb import stats
+from airtabledb.adapter import AirtableAdapter
+from airtabledb.stats import ScanStats, TableStats, get_table_stats, set_table_stats
+from airtabledb.types import BaseMetadata, TableMetadata
+
+
+def test_estimate_cost():
+    small = TableStats(50, {"a": 5})
+    big = TableStats(200_000, {"a": 5, "b": 100_000})
+
+    assert small.estimate_rows([]) == 50
+    assert small.estimate_rows([("a", Operator.EQ)]) == 10
+    assert big.estimate_rows([("id", Operator.EQ)]) == 1
+    assert big.estimate_rows([("b", Operator.EQ)]) == 2
+    # Without a distinct count
+    assert big.estimate_rows([("c", Operator.EQ)]) == 20_000
+    assert big.estimate_rows([("c", Operator.GT)]) == pytest.approx(200_000 / 3)
+
+    # A full scan of a small table is cheaper than one of a big table
+    assert small.estimate_cost([]) < big.estimate_cost([])
+    # and than a lookup on the big table
+    assert big.estimate_cost([("b", Operator.EQ)]) < small.estimate_cost([])
+    assert big.estimate_cost([("id", Operator.EQ)]) < big.estimate_cost(
+        [("b", Operator.EQ)]
+    )
+
+
+def test_scan_stats():
+    scan_stats = ScanStats(["a", "b", "c"])
+    for i in range(10):
+        scan_stats.add({"a": i % 3, "b": [i % 2], "c": None})
+
+    table_stats = scan_stats.finish()
+    assert table_stats.row_count == 10
+    assert table_stats.distinct == {"a": 3, "b": 2, "c": 0}
+
+
+def test_scan_stats_previous():
+    scan_stats = ScanStats(["a"])
+    scan_stats.add({"a": 1})
+
+    table_stats = scan_stats.finish(TableStats(5, {"a": 3, "b": 4}))
+    assert table_stats.row_count == 1
+    assert table_stats.distinct == {"a": 1, "b": 4}
+
+
+def test_scan_stats_saturated(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(stats, "MAX_DISTINCT", 10)
+
+    scan_stats = ScanStats(["a"])
+    for i in range(100):
+        scan_stats.add({"a": i})
+
+    # Extrapolated from the first 10 rows
+    assert scan_stats.finish().distinct == {"a": 100}
+
+
+def test_get_table_stats():
+    assert get_table_stats("base", "foo") is None
+
+    table_stats = TableStats(10)
+    set_table_stats("base", "foo", table_stats)
+    assert get_table_stats("base", "foo") is table_stats
+
+    time.sleep(0.01)
+    assert get_table_stats("base", "foo", ttl=0.001) is None
+
+
+def _get_adapter(**kwargs) -> AirtableAdapter:
+    base_metadata: BaseMetadata = dict(
+        tblFoo=TableMetadata(
+            name="foo",
+            columns=[{"name": "a", "type": "number"}, {"name": "b", "type": "number"}],
+        )
+    )
+    return AirtableAdapter(
+        "foo",
+        base_id="base",
+        api_key="key",
+        base_metadata=base_metadata,
+        peek_rows=None,
+        date_columns=None,
+        **kwargs,
+    )
+
+
+def _add_records(mocked_responses: responses.RequestsMock, count: int) -> None:
+    mocked_responses.add(
+        method=responses.GET,
+        url="https://api.airtable.com/v0/base/foo",
+        json={
+            "records": [
+                {
+                    "id": f"rec{i}",
+                    "createdTime": "2022-03-07T20:25:26.000Z",
+                    "fields": {"a": i % 2},
+                }
+                for i in range(count)
+            ]
+        },
+    )
+
+
+def test_full_scan_stats(mocked_responses: responses.RequestsMock):
+    _add_records(mocked_responses, 4)
+    adapter = _get_adapter()
+    without_stats = adapter.get_cost([], [])
+
+    # A scan that was stopped early tells us nothing
+    rows = cast(Generator[Dict[str, Any], None, None], adapter.get_data({}, []))
+    next(rows)
+    rows.close()
+    assert get_table_stats("base", "foo") is None
+
+    assert len(list(adapter.get_data({}, []))) == 4
+    table_stats = get_table_stats("base", "foo")
+    assert table_stats is not None
+    assert table_stats.row_count == 4
+    # Distinct values are only collected with collect_stats
+    assert table_stats.distinct == {}
+
+    assert adapter.get_cost([], []) == table_stats.estimate_cost([])
+    assert adapter.get_cost([], []) != without_stats
+
+
+def test_full_scan_distinct(mocked_responses: responses.RequestsMock):
+    _add_records(mocked_responses, 4)
+    adapter = _get_adapter(collect_stats=True)
+
+    assert len(list(adapter.get_data({}, []))) == 4
+    table_stats = get_table_stats("base", "foo")
+    assert table_stats is not None
+    assert table_stats.distinct["a"] == 2
+
+    # A projected scan keeps the counts of the columns it did not fetch
+    assert len(list(adapter.get_data({}, [], requested_columns=["b"]))) == 4
+    table_stats = get_table_stats("base", "foo")
+    assert table_stats is not None
+    assert table_stats.distinct["a"] == 2
+    assert table_stats.distinct["b"] == 0
+
+
+def test_collect_stats(mocked_responses: responses.RequestsMock):
+    _add_records(mocked_responses, 3)
+    _get_adapter(collect_stats=True)
+
+    table_stats = get_table_stats("base", "foo")
+    assert table_stats is not None
+    assert table_stats.row_count == 3
+    # Only the ids were needed
+    assert mocked_responses.calls[0].request.url.endswith("?fields%5B%5D=a")
+
+    # Known statistics aren't collected again
+    _get_adapter(collect_stats=True)
+    assert len(mocked_responses.calls) == 1
@@ -0,0 +1,99 @@
+from typing import Any, Dict, List
+
+import pytest
+import responses
+
+from airtabledb.client import AirtableTable
+from airtabledb.formulas import get_modified_since_formula
+from airtabledb.sync import TableMirror, get_mirror
+from airtabledb.throttle import TokenBucket
+
+URL = "https://api.airtable.com/v0/base/foo"
+
+
+def _record(record_id: str, value: Any) -> Dict[str, Any]:
+    return {"id": record_id, "createdTime": "", "fields": {"a": value}}
+
+
+def _add(
+    mocked_responses: responses.RequestsMock,
+    params: Dict[str, str],
+    records: List[Dict[str, Any]],
+) -> responses.BaseResponse:
+    return mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        match=[responses.matchers.query_param_matcher(params)],
+        json={"records": records},
+    )
+
+
+def _get_mirror(sync_interval: float = 0) -> TableMirror:
+    table = AirtableTable("key", "base", "foo", rate_limiter=TokenBucket(rate=1000))
+    return TableMirror(table, id_fields=["a"], sync_interval=sync_interval)
+
+
+def mirror_formula(mirror: TableMirror) -> str:
+    assert mirror._watermark is not None
+    return get_modified_since_formula(mirror._watermark)
+
+
+def test_mirror_sync(mocked_responses: responses.RequestsMock) -> None:
+    full = _add(mocked_responses, {}, [_record("rec1", 1), _record("rec2", 2)])
+
+    mirror = _get_mirror()
+    assert sorted(r["id"] for r in mirror.get_records()) == ["rec1", "rec2"]
+    assert full.call_count == 1
+
+    # rec1 was deleted, rec3 created and rec2 changed
+    ids = _add(
+        mocked_responses,
+        {"fields[]": "a"},
+        [_record("rec2", None), _record("rec3", None)],
+    )
+    mocked_responses.add(
+        method=responses.GET,
+        url=URL,
+        match=[
+            responses.matchers.query_param_matcher(
+                {"filterByFormula": mirror_formula(mirror)}
+            )
+        ],
+        json={"records": [_record("rec2", 22), _record("rec3", 3)]},
+    )
+
+    records = {r["id"]: r["fields"]["a"] for r in mirror.get_records()}
+    assert records == {"rec2": 22, "rec3": 3}
+    assert ids.call_count == 1
+
+
+def test_mirror_sync_interval(mocked_responses: responses.RequestsMock) -> None:
+    full = _add(mocked_responses, {}, [_record("rec1", 1)])
+
+    mirror = _get_mirror(sync_interval=3600)
+    for _ in range(3):
+        assert len(mirror.get_records()) == 1
+    assert full.call_count == 1
+
+    mirror.invalidate()
+    assert len(mirror.get_records()) == 1
+    assert full.call_count == 2
+
+
+def test_get_mirror(caplog: pytest.LogCaptureFixture) -> None:
+    table = AirtableTable("key", "base", "foo", rate_limiter=TokenBucket(rate=1000))
+    mirror = get_mirror("base", "foo", table, [], 10)
+    assert get_mirror("base", "foo", table, [], 10) is mirror
+    assert not caplog.records
+
+    # The first settings are kept, and the others reported
+    assert get_mirror("base", "foo", table, ["a"], 20) is mirror
+    assert mirror.sync_interval == 10
+    assert "id_fields, sync_interval" in caplog.text
+    assert get_mirror("base", "bar", table, [], 10) is not mirror
+
+    # Records fetched with one API key are not served to another
+    other_table = AirtableTable(
+        "other", "base", "foo", rate_limiter=TokenBucket(rate=1000)
+    )
+    assert get_mirror("base", "foo", other_table, [], 10) is not mirror
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from airtabledb.throttle import (
+    AIRTABLE_REQUESTS_PER_SECOND,
+    TokenBucket,
+    get_rate_limiter,
+)
+
+
+def test_token_bucket_burst():
+    bucket = TokenBucket(rate=100, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() > 0
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # The first token is free, the remaining 5 are paced at 50 / sec
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    start = time.monotonic()
+    assert bucket.reserve() == 0.0
+    # Reservations queue up, without blocking
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    assert time.monotonic() - start < 0.05
+
+
+def test_token_bucket_invalid():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_penalize():
+    bucket = TokenBucket(rate=100, capacity=5)
+
+    bucket.penalize(0.05)
+    assert bucket.acquire() >= 0.05
+
+    stats = bucket.stats()
+    assert stats["requests"] == 1
+    assert stats["throttled"] == 1
+    assert stats["wait_time"] >= 0.05
+
+
+def test_get_rate_limiter():
+    rate_limiter = get_rate_limiter("appShared", 2)
+    assert rate_limiter.rate == 2
+    assert get_rate_limiter("appShared") is rate_limiter
+
+    assert get_rate_limiter("appOther").rate == AIRTABLE_REQUESTS_PER_SECOND